@@ -355,6 +355,18 @@ def j_must_have( jdata, key ) :
 def j_have( jdata, key ) :
     return key in jdata.keys( )
 
+def return_reaction_radius( jdata ) :
+    '''
+    return the largest recombination and capture distance between two defectObjects, None when it is not set, 
+    i.e. the largest of jdata[ 'linkcell_recombine_radius' ], jdata[ 'first_passage_capture_radius' ] and jdata[ 'long_glide_capture_radius' ].
+    '''
+
+    radius_list = [ jdata[ key ] for key in [ 'linkcell_recombine_radius', 'first_passage_capture_radius', 'long_glide_capture_radius' ] if j_have( jdata, key ) ]
+
+    if len( radius_list ) == 0 : return None
+
+    return max( radius_list )
+
 def to_str( before ) :
 
     tmp_str = ''
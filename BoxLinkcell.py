@@ -4,13 +4,36 @@ import numpy as np
 import argparse
 import json
 
-from Auxiliary import j_must_have, convert_int_array, judge_equal
+from Auxiliary import j_must_have, j_have, convert_int_array, judge_equal, return_reaction_radius
+from GrowableArray import GrowableArray
 from tungsten.Create import create_random_defectObject_list, create_defectObject_of_subclass
 
+def create_box_linkcell( jdata,
+                         tmp_defectObject_list,
+                         position_scale_array = None ) :
+    'return Class SparseLinkcell when jdata[ "linkcell_backend" ] is "sparse", otherwise Class BoxLinkcell with dense arrays of all cells.'
+
+    backend = 'dense'
+    if j_have( jdata, 'linkcell_backend' ) : backend = jdata[ 'linkcell_backend' ]
+
+    if backend == 'sparse' :
+        'SparseLinkcell is a subclass of BoxLinkcell, imported here.'
+        from SparseLinkcell import SparseLinkcell
+        return SparseLinkcell( jdata, tmp_defectObject_list, position_scale_array )
+
+    if backend != 'dense' : raise RuntimeError( 'linkcell_backend %s not in [ dense, sparse ], wrong !' % backend )
+
+    return BoxLinkcell( jdata, tmp_defectObject_list, position_scale_array )
+
 class BoxLinkcell( object ) :
+
+    'the largest number of cells in auto-tuning, about 28 MB of int32 27 neighbouring cells for every cell, and the CSR arrays.'
+    auto_max_cells = 2 ** 18
+
     def __init__( self, 
                   jdata, 
-                  tmp_defectObject_list ) :
+                  tmp_defectObject_list,
+                  position_scale_array = None ) :
         '''
         Properties of BoxLinkcell:
         No change:
@@ -27,55 +50,246 @@ class BoxLinkcell( object ) :
         Change :
          10. self.numb_defectObject
          11. self.ltop[ 0 : self.nlc ]
-         12. self.linkmp[ 0 : self.numb_defectObject ]
+         12. self.linkmp[ 0 : self.numb_defectObject ], view of self.linkmp_buffer
+         13. self.cell_start[ 0 : self.nlc ], self.cell_count[ 0 : self.nlc ], self.sorted_index[ 0 : self.numb_defectObject ],
+             CSR arrays of cells set by self.linked( ), valid until a cell is changed, i.e. self.csr_valid.
+
+        No change :
+         14. self.neighbour_cell_table[ 0 : self.nlc, 27 ], ip of 27 cells of every cell, -1 for no cell, int32 unless self.nlc .ge. 2 ** 31.
+
+        Auto-tuning, jdata[ 'linkcell_auto' ] is True :
+         15. self.auto, self.min_space, self.max_cells
+             the cell length is self.min_space, i.e. the largest of rcutoff_elastic, the reaction radius of Auxiliary.return_reaction_radius( ),
+             jdata[ 'linkcell_space' ] and the reach of neighbour lists, unless more than self.max_cells cells, jdata[ 'linkcell_max_cells' ],
+             then cells are enlarged to self.max_cells for memory, self.auto_max_cells by default, None for no limit,
+             and 7. self.nnbrs grows when it is exceeded.
         '''
 
         self.box = np.array( j_must_have( jdata, 'box' ) )
 
-        self.linkcell_space = np.array( j_must_have( jdata, 'linkcell_space' ) )
+        self.periodic = j_must_have( jdata, 'periodic' )
 
-        for item in self.linkcell_space > self.box :
-            if item : raise RuntimeError( 'linkcell_space > box, wrong !' )
+        self.hmeps = -1e-9
+
+        self.nix = [ 0, -1, -1, -1, 0, 0, -1, 1, -1,  0,  1, -1, 0, 1,  0, 1, 1,  1,  0,  0,  0,  1,  1,  1, -1, -1, -1 ]
+        self.niy = [ 0,  0, -1,  1, 1, 0,  0, 0, -1, -1, -1,  1, 1, 1, -1, 0, 1, -1,  1,  0, -1,  0, -1,  1,  0, -1,  1 ]
+        self.niz = [ 0,  0,  0,  0, 0, 1,  1, 1,  1,  1,  1,  1, 1, 1,  0, 0, 0,  0, -1, -1, -1, -1, -1, -1, -1, -1, -1 ]
 
         rcutoff_elastic = j_must_have( jdata, 'rcutoff_elastic' )
 
-        for item in self.linkcell_space < rcutoff_elastic :
-            if item : raise RuntimeError( 'linkcell_space < rcutoff_elastic, wrong !' )
+        self.auto = False
+        if j_have( jdata, 'linkcell_auto' ) : self.auto = jdata[ 'linkcell_auto' ]
+
+        if self.auto :
+
+            reaction_radius = return_reaction_radius( jdata )
+
+            self.min_space = rcutoff_elastic
+            if reaction_radius != None : self.min_space = max( self.min_space, reaction_radius )
+            if j_have( jdata, 'linkcell_space' ) : self.min_space = max( self.min_space, np.max( jdata[ 'linkcell_space' ] ) )
+
+            if j_have( jdata, 'neighbour_skin' ) :
+                neighbour_cutoff = rcutoff_elastic
+                if reaction_radius != None : neighbour_cutoff = max( neighbour_cutoff, reaction_radius )
+                if j_have( jdata, 'neighbour_cutoff' ) : neighbour_cutoff = jdata[ 'neighbour_cutoff' ]
+                self.min_space = max( self.min_space, neighbour_cutoff + 1.5 * jdata[ 'neighbour_skin' ] )
+
+            if np.any( self.min_space > self.box ) : raise RuntimeError( 'linkcell min space %f > box, wrong !' % self.min_space )
+
+            self.max_cells = self.auto_max_cells
+            if j_have( jdata, 'linkcell_max_cells' ) : self.max_cells = jdata[ 'linkcell_max_cells' ]
+
+            self._set_grid( self._return_auto_fnlc_vector( ) )
+
+            'the capacity of 27 cells grows when it is exceeded.'
+            self.nnbrs = 216
+            if j_have( jdata, 'max_numb_in_27_cells' ) : self.nnbrs = jdata[ 'max_numb_in_27_cells' ]
+
+        else :
+
+            linkcell_space = np.array( j_must_have( jdata, 'linkcell_space' ) )
+
+            for item in linkcell_space > self.box :
+                if item : raise RuntimeError( 'linkcell_space > box, wrong !' )
+
+            for item in linkcell_space < rcutoff_elastic :
+                if item : raise RuntimeError( 'linkcell_space < rcutoff_elastic, wrong !' )
+
+            'python3 np.divide, / and np.true_divide are same.'
+            self._set_grid( np.floor_divide( self.box, linkcell_space ) )
+            self.linkcell_space = linkcell_space
+
+            self.nnbrs = j_must_have( jdata, 'max_numb_in_27_cells' )
+
+        self.linked( tmp_defectObject_list, position_scale_array )
+
+    def linked( self, 
+                tmp_defectObject_list,
+                position_scale_array = None,
+                mask = None                  ) :
+        '''
+        link self.defectObject_list vectorized, no loop over defectObjects :
+         a. cells of all defectObjects are computed from position_scale_array[ 0 : numb_defectObject, 3 ] of the columns
+            in DefectStore, or from positions of tmp_defectObject_list collected in one array,
+         b. indexes sorted by cells, decreasing in every cell, give CSR arrays self.cell_start, self.cell_count and self.sorted_index,
+         c. self.ltop and self.linkmp are set from the CSR arrays, the chain of every cell is in decreasing order as before.
+        only indexes with mask True are linked when mask is given, the others keep self.linkmp of -1, e.g. levels of MultiLinkcell.
+        '''
+
+        self.numb_defectObject = len( tmp_defectObject_list )
+
+        if position_scale_array is None :
+            position_scale_array = np.array( [ item.return_position_scale( ) for item in tmp_defectObject_list ], dtype = np.float64 ).reshape( -1, 3 )
+
+        index_array = np.arange( self.numb_defectObject )
+        if mask is not None : index_array = np.flatnonzero( mask )
+
+        ip_array = self.return_ip_array( np.asarray( position_scale_array )[ index_array ] )
+
+        'b. sorted by ip, and decreasing indexes in every cell.'
+        order = np.lexsort( ( -index_array, ip_array ) )
+        self.sorted_index = index_array[ order ]
+
+        sorted_ip_array = ip_array[ order ]
+
+        'c. the top of every occupied cell is the first one of its slice, and every index links to the next one in the same cell.'
+        self._set_cells( sorted_ip_array )
+
+        linkmp = -np.ones( ( self.numb_defectObject ), dtype = np.int64 )
+
+        same_cell = sorted_ip_array[ : -1 ] == sorted_ip_array[ 1 : ]
+        linkmp[ self.sorted_index[ : -1 ][ same_cell ] ] = self.sorted_index[ 1 : ][ same_cell ]
+
+        self.linkmp_buffer = GrowableArray( linkmp, dtype = np.int64, fill_value = -1 )
+        self.linkmp = self.linkmp_buffer.return_array( )
 
-        'python3 np.divide, / and np.true_divide are same.'
-        self.fnlc_vector = np.floor_divide( self.box, self.linkcell_space )
+        self.csr_valid = True
+
+    def _set_cells( self, sorted_ip_array ) :
+        'set self.cell_start, self.cell_count and self.ltop of all cells from sorted_ip_array, ip of self.sorted_index.'
+
+        self.cell_count = np.bincount( sorted_ip_array, minlength = self.nlc ).astype( np.int64 )
+
+        self.cell_start = np.zeros( ( self.nlc ), dtype = np.int64 )
+        self.cell_start[ 1 : ] = np.cumsum( self.cell_count )[ : -1 ]
+
+        self.ltop = -np.ones( ( self.nlc ), dtype = np.int64 )
+
+        occupied = self.cell_count > 0
+        self.ltop[ occupied ] = self.sorted_index[ self.cell_start[ occupied ] ]
+
+    def _set_grid( self, fnlc_vector ) :
+        'set 2.self.linkcell_space, 3.self.nlc_vector, 4.self.fnlc_vector, 5.self.nlc and 14.self.neighbour_cell_table from cells in every direction.'
+
+        self.fnlc_vector = np.array( fnlc_vector, dtype = np.float64 )
 
         self.nlc_vector = convert_int_array( self.fnlc_vector )
 
         self.nlc = self.nlc_vector[ 0 ] * self.nlc_vector[ 1 ] * self.nlc_vector[ 2 ]
-       
-        self.periodic = j_must_have( jdata, 'periodic' )
-        
-        self.nnbrs = j_must_have( jdata, 'max_numb_in_27_cells' )
 
-        self.hmeps = -1e-9
+        self.linkcell_space = self.box / self.fnlc_vector
 
-        self.nix = [ 0, -1, -1, -1, 0, 0, -1, 1, -1,  0,  1, -1, 0, 1,  0, 1, 1,  1,  0,  0,  0,  1,  1,  1, -1, -1, -1 ]
-        self.niy = [ 0,  0, -1,  1, 1, 0,  0, 0, -1, -1, -1,  1, 1, 1, -1, 0, 1, -1,  1,  0, -1,  0, -1,  1,  0, -1,  1 ]
-        self.niz = [ 0,  0,  0,  0, 0, 1,  1, 1,  1,  1,  1,  1, 1, 1,  0, 0, 0,  0, -1, -1, -1, -1, -1, -1, -1, -1, -1 ]
+        self.neighbour_cell_table = self._return_neighbour_cell_table( )
 
-        self.linked( tmp_defectObject_list )
+    def _return_auto_fnlc_vector( self ) :
+        '''
+        return cells in every direction of the length self.min_space, the cells of every direction are reduced
+        by the same factor when there are more than self.max_cells cells.
+        '''
 
-    def linked( self, tmp_defectObject_list ) :
-        'link self.defectObject_list'
+        fnlc_vector = np.maximum( np.floor( self.box / self.min_space ), 1.0 )
 
-        self.numb_defectObject = len( tmp_defectObject_list )
+        if self.max_cells != None and np.prod( fnlc_vector ) > self.max_cells :
+            fnlc_vector = np.maximum( np.floor( fnlc_vector * ( self.max_cells / np.prod( fnlc_vector ) ) ** ( 1.0 / 3.0 ) ), 1.0 )
+
+        return fnlc_vector
+
+    def check_nnbrs( self, numb ) :
+        'check numb in 27 cells with 7.self.nnbrs, it grows in auto-tuning, otherwise RuntimeError is raised.'
+
+        if numb <= self.nnbrs : return
+
+        if not self.auto :
+            raise RuntimeError( 'Max1: %d .gt. nnbrs: %d something wrong' % ( numb, self.nnbrs ) )
+
+        self.nnbrs = max( 2 * self.nnbrs, numb )
+
+    def _return_neighbour_cell_table( self, ip_array = None ) :
+        '''
+        return the table ( self.nlc x 27 ) of ip of 27 cells of every cell in the order of self.nix, self.niy and self.niz,
+        column 0 is the cell itself. A neighbouring cell is wrapped along periodic directions, and it is -1 out of the box
+        along non-periodic directions, or when it is the same as a former column, e.g. self.nlc_vector[ j ] .lt. 3.
+        only the rows of ip_array are returned when it is given, e.g. cells of SparseLinkcell.
+        ip are int32 unless self.nlc .ge. 2 ** 31, the table is built column by column, without arrays ( self.nlc x 27 x 3 ).
+        '''
+
+        index_dtype = np.int32 if self.nlc < 2 ** 31 else np.int64
+
+        nlc_vector = np.asarray( self.nlc_vector, dtype = np.int64 ).astype( index_dtype )
+
+        if ip_array is None : ip_array = np.arange( self.nlc, dtype = index_dtype )
+        ip_array = np.asarray( ip_array, dtype = index_dtype )
+        cell_index_array = np.stack( [ ip_array % nlc_vector[ 0 ], ( ip_array // nlc_vector[ 0 ] ) % nlc_vector[ 1 ], ip_array // ( nlc_vector[ 0 ] * nlc_vector[ 1 ] ) ], axis = 1 )
 
-        self.ltop = -np.ones( ( self.nlc ), dtype = np.int )
+        table = np.empty( ( len( ip_array ), 27 ), dtype = index_dtype )
 
-        self.linkmp = -np.ones( ( self.numb_defectObject ), dtype = np.int )
+        for kc in range( 27 ) :
 
-        for i in range( self.numb_defectObject ) :
-            ip = self.return_ip_defectObject( tmp_defectObject_list[ i ] )
-           
-            j = self.ltop[ ip ]
-            self.ltop[ ip ] = i
-            self.linkmp[ i ] = j
+            'the neighbouring cell kc of every cell ( len( ip_array ) x 3 ).'
+            neighbour_array = cell_index_array + np.array( [ self.nix[ kc ], self.niy[ kc ], self.niz[ kc ] ], dtype = index_dtype )
+
+            outside = np.zeros( len( ip_array ), dtype = bool )
+
+            for j in range( 3 ) :
+                if self.periodic[ j ] :
+                    neighbour_array[ :, j ] %= nlc_vector[ j ]
+                else :
+                    outside |= ( neighbour_array[ :, j ] < 0 ) | ( neighbour_array[ :, j ] >= nlc_vector[ j ] )
+
+            table[ :, kc ] = neighbour_array[ :, 0 ] + nlc_vector[ 0 ] * ( neighbour_array[ :, 1 ] + nlc_vector[ 1 ] * neighbour_array[ :, 2 ] )
+            table[ outside, kc ] = -1
+
+        for kc in range( 1, 27 ) :
+            table[ np.any( table[ :, : kc ] == table[ :, kc : kc + 1 ], axis = 1 ), kc ] = -1
+
+        return table
+
+    def return_cells_key_defectObject( self, tmp_defectObject ) :
+        'return the key of cells searched for tmp_defectObject, defectObjects with the same key have the same index list in 27 cells.'
+
+        return self.return_ip_defectObject( tmp_defectObject )
+
+    def return_27_cells_index_list_defectObject( self, tmp_defectObject ) :
+        'return indexes in 27 cells of tmp_defectObject, including all indexes in its cell.'
+
+        return self.return_27_cells_index_list_ip( self.return_ip_defectObject( tmp_defectObject ) )
+
+    def return_27_cells_index_list_ip( self, ip ) :
+        'return indexes in 27 cells of the cell ip by self.neighbour_cell_table, including all indexes in the cell ip.'
+
+        index_list = [ ]
+
+        for jc in self.neighbour_cell_table[ ip ] :
+            if jc != -1 : index_list.extend( self.return_index_list_ip( jc ) )
+
+        return index_list
+
+    def return_index_list_ip( self, ip ) :
+        'return indexes in the cell ip in decreasing order, from the CSR arrays if they are valid, otherwise by walking the chain.'
+
+        if self.csr_valid :
+            start = self.cell_start[ ip ]
+            return self.sorted_index[ start : start + self.cell_count[ ip ] ].tolist( )
+
+        index_list = [ ]
+
+        i = self.ltop[ ip ]
+
+        while i != -1 :
+            index_list.append( i )
+            i = self.linkmp[ i ]
+
+        return index_list
 
     def add_a_defectObject( self, tmp_defectObject ) :
 
@@ -83,22 +297,58 @@ class BoxLinkcell( object ) :
 
         j = self.ltop[ ip ]
         self.ltop[ ip ] = self.numb_defectObject
-        self.linkmp = np.append( self.linkmp, j )
+
+        'append j in place, self.linkmp_buffer is reallocated only when its capacity is exceeded.'
+        self.linkmp_buffer.append( j )
+        self.linkmp = self.linkmp_buffer.return_array( )
 
         self.numb_defectObject += 1
 
+        self.csr_valid = False
+
     def add_defectObject_list( self, tmp_defectObject_list ) :
 
         for tmp_defectObject in tmp_defectObject_list :
            self.add_a_defectObject( tmp_defectObject )
 
-    def substitute_defectObject( self,
-                                 index,
-                                 old_defectObject,
-                                 tmp_defectObject  ) :
+    def append_unlinked( self ) :
+        'append an index not linked in any cell, e.g. a defectObject of another level of MultiLinkcell.'
 
-        'A. First delete index of old_defectObject in self.linkcell.'
-        ip = self.return_ip_defectObject( old_defectObject )
+        self.linkmp_buffer.append( -1 )
+        self.linkmp = self.linkmp_buffer.return_array( )
+
+        self.numb_defectObject += 1
+
+    def link_defectObject( self,
+                           index,
+                           tmp_defectObject ) :
+        'link index of tmp_defectObject, which is not linked in any cell.'
+
+        self._link( index, self.return_ip_defectObject( tmp_defectObject ) )
+        self.csr_valid = False
+
+    def unlink_defectObject( self,
+                             index,
+                             tmp_defectObject ) :
+        'unlink index of tmp_defectObject from its cell, self.linkmp[ index ] is -1 after it.'
+
+        self._unlink( index, self.return_ip_defectObject( tmp_defectObject ) )
+        self.linkmp[ index ] = -1
+        self.csr_valid = False
+
+    def pop_last( self ) :
+        'pop the last index, which is not linked in any cell.'
+
+        self.linkmp_buffer.delete( self.numb_defectObject - 1 )
+        self.linkmp = self.linkmp_buffer.return_array( )
+
+        self.numb_defectObject -= 1
+        self.csr_valid = False
+
+    def _unlink( self,
+                 index,
+                 ip     ) :
+        'remove index from the chain of cell ip, O( numb in cell ip ).'
 
         i = self.ltop[ ip ]
 
@@ -114,8 +364,10 @@ class BoxLinkcell( object ) :
                     raise RuntimeError( 'not find index %d in cell ip %d: ' % ( index, ip ) )
                 i = j
 
-        'B. Second add index of tmp_defectObject.'
-        ip = self.return_ip_defectObject( tmp_defectObject )
+    def _link( self,
+               index,
+               ip     ) :
+        'insert index into the chain of cell ip, keeping the decreasing order of indexes in the chain as self.linked( ).'
 
         i = self.ltop[ ip ]
 
@@ -131,52 +383,57 @@ class BoxLinkcell( object ) :
                     break
                 i = j
 
+    def substitute_defectObject( self,
+                                 index,
+                                 old_defectObject,
+                                 tmp_defectObject  ) :
+
+        old_ip = self.return_ip_defectObject( old_defectObject )
+        ip = self.return_ip_defectObject( tmp_defectObject )
+
+        'A. First delete index of old_defectObject in self.linkcell.'
+        self._unlink( index, old_ip )
+
+        'B. Second add index of tmp_defectObject.'
+        self._link( index, ip )
+
+        'the CSR arrays are kept only if index stays in its cell.'
+        if ip != old_ip : self.csr_valid = False
+
     def delete_a_defectObject( self, 
                                tmp_defectObject, 
-                               tmp_index         ) :
+                               tmp_index,
+                               last_defectObject ) :
+        '''
+        delete tmp_defectObject with tmp_index by swapping with the last one, 
+        last_defectObject with index self.numb_defectObject - 1 takes tmp_index, as DefectSystem does for its defectObject_list.
+        only the two cells of tmp_defectObject and last_defectObject are walked, no index is shifted.
+        '''
 
         if tmp_index < 0 or tmp_index > self.numb_defectObject - 1 :
             raise RuntimeError( 'tmp_index %d out of range [ 0, %d ] !' % ( tmp_index, self.numb_defectObject ) )
 
-        ip = self.return_ip_defectObject( tmp_defectObject )
+        last_index = self.numb_defectObject - 1
 
-        i = self.ltop[ ip ]
+        self._unlink( tmp_index, self.return_ip_defectObject( tmp_defectObject ) )
 
-        if i == tmp_index :
-            self.ltop[ ip ] = self.linkmp[ i ]
-        else :
-            while True :
-                j = self.linkmp[ i ]
-                if j == tmp_index :
-                    self.linkmp[ i ] = self.linkmp[ j ]
-                    break
-                i = j
+        if tmp_index != last_index :
+            ip = self.return_ip_defectObject( last_defectObject )
+            self._unlink( last_index, ip )
+            self._link( tmp_index, ip )
 
-        for i in range( self.nlc ) : 
-            if self.ltop[ i ] > tmp_index :
-                self.ltop[ i ] -= 1
-
-        for i in range( self.numb_defectObject ) :
-            self.linkmp[ i - int( i > tmp_index ) ] = self.linkmp[ i ] - int( self.linkmp[ i ] > tmp_index )
-
-        self.linkmp = np.delete( self.linkmp, -1 )
+        'pop self.linkmp[ last_index ] in place.'
+        self.linkmp_buffer.delete( last_index )
+        self.linkmp = self.linkmp_buffer.return_array( )
 
         self.numb_defectObject -= 1
 
-    def delete_defectObject_list( self,
-                                  tmp_defectObject_list,
-                                  tmp_index_list         ) :
-
-       if len( tmp_defectObject_list ) != len( tmp_index_list ) :
-           raise RuntimeError( 'The length of input parameters are not equal !' )
-
-       tmp_add_list = [ [ tmp_index_list[ i ], tmp_defectObject_list[ i ] ] for i in range( len( tmp_defectObject_list ) ) ]
+        self.csr_valid = False
 
-       'decreasing tmp_index_list[ index ] according index.'
-       tmp_add_list.sort( reverse = True )
+    def return_numb_occupied_cell( self ) :
+        'return the number of cells with at least one linked index.'
 
-       for item in tmp_add_list :
-           self.delete_a_defectObject( item[ 1 ], item[ 0 ] )
+        return int( np.sum( self.ltop != -1 ) )
 
     def return_ip_defectObject( self, tmp_defectObject ) :
 
@@ -188,6 +445,14 @@ class BoxLinkcell( object ) :
     def return_cell_index_defectObject( self, tmp_defectObject ) :
         return convert_int_array( ( tmp_defectObject.return_position_scale( ) + self.hmeps ) * self.fnlc_vector )
 
+    def return_ip_array( self, position_scale_array ) :
+        'return ip of every row in position_scale_array[ :, 3 ] vectorized, the same as self.return_ip_defectObject( ).'
+
+        'astype truncates toward zero as int( ) in convert_int_array.'
+        cell_index_array = ( ( np.asarray( position_scale_array ) + self.hmeps ) * self.fnlc_vector ).astype( np.int64 )
+
+        return cell_index_array[ :, 0 ] + self.nlc_vector[ 0 ] * ( cell_index_array[ :, 1 ] + self.nlc_vector[ 1 ] * cell_index_array[ :, 2 ] )
+
     def return_ip_cell_index( self, cell_index ) :
 
         ip = cell_index[ 0 ] + self.nlc_vector[ 0 ] * ( cell_index[ 1 ] + self.nlc_vector[ 1 ] * cell_index[ 2 ] )
@@ -215,7 +480,7 @@ class BoxLinkcell( object ) :
         Change :
          10. self.numb_defectObject
          11. self.ltop[ 0 : self.nlc ]
-         12. self.linkmp[ 0 : self.numb_defectObject ]
+         12. self.linkmp[ 0 : self.numb_defectObject ], view of self.linkmp_buffer
         '''
 
         properties_list = [ [ 'box',                 self.box               ],  
@@ -294,13 +559,14 @@ if __name__ == '__main__' :
     linkcell_2.add_a_defectObject( a_defectObject )
 
 
-    #2. delete_a_defectObject( self, tmp_defectObject, tmp_index )
-    # A. real value
-    del defectObject_list[ 3 ]
+    #2. delete_a_defectObject( self, tmp_defectObject, tmp_index, last_defectObject )
+    # A. real value, swap with the last one
+    defectObject_list[ 3 ] = defectObject_list[ -1 ]
+    del defectObject_list[ -1 ]
     linkcell_1.linked( defectObject_list )
 
     # B. delete_a_defectObject
-    linkcell_2.delete_a_defectObject( old_defectObject_list[ 3 ], 3 )
+    linkcell_2.delete_a_defectObject( old_defectObject_list[ 3 ], 3, a_defectObject )
 
 
     if not linkcell_1.equal( linkcell_2, delta ) :
@@ -12,6 +12,7 @@ from scipy import stats
 from collections import Iterable
 
 from Cluster import ClusterSystem
+from KDTreeNeighbour import create_kdtree_neighbour
 from Auxiliary import j_have, j_must_have, R_convert_to_position, to_str, return_serial_numb_in_str
 
 class Cascade( object ) :
@@ -82,6 +83,7 @@ class Cascade( object ) :
             self.cluster = j_must_have( jdata, 'cluster' )
 
             if self.cluster : 
+                self.kdtree_neighbour = create_kdtree_neighbour( jdata )
                 self.IC_VC_rcut = j_must_have( jdata, 'IC_VC_rcut' )
                 self.VLoop_lower = j_must_have( jdata, 'VLoop_lower' )
                 self.ICluster_upper = j_must_have( jdata, 'ICluster_upper' )
@@ -402,7 +404,7 @@ class Cascade( object ) :
             I_position_array = np.array( I_position_list )
             V_position_array = np.array( V_position_list )
 
-            clusterSys = ClusterSystem( alatt, self.ICluster_upper, self.VLoop_lower, 'I', self.IC_VC_rcut[ 0 ], I_position_array, tmp_box, burgers_vector_unit_array, burgers_vector_scale_length_array, d_probability )
+            clusterSys = ClusterSystem( alatt, self.ICluster_upper, self.VLoop_lower, 'I', self.IC_VC_rcut[ 0 ], I_position_array, tmp_box, burgers_vector_unit_array, burgers_vector_scale_length_array, d_probability, self.kdtree_neighbour )
             clusterSys.add_clusters( alatt, self.ICluster_upper, self.VLoop_lower, 'V', self.IC_VC_rcut[ 1 ], V_position_array, tmp_box )
 
             self.defectStr_list = clusterSys.return_defectStr_list( ) 
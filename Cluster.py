@@ -338,7 +338,8 @@ class ClusterSystem( object ) :
                   tmp_box,
                   tmp_burgers_vector_unit_array,
                   tmp_burgers_vector_scale_length_array,
-                  tmp_d_probability                      ) :
+                  tmp_d_probability,
+                  tmp_kdtree_neighbour = None            ) :
         '''
         Class ClusterSystem properties:
          1. self.cluster_list
@@ -346,8 +347,11 @@ class ClusterSystem( object ) :
          3. self.burgers_vector_unit_array
          4. self.burgers_vector_scale_length_array
          5. d_probability
+         6. self.kdtree_neighbour, Class KDTreeNeighbour for pairs within rcut by one call, None for the loop over all pairs.
         '''
 
+        self.kdtree_neighbour = tmp_kdtree_neighbour
+
         self.burgers_vector_unit_array = tmp_burgers_vector_unit_array
         self.burgers_vector_scale_length_array = tmp_burgers_vector_scale_length_array
         self.d_probability = tmp_d_probability
@@ -369,6 +373,9 @@ class ClusterSystem( object ) :
                            tmp_box         ) :
         'Note that the distance is the nearest distance between images. distance unit: nm.'
 
+        if self.kdtree_neighbour != None :
+            return self._identify_clusters_kdtree( tmp_alatt, tmp_ICluster_upper, tmp_VLoop_lower, tmp_IV, tmp_rcut, tmp_position, tmp_box )
+
         rcut_square = tmp_rcut * tmp_rcut
 
         nn1 = len( tmp_position )
@@ -433,6 +440,29 @@ class ClusterSystem( object ) :
 
         return cluster_list
 
+    def _identify_clusters_kdtree( self,
+                                   tmp_alatt,
+                                   tmp_ICluster_upper,
+                                   tmp_VLoop_lower,
+                                   tmp_IV,
+                                   tmp_rcut,
+                                   tmp_position,
+                                   tmp_box         ) :
+        'the same clusters as self.identify_clusters( ), connected components of pairs within tmp_rcut found by one call of self.kdtree_neighbour.'
+
+        ( numb_cluster, label_array ) = self.kdtree_neighbour.return_cluster_label_array( tmp_position, tmp_rcut, tmp_box, [ True, True, True ] )
+
+        'rows of every cluster in increasing order, clusters in the order of their first rows.'
+        order = np.argsort( label_array, kind = 'stable' )
+        split_array = np.cumsum( np.bincount( label_array, minlength = numb_cluster ) )[ : -1 ]
+
+        cluster_list = [ ]
+
+        for index_array in np.split( order, split_array ) :
+            cluster_list.append( Cluster( tmp_alatt, tmp_ICluster_upper, tmp_VLoop_lower, tmp_IV, tmp_rcut, tmp_position[ index_array ], self.burgers_vector_unit_array, self.burgers_vector_scale_length_array, self.d_probability ) )
+
+        return cluster_list
+
     def add_clusters( self, 
                       tmp_alatt,
                       tmp_ICluster_upper,
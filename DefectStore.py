@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+'This is an DefectStore module, columns of numpy arrays for the defectObjects of DefectSystem.'
+
+import numpy as np
+import argparse
+import json
+import copy
+
+from Auxiliary import j_must_have
+from GrowableArray import GrowableArray
+from ConstNumber import ConstNumber
+from tungsten.Create import create_random_defectObject_list
+
+defecttype_list = [ 'I', 'V', 'ICluster', 'VCluster', 'ILoop100', 'VLoop100', 'ILoop111', 'VLoop111' ]
+
+class DefectStore( object ) :
+
+    def __init__( self,
+                  jdata,
+                  tmp_defectObject_list ) :
+        '''
+        Structure of arrays for defectObjects, row index is the same as the index in tmp_defectObject_list.
+        Whole system operations ( center, total defects ) are vectorized on the columns, remap and judge in box find the rows out of box
+        on the columns and leave them to the setters and judges of their defectObjects, move is done by move_defectObject, rows are read back.
+
+        Properties of DefectStore :
+        No change :
+         1. self.box
+         2. self.periodic
+         3. self.type_code_dict, type code of every defecttype in defecttype_list.
+         4. self.IV_code_array, 0 for 'I' and 1 for 'V' of every type code.
+
+        Change :
+         5. self.numb_defectObject
+         6. self.position[ 0 : self.numb_defectObject, 3 ], view of self.position_buffer
+         7. self.position_scale[ 0 : self.numb_defectObject, 3 ], view of self.position_scale_buffer
+         8. self.position_image_int[ 0 : self.numb_defectObject, 3 ], view of self.position_image_int_buffer
+         9. self.nsize[ 0 : self.numb_defectObject ], view of self.nsize_buffer
+         10. self.type_code[ 0 : self.numb_defectObject ], view of self.type_code_buffer
+         11. self.burgers_vector_scale[ 0 : self.numb_defectObject, 3 ], view of self.burgers_vector_scale_buffer, zero for no burgers vector.
+        '''
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = np.float64 )
+
+        self.type_code_dict = { item : i for ( i, item ) in enumerate( defecttype_list ) }
+        self.IV_code_array = np.array( [ int( item[ 0 ] == 'V' ) for item in defecttype_list ], dtype = np.int64 )
+
+        self.position_buffer = GrowableArray( [ ], row_shape = ( 3, ) )
+        self.position_scale_buffer = GrowableArray( [ ], row_shape = ( 3, ) )
+        self.position_image_int_buffer = GrowableArray( [ ], dtype = np.int64, row_shape = ( 3, ) )
+        self.nsize_buffer = GrowableArray( [ ], dtype = np.int64 )
+        self.type_code_buffer = GrowableArray( [ ], dtype = np.int64 )
+        self.burgers_vector_scale_buffer = GrowableArray( [ ], row_shape = ( 3, ) )
+
+        self.reset( tmp_defectObject_list )
+
+    def _return_buffer_list( self ) :
+
+        return [ self.position_buffer, self.position_scale_buffer, self.position_image_int_buffer,
+                 self.nsize_buffer, self.type_code_buffer, self.burgers_vector_scale_buffer ]
+
+    def reset_views( self ) :
+        'reset views of the buffers, must be called after every append, delete or reset of the buffers.'
+
+        self.position = self.position_buffer.return_array( )
+        self.position_scale = self.position_scale_buffer.return_array( )
+        self.position_image_int = self.position_image_int_buffer.return_array( )
+        self.nsize = self.nsize_buffer.return_array( )
+        self.type_code = self.type_code_buffer.return_array( )
+        self.burgers_vector_scale = self.burgers_vector_scale_buffer.return_array( )
+
+        self.numb_defectObject = self.nsize.size
+
+    def _return_row( self, tmp_defectObject ) :
+        'return the row of tmp_defectObject in the order of self._return_buffer_list( ).'
+
+        if tmp_defectObject.defecttype not in self.type_code_dict :
+            raise RuntimeError( 'defecttype %s not in %s, wrong !' % ( tmp_defectObject.defecttype, defecttype_list ) )
+
+        burgers_vector_scale = np.zeros( 3 )
+        if hasattr( tmp_defectObject, 'burgers_vector_scale' ) : burgers_vector_scale = tmp_defectObject.burgers_vector_scale
+
+        return [ tmp_defectObject.return_position( ),
+                 tmp_defectObject.return_position_scale( ),
+                 tmp_defectObject.position_image_int,
+                 tmp_defectObject.nsize,
+                 self.type_code_dict[ tmp_defectObject.defecttype ],
+                 burgers_vector_scale ]
+
+    def reset( self, tmp_defectObject_list ) :
+        'reset all columns from tmp_defectObject_list in one pass.'
+
+        row_list = [ self._return_row( item ) for item in tmp_defectObject_list ]
+
+        for ( i, item ) in enumerate( self._return_buffer_list( ) ) :
+            item.reset( [ row[ i ] for row in row_list ] )
+
+        self.reset_views( )
+
+    def append( self, tmp_defectObject_list ) :
+        'append rows of tmp_defectObject_list at the end.'
+
+        row_list = [ self._return_row( item ) for item in tmp_defectObject_list ]
+
+        for ( i, item ) in enumerate( self._return_buffer_list( ) ) :
+            item.append( [ row[ i ] for row in row_list ] )
+
+        self.reset_views( )
+
+    def set_row( self,
+                 index,
+                 tmp_defectObject ) :
+        'set the row of index from tmp_defectObject, O( 1 ).'
+
+        row = self._return_row( tmp_defectObject )
+
+        for ( i, item ) in enumerate( self._return_buffer_list( ) ) :
+            item.return_buffer( )[ index ] = row[ i ]
+
+    def swap_remove( self, index ) :
+        'delete the row of index by moving the last row into index, as DefectSystem does for its defectObject_list, O( 1 ).'
+
+        last_index = self.numb_defectObject - 1
+
+        for item in self._return_buffer_list( ) :
+            tmp_buffer = item.return_buffer( )
+            if index != last_index : tmp_buffer[ index ] = tmp_buffer[ last_index ]
+            item.delete( last_index )
+
+        self.reset_views( )
+
+    def _remap_columns( self ) :
+        'remap the columns into the box along periodic directions over whole arrays, as set_position_scale_image_int, return indexes of rows shifted.'
+
+        shift = np.floor( self.position / self.box ) * self.periodic
+
+        self.position -= shift * self.box
+        self.position_image_int += shift.astype( np.int64 )
+        np.divide( self.position, self.box, out = self.position_scale )
+
+        return np.nonzero( np.any( shift != 0.0, axis = 1 ) )[ 0 ]
+
+    def remap( self,
+               jdata,
+               tmp_defectObject_list ) :
+        '''
+        remap all rows into the box along periodic directions over whole arrays,
+        only defectObjects of tmp_defectObject_list leaving the box are remapped by their own set_position_scale_image_int.
+        '''
+
+        for index in self._remap_columns( ) :
+            tmp_defectObject_list[ index ].set_position_scale_image_int( jdata )
+
+    def move( self,
+              jdata,
+              tmp_defectObject_list,
+              tmp_move_vector,
+              tmp_ConstNumber        ) :
+        '''
+        move all rows with tmp_move_vector and remap over whole arrays, and every defectObject of tmp_defectObject_list by its own move_defectObject.
+        defectObjects own their positions, they are not views of the columns, so one call for every defectObject is left,
+        as many as the loop of DefectSystem before the columns, the columns are not read back from the defectObjects.
+        '''
+
+        for item in tmp_defectObject_list :
+            item.move_defectObject( jdata, tmp_move_vector, tmp_ConstNumber )
+
+        self.position += tmp_move_vector
+
+        self._remap_columns( )
+
+    def return_center( self ) :
+        'return the center position of all rows, np.zeros( 3 ) for no row.'
+
+        if self.numb_defectObject == 0 : return np.zeros( 3, dtype = np.float64 )
+
+        return self.position.mean( axis = 0 )
+
+    def return_judge_in_box( self,
+                             jdata,
+                             tmp_defectObject_list,
+                             tmp_max_box_int       ) :
+        '''
+        return judge in box or not, and corresponding delta_l, of the first defectObject out of box as DefectSystem.return_judge_in_box( ),
+        rows out of box, abs( position_image_int ) > tmp_max_box_int or position not in [ 0, box ), are found over the columns,
+        and judged in order by return_judge_in_box of their defectObjects of tmp_defectObject_list.
+        '''
+
+        delta_l = np.zeros( 3 )
+
+        if self.numb_defectObject == 0 : return ( [ True, True, True ], delta_l )
+
+        out_array = np.any( np.abs( self.position_image_int ) > np.asarray( tmp_max_box_int ), axis = 1 ) \
+                    | np.any( ( self.position < 0.0 ) | ( self.position >= self.box ), axis = 1 )
+
+        for index in np.nonzero( out_array )[ 0 ] :
+            in_box, delta_l = tmp_defectObject_list[ index ].return_judge_in_box( jdata, tmp_max_box_int )
+            if not all( in_box ) : return ( in_box, delta_l )
+
+        return ( [ True, True, True ], delta_l )
+
+    def return_total_defects( self ) :
+        'return total point defects { I : , V : } by nsize.'
+
+        tmp_sum = np.bincount( self.IV_code_array[ self.type_code ], weights = self.nsize, minlength = 2 )
+
+        return { 'I' : int( tmp_sum[ 0 ] ), 'V' : int( tmp_sum[ 1 ] ) }
+
+    def _return_properties( self ) :
+        '''
+        Properties of DefectStore :
+        No change :
+         1. self.box
+         2. self.periodic
+         3. self.type_code_dict
+         4. self.IV_code_array
+
+        Change :
+         5. self.numb_defectObject
+         6. self.position
+         7. self.position_scale
+         8. self.position_image_int
+         9. self.nsize
+         10. self.type_code
+         11. self.burgers_vector_scale
+        '''
+
+        properties_list = [ [ 'box',                  self.box                  ],
+                            [ 'periodic',             self.periodic             ],
+                            [ 'type_code_dict',       self.type_code_dict       ],
+                            [ 'IV_code_array',        self.IV_code_array        ],
+                            [ 'numb_defectObject',    self.numb_defectObject    ],
+                            [ 'position',             self.position             ],
+                            [ 'position_scale',       self.position_scale       ],
+                            [ 'position_image_int',   self.position_image_int   ],
+                            [ 'nsize',                self.nsize                ],
+                            [ 'type_code',            self.type_code            ],
+                            [ 'burgers_vector_scale', self.burgers_vector_scale ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for DefectStore --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class DefectStore detecting ---' )
+
+    parser.add_argument( 'INPUT',
+                         help = 'the input json database' )
+
+    args = parser.parse_args( )
+
+    fp = open( args.INPUT, 'r' )
+    jdata = json.load( fp )
+
+    numb_defectObject = 100
+    defectObject_list = create_random_defectObject_list( jdata, numb_defectObject )
+
+    defectStore = DefectStore( jdata, defectObject_list )
+
+    'compare the vectorized move and remap with move_defectObject of every defectObject.'
+    real_defectObject_list = copy.deepcopy( defectObject_list )
+
+    tmp_move_vector = np.array( j_must_have( jdata, 'box' ) ) * 0.37
+    tmp_ConstNumber = ConstNumber( jdata )
+
+    for item in real_defectObject_list :
+        item.move_defectObject( jdata, tmp_move_vector, tmp_ConstNumber )
+
+    defectStore.move( jdata, defectObject_list, tmp_move_vector, tmp_ConstNumber )
+
+    for ( index, item ) in enumerate( real_defectObject_list ) :
+        if not np.allclose( item.return_position_scale( ), defectStore.position_scale[ index ] ) :
+            raise RuntimeError( '# position_scale of index %d not equal, wrong !' % index )
+        if not np.array_equal( item.position_image_int, defectStore.position_image_int[ index ] ) :
+            raise RuntimeError( '# position_image_int of index %d not equal, wrong !' % index )
+
+    'a defectObject moved out of the box, judged as the loop over all defectObjects, and remapped by set_position_scale_image_int.'
+    defectObject_list[ 7 ].move_defectObject( jdata, np.array( j_must_have( jdata, 'box' ) ) * 1.5, tmp_ConstNumber )
+    defectStore.set_row( 7, defectObject_list[ 7 ] )
+
+    for tmp_max_box_int in [ [ 0, 0, 0 ], [ 10, 10, 10 ] ] :
+        real_judge = ( [ True, True, True ], np.zeros( 3 ) )
+        for item in defectObject_list :
+            in_box, delta_l = item.return_judge_in_box( jdata, tmp_max_box_int )
+            if not all( in_box ) :
+                real_judge = ( in_box, delta_l )
+                break
+        judge = defectStore.return_judge_in_box( jdata, defectObject_list, tmp_max_box_int )
+        if judge[ 0 ] != real_judge[ 0 ] or not np.allclose( judge[ 1 ], real_judge[ 1 ] ) :
+            raise RuntimeError( '# judge in box of %s not equal, wrong !' % tmp_max_box_int )
+
+    defectStore.remap( jdata, defectObject_list )
+
+    if not np.allclose( defectStore.position_scale[ 7 ], defectObject_list[ 7 ].return_position_scale( ) ) \
+       or np.any( ( defectStore.periodic > 0.0 ) & ( defectStore.position[ 7 ] >= defectStore.box ) ) :
+        raise RuntimeError( '# remap of index 7 wrong !' )
+
+    print( '# every is OK !' )
@@ -13,7 +13,21 @@ from collections import Iterable
 
 from Cascade import Cascade
 from ConstNumber import ConstNumber
-from BoxLinkcell import BoxLinkcell
+from MultiLinkcell import create_linkcell
+from RateCatalog import create_rate_catalog, NextReactionCatalog
+from GrowableArray import GrowableArray
+from DefectStore import DefectStore
+from RateTable import create_rate_table
+from RandomStream import create_random_stream
+from Superbasin import create_superbasin
+from FirstPassage import create_first_passage
+from LongGlide import create_long_glide
+from ParallelSublattice import ParallelSublattice
+from NeighbourList import create_neighbour_list
+from KDTreeNeighbour import create_kdtree_neighbour
+from ElasticFarField import create_elastic_far_field
+from PairLedger import create_pair_ledger
+from ElasticKernel import create_elastic_kernel
 from tungsten.DefectObject import DefectObject
 from Auxiliary import j_must_have, j_have, judge_equal, output_data_into_file, save_float_several_digits
 from tungsten.Create import create_defectObject_of_subclass, create_random_defectObject_list, create_random_defectObject, create_defectObject
@@ -25,7 +39,8 @@ class DefectSystem( object ) :
 
     def __init__( self, 
                   jdata, 
-                  defectObjectStr_list ) :
+                  defectObjectStr_list,
+                  random_stream = None ) :
         '''
         Properties of DefectSystem :
          0. self.box
@@ -43,16 +58,29 @@ class DefectSystem( object ) :
          12. self.linkcell
          13. self.initial_recombine
          14. self.total_defects
-         15. self.sum_numb_actions_list
-         16. self.ui_array
+         15. self.numb_actions_list, self.width_rate_array
+         16. self.ui_array, view of self.ui_buffer
          17. self.utotal
-         18. self.rate_array
+         18. self.rate_array, view of self.rate_buffer
          19. self.size_rate_array
-         20. self.sum_rate_array
+         20. self.rate_catalog
          21. self.sum_rate
          22. self.delta_time
          23. self.which_defect
          24. self.what_action
+         25. self.handle_list, self.index_of_handle, self.next_handle
+         26. self.defect_store, columns of self.defectObject_list.
+         27. self.rate_table, memoized rates of isolated defectObjects, None for no rate table.
+         28. self.random_stream, block-buffered random numbers, created by jdata[ 'seed' ] when random_stream is None.
+         29. self.superbasin, flicker detection and superbasin exits, None for no superbasin.
+         30. self.first_passage, protective spheres of isolated point defects, None for no first-passage jumps.
+         31. self.long_glide, multi-jump one dimensional glide, None for no long glides.
+         32. self.frozen_handle_set, handles of frozen defectObjects with zero rates, e.g. ghost defectObjects of a parallel domain.
+         33. self.neighbour_list, persistent neighbour lists with a verlet skin, None for walking 27 cells by every call.
+         34. self.kdtree_neighbour, all pairs of bulk searches by one call of cKDTree, None for walking 27 cells.
+         35. self.elastic_far_field, ui of loops beyond rcutoff_elastic by a Barnes-Hut tree, None for ui truncated at rcutoff_elastic.
+         36. self.pair_ledger, U_ij of neighbouring pairs kept by handles and ui changed by differences, None for summing all neighbours.
+         37. self.elastic_kernel, U_ij of disks and spheres over numpy arrays of pairs, None for DefectObject.return_u_neighbour( ).
         '''
 
         tmp_ConstNumber = ConstNumber( jdata )
@@ -109,6 +137,9 @@ class DefectSystem( object ) :
                 '''
                 self.defectObject_list = defectObjectStr_list
 
+        'set 26.self.defect_store.'
+        self.defect_store = DefectStore( jdata, self.defectObject_list )
+
         ( in_box, delta_l ) = self.return_judge_in_box( jdata, self.max_box_int )
 
         for j in range( 3 ) :
@@ -118,7 +149,8 @@ class DefectSystem( object ) :
         self.remap_defectSystem( jdata )
 
         'very important ! set 12.self.linkcell after ( self.remap_defectSystem: position, position_scale, position_image_int ) has been set.'
-        self.linkcell = BoxLinkcell( jdata, self.defectObject_list )
+        'Class MultiLinkcell with levels of defectObject sizes according to jdata[ "linkcell_level_space" ], otherwise Class BoxLinkcell or SparseLinkcell by jdata[ "linkcell_backend" ].'
+        self.linkcell = create_linkcell( jdata, self.defectObject_list, self.defect_store.position_scale )
 
         '''
         'Test_cgzhang, the default value is set to True. when detecting delete-, add-, sub- defectObject, set False.'
@@ -129,6 +161,58 @@ class DefectSystem( object ) :
         self.initial_recombine = True
         if j_have( jdata, 'initial_recombine' ) : self.initial_recombine = jdata[ 'initial_recombine' ]
 
+        'set 25.self.next_handle, a handle is never used again after its defectObject is deleted.'
+        self.next_handle = 0
+
+        'set 27.self.rate_table according to jdata[ "rate_table" ].'
+        self.rate_table = create_rate_table( jdata )
+
+        'set 28.self.random_stream.'
+        self.random_stream = random_stream
+        if self.random_stream is None : self.random_stream = create_random_stream( jdata )
+
+        'set 29.self.superbasin according to jdata[ "superbasin" ].'
+        self.superbasin = create_superbasin( jdata )
+
+        'set 30.self.first_passage according to jdata[ "first_passage" ].'
+        self.first_passage = create_first_passage( jdata )
+
+        'set 31.self.long_glide according to jdata[ "long_glide" ].'
+        self.long_glide = create_long_glide( jdata )
+
+        'set 32.self.frozen_handle_set, no frozen defectObject.'
+        self.frozen_handle_set = set( )
+
+        'set 33.self.neighbour_list according to jdata[ "neighbour_skin" ].'
+        self.neighbour_list = create_neighbour_list( jdata )
+
+        if self.neighbour_list != None and ( self.first_passage != None or self.long_glide != None ) :
+            raise RuntimeError( 'neighbour_skin with first_passage or long_glide, wrong !' )
+
+        'first_passage, long_glide and neighbour_skin take 27 cells of one cell length, not the levels of MultiLinkcell.'
+        if j_have( jdata, 'linkcell_level_space' ) and ( self.neighbour_list != None or self.first_passage != None or self.long_glide != None ) :
+            raise RuntimeError( 'linkcell_level_space with neighbour_skin, first_passage or long_glide, wrong !' )
+
+        'set 34.self.kdtree_neighbour according to jdata[ "neighbour_backend" ].'
+        self.kdtree_neighbour = create_kdtree_neighbour( jdata )
+
+        'set 35.self.elastic_far_field according to jdata[ "elastic_far_cutoff" ].'
+        self.elastic_far_field = create_elastic_far_field( jdata )
+
+        'long glides are taken by defectObjects with ui eq 0, far loops make ui of every loop nonzero.'
+        if self.elastic_far_field != None and self.long_glide != None :
+            raise RuntimeError( 'elastic_far_cutoff with long_glide, wrong !' )
+
+        'set 36.self.pair_ledger according to jdata[ "elastic_pair_ledger" ].'
+        self.pair_ledger = create_pair_ledger( jdata )
+
+        'set 37.self.elastic_kernel according to jdata[ "elastic_kernel" ].'
+        self.elastic_kernel = create_elastic_kernel( jdata )
+
+        'U_ij of two loops is continuous at rcutoff_elastic only if the near field is the dipole model of the far field.'
+        if self.elastic_far_field != None and self.elastic_kernel == None :
+            raise RuntimeError( 'elastic_far_cutoff without elastic_kernel dipole, wrong !' )
+
         'set related properties according to initial recombine or not.'
         self.set_initial_recombine_and_related_properties( jdata, tmp_ConstNumber )
 
@@ -137,12 +221,13 @@ class DefectSystem( object ) :
                                                       tmp_ConstNumber ) :
         '''
         set related properties, such as :
-        14. self.total_defects, 15. self.sum_numb_actions_list,
+        14. self.total_defects, 15. self.numb_actions_list and self.width_rate_array,
         reset 12. self.linkcell,
         16. self.ui_array, 17. utotal,
         18. self.rate_array, 19. self.size_rate_array, 
-        20. self.sum_rate_array, 21. self.sum_rate, 
-        22. self.delta_time, 23. self.which_defect, 24. self.what_action.
+        20. self.rate_catalog, 21. self.sum_rate, 
+        22. self.delta_time, 23. self.which_defect, 24. self.what_action,
+        25. self.handle_list, self.index_of_handle.
         '''
 
         if self.initial_recombine : 
@@ -160,8 +245,8 @@ class DefectSystem( object ) :
         'set 14.self.total_defects.'
         self.set_total_defects( )
 
-        'set 15.self.sum_numb_actions_list.'
-        self.set_sum_numb_actions_list( )
+        'set 15.self.numb_actions_list, self.width_rate_array.'
+        self.set_numb_actions_list( jdata )
 
         '''
         'Test_cgzhang, set geometric center of defect system to the center of tmp_box for self.individual_cascade==True.
@@ -180,7 +265,13 @@ class DefectSystem( object ) :
         self.remap_defectSystem( jdata )
 
         'very important ! reset 12.self.linkcell after ( self.remap_defectSystem: position, position_scale, position_image_int ) has been set.'
-        self.linkcell.linked( self.defectObject_list )
+        self.linkcell.linked( self.defectObject_list, self.defect_store.position_scale )
+
+        'set 25.self.handle_list, self.index_of_handle.'
+        self.set_handle_list( )
+
+        'set 33.self.neighbour_list after 12.self.linkcell and 25.self.handle_list.'
+        self.set_neighbour_list( )
 
         'set 16.ui_array for every defectObject and 17.self.utotal for defectSystem, including elastic energy and others.'
         self.set_ui_and_utotal( jdata, tmp_ConstNumber )
@@ -188,11 +279,13 @@ class DefectSystem( object ) :
         'set 18.self.rate_array, 19.self.size_rate_array.'
         self.set_rate_array( jdata )
 
-        'set 20.self.sum_rate_array, 21.self.sum_rate.'
-        self.sum_rate_array = np.zeros( self.size_rate_array )
-        self.set_sum_rate_array( )
+        'set 20.self.rate_catalog according to kmc_selector, 21.self.sum_rate.'
+        'self.rate_catalog covers the whole self.rate_buffer, the rates beyond self.size_rate_array are zero.'
+        self.rate_catalog = create_rate_catalog( jdata, self.rate_buffer.return_buffer( ), self.random_stream )
+        self.set_sum_rate( )
 
         'set 22.self.delta_time, 23.self.which_defect, 24.self.what_action.'
+        if self.superbasin != None : self.superbasin.clear( )
         self.set_which_defect_action( )
 
     def set_initial_recombine( self, jdata ) :
@@ -205,9 +298,17 @@ class DefectSystem( object ) :
         indicate = np.zeros( self.numb_defectObject, dtype = np.int32 )
         recombine_results_list = [ ]
 
+        'candidates of all defectObjects by one call of 34.self.kdtree_neighbour, otherwise in 27 cells of every defectObject.'
+        kdtree_index_list = None
+        if self.kdtree_neighbour != None : kdtree_index_list = self.kdtree_neighbour.return_neighbour_index_list( self.defect_store.position )
+
         for i in range( self.numb_defectObject ) :
             if indicate[ i ] == 1 : continue
-            index_list = self.return_27_cells_index_list( jdata, i )
+
+            if kdtree_index_list != None :
+                index_list = kdtree_index_list[ i ]
+            else :
+                index_list = self.return_27_cells_index_list( jdata, i )
         
             for j in index_list :
                 if indicate[ j ] == 1 : continue
@@ -246,11 +347,41 @@ class DefectSystem( object ) :
         
         'reset 9.self.numb_defectObject.'
         self.numb_defectObject = len( self.defectObject_list )
+
+        'reset self.defect_store for the new self.defectObject_list.'
+        self.defect_store.reset( self.defectObject_list )
         
         self.remap_defectSystem( jdata )
         
         'very important ! reset 10.self.linkcell after ( self.remap_defectSystem: position, position_scale, position_image_int ) has been set.'
-        self.linkcell.linked( self.defectObject_list )
+        self.linkcell.linked( self.defectObject_list, self.defect_store.position_scale )
+
+    def set_handle_list( self ) :
+        '''
+        set a stable handle for every defectObject, self.handle_list[ index ] is the handle of self.defectObject_list[ index ]
+        and self.index_of_handle[ handle ] is index. The index of a defectObject changes when another one is deleted by 
+        swapping with the last one, its handle does not change until it is deleted.
+        '''
+
+        self.handle_list = list( range( self.next_handle, self.next_handle + self.numb_defectObject ) )
+        self.next_handle += self.numb_defectObject
+
+        self.index_of_handle = { handle : index for ( index, handle ) in enumerate( self.handle_list ) }
+
+    def set_neighbour_list( self ) :
+        'build 33.self.neighbour_list for all defectObjects from 12.self.linkcell.'
+
+        if self.neighbour_list == None : return
+
+        self.neighbour_list.build( self.defect_store, self.handle_list, self._return_cells_index_list )
+
+    def return_index_handle( self, handle ) :
+        'return the index in self.defectObject_list of the defectObject with handle.'
+
+        if handle not in self.index_of_handle :
+            raise RuntimeError( 'handle %d is not in defectSystem, it may be deleted, wrong !' % handle )
+
+        return self.index_of_handle[ handle ]
 
     def set_ui_and_utotal( self, 
                            jdata, 
@@ -262,34 +393,213 @@ class DefectSystem( object ) :
         '''
 
         self.utotal = 0.0
-        self.ui_array = np.zeros( self.numb_defectObject, dtype = np.float64 )
+        self.ui_buffer = GrowableArray( np.zeros( self.numb_defectObject, dtype = np.float64 ) )
+        self.ui_array = self.ui_buffer.return_array( )
 
         if not self.having_elastic_interaction : return
 
+        'ui_far of all loops by one tree, then taken by self.return_ui_index( ).'
+        if self.elastic_far_field != None : self.elastic_far_field.refresh( self.defect_store, self.handle_list, tmp_ConstNumber )
+
+        'the bulk path, every pair is evaluated once by 37.self.elastic_kernel over numpy arrays.'
+        if self.elastic_kernel != None :
+            self.set_ui_and_utotal_bulk( jdata, tmp_ConstNumber )
+            return
+
+        'every pair of neighbours is taken once by 36.self.pair_ledger, U_ij and U_ji are both evaluated.'
+        if self.pair_ledger != None :
+            self.pair_ledger.build( self.handle_list, lambda index : self.return_27_cells_index_list( jdata, index ), self._return_pair_u_function( jdata, tmp_ConstNumber ) )
+
         for index in range( self.numb_defectObject ) :
-            ui = self.return_ui_index( jdata, tmp_ConstNumber, index )
+            ui = self._return_ui_ledger_index( jdata, tmp_ConstNumber, index )
             self.ui_array[ index ] = ui
             self.utotal = self.utotal + ui
 
+    def set_ui_and_utotal_bulk( self,
+                                jdata,
+                                tmp_ConstNumber ) :
+        '''
+        set ui and utotal by 37.self.elastic_kernel :
+         a. pairs within rcutoff_elastic are enumerated once, by 34.self.kdtree_neighbour or by cells of 12.self.linkcell,
+         b. U_ij of all pairs are evaluated over numpy arrays, and scattered into both ui by np.add.at,
+         c. U_ij are kept by 36.self.pair_ledger, and ui_far of 35.self.elastic_far_field is added,
+         d. a few disk-disk and sphere-disk pairs are compared with DefectObject.return_u_neighbour( ) by self._check_elastic_kernel( ).
+        '''
+
+        pair_array = self.return_pair_array( jdata )
+
+        self._check_elastic_kernel( jdata, tmp_ConstNumber, pair_array )
+
+        ( ui_array, u_array ) = self.elastic_kernel.return_ui_array( self.defect_store, tmp_ConstNumber, pair_array, self.numb_defectObject )
+
+        'U_ij of 37.self.elastic_kernel is symmetric, U_ji = U_ij.'
+        if self.pair_ledger != None : self.pair_ledger.set_pair_array( self.handle_list, pair_array, u_array )
+
+        if self.elastic_far_field != None :
+            ui_array += np.array( [ self.elastic_far_field.return_ui_far( self.defect_store, self.handle_list, index, tmp_ConstNumber ) for index in range( self.numb_defectObject ) ], dtype = np.float64 )
+
+        self.ui_array[ : ] = ui_array
+        self.utotal = float( np.sum( ui_array ) )
+
+    def _check_elastic_kernel( self,
+                               jdata,
+                               tmp_ConstNumber,
+                               pair_array       ) :
+        '''
+        compare U_ij of 37.self.elastic_kernel with DefectObject.return_u_neighbour( ) on jdata[ 'elastic_kernel_check' ] pairs of disk-disk and of sphere-disk,
+        16 by default, 0 for no check, they must agree within jdata[ 'elastic_kernel_tolerance' ] of the largest | U_ij |, 1.0E-3 by default.
+        '''
+
+        numb_check = 16
+        if j_have( jdata, 'elastic_kernel_check' ) : numb_check = jdata[ 'elastic_kernel_check' ]
+
+        tolerance = 1.0E-3
+        if j_have( jdata, 'elastic_kernel_tolerance' ) : tolerance = jdata[ 'elastic_kernel_tolerance' ]
+
+        check_array = self.elastic_kernel.return_check_pair_array( self.defect_store, tmp_ConstNumber, pair_array, numb_check )
+        if len( check_array ) == 0 : return
+
+        u_array = self.elastic_kernel.return_pair_energy_array( self.defect_store, tmp_ConstNumber, check_array[ :, 0 ], check_array[ :, 1 ] )
+
+        real_u_array = np.array( [ self.defectObject_list[ index ].return_u_neighbour( jdata, tmp_ConstNumber, [ self.defectObject_list[ index_j ] ] )
+                                   for ( index, index_j ) in check_array.tolist( ) ], dtype = np.float64 )
+
+        if np.any( np.abs( u_array - real_u_array ) > tolerance * np.max( np.abs( real_u_array ) ) ) :
+            raise RuntimeError( 'U_ij of elastic_kernel dipole differ from DefectObject.return_u_neighbour( ), set elastic_relaxation_volume or use elastic_kernel tungsten, wrong !' )
+
+    def return_pair_array( self, jdata ) :
+        '''
+        return all pairs [ i, j ] with i .lt. j of neighbouring defectObjects, array( numb_pair x 2 ), every pair once :
+         a. pairs within rcutoff_elastic by one call of 34.self.kdtree_neighbour,
+         b. otherwise indexes in 27 cells are collected once for every cell and level of 12.self.linkcell, shared by defectObjects in this cell,
+            pairs found from both defectObjects are taken once.
+        '''
+
+        if self.kdtree_neighbour != None :
+            return self.kdtree_neighbour.return_pair_array( self.defect_store.position, j_must_have( jdata, 'rcutoff_elastic' ) )
+
+        cells_index_dict = { }
+
+        for ( index, tmp_defectObject ) in enumerate( self.defectObject_list ) :
+            cells_index_dict.setdefault( self.linkcell.return_cells_key_defectObject( tmp_defectObject ), [ ] ).append( index )
+
+        code_list = [ np.zeros( 0, dtype = np.int64 ) ]
+
+        for index_list in cells_index_dict.values( ) :
+
+            cells_index_array = np.array( self.linkcell.return_27_cells_index_list_defectObject( self.defectObject_list[ index_list[ 0 ] ] ), dtype = np.int64 )
+
+            row_array = np.repeat( np.array( index_list, dtype = np.int64 ), len( cells_index_array ) )
+            column_array = np.tile( cells_index_array, len( index_list ) )
+
+            keep = row_array != column_array
+
+            code_list.append( np.minimum( row_array[ keep ], column_array[ keep ] ) * self.numb_defectObject + np.maximum( row_array[ keep ], column_array[ keep ] ) )
+
+        code_array = np.unique( np.concatenate( code_list ) )
+
+        return np.stack( ( code_array // self.numb_defectObject, code_array % self.numb_defectObject ), axis = 1 )
+
+    def _return_u_neighbour_index( self,
+                                   jdata,
+                                   tmp_ConstNumber,
+                                   index,
+                                   index_list       ) :
+        'return sigma_( j ) U_elastic_( ij ) of index over index_list, by 37.self.elastic_kernel or DefectObject.return_u_neighbour( ).'
+
+        if self.elastic_kernel != None : return self.elastic_kernel.return_u_neighbour( self.defect_store, tmp_ConstNumber, index, index_list )
+
+        return self.defectObject_list[ index ].return_u_neighbour( jdata, tmp_ConstNumber, self.return_defectObject_list_from_index( index_list ) )
+
+    def _return_pair_u_function( self,
+                                 jdata,
+                                 tmp_ConstNumber ) :
+        'return the function ( index, index_j ) -> U_elastic_( ij ) for 36.self.pair_ledger.'
+
+        return lambda index, index_j : self._return_u_neighbour_index( jdata, tmp_ConstNumber, index, [ index_j ] )
+
+    def _return_ui_ledger_index( self,
+                                 jdata,
+                                 tmp_ConstNumber,
+                                 index           ) :
+        'return ui of index kept by 36.self.pair_ledger and ui_far of 35.self.elastic_far_field, or by self.return_ui_index( ) without the ledger.'
+
+        if self.pair_ledger == None : return self.return_ui_index( jdata, tmp_ConstNumber, index )
+
+        ui = self.pair_ledger.return_ui( self.handle_list[ index ] )
+
+        if self.elastic_far_field != None : ui += self.elastic_far_field.return_ui_far( self.defect_store, self.handle_list, index, tmp_ConstNumber )
+
+        return ui
+
+    def _update_pair_ledger_index_list( self,
+                                        jdata,
+                                        tmp_ConstNumber,
+                                        index_list       ) :
+        'evaluate pairs of index_list in 36.self.pair_ledger again after they are substituted or added, O( k ) for k neighbours.'
+
+        if self.pair_ledger == None or not self.having_elastic_interaction : return
+
+        pair_u_function = self._return_pair_u_function( jdata, tmp_ConstNumber )
+
+        for index in index_list :
+            self.pair_ledger.update( self.handle_list[ index ], self.handle_list, index, self.return_27_cells_index_list( jdata, index ), pair_u_function )
+
     def set_total_defects( self ) :
         'compute total point defects.'
 
-        self.total_defects = { 'I' : 0, 'V': 0 }
+        self.total_defects = self.defect_store.return_total_defects( )
 
-        for item in self.defectObject_list :
-            IV = item.defecttype[ 0 ]
-            self.total_defects[ IV ] = self.total_defects[ IV ] + item.nsize
+    def set_numb_actions_list( self, jdata ) :
+        '''
+        set self.numb_actions_list and self.width_rate_array.
+        Every defectObject owns a slot of self.width_rate_array actions in self.rate_array,
+        i.e. self.rate_array is the flattened matrix ( self.numb_defectObject x self.width_rate_array ) padded with zero rates.
+        self.width_rate_array is the maximum number of actions, not less than jdata[ 'max_numb_actions' ] if it is provided.
+        '''
+
+        self.numb_actions_list = [ item.return_numb_actions( ) for item in self.defectObject_list ]
+
+        self.width_rate_array = max( self.numb_actions_list + [ 1 ] )
+        if j_have( jdata, 'max_numb_actions' ) : self.width_rate_array = max( self.width_rate_array, jdata[ 'max_numb_actions' ] )
+
+    def _reset_width_rate_array( self, width ) :
+        '''
+        enlarge self.width_rate_array to width when a defectObject has more actions than self.width_rate_array, 
+        copy rates into the new slots and rebuild self.rate_catalog, events keep their firing times of the next reaction method.
+        '''
+
+        numb_slot = self.rate_array.size // self.width_rate_array
+
+        rate_matrix = np.zeros( ( numb_slot, width ), dtype = np.float64 )
+        rate_matrix[ :, : self.width_rate_array ] = self.rate_array.reshape( ( numb_slot, self.width_rate_array ) )
+
+        'the old index of every event in the new slots, -1 for a new action.'
+        keep_index_matrix = -np.ones( ( numb_slot, width ), dtype = np.int64 )
+        keep_index_matrix[ :, : self.width_rate_array ] = np.arange( numb_slot * self.width_rate_array ).reshape( ( numb_slot, self.width_rate_array ) )
+
+        self.width_rate_array = width
+
+        self.rate_buffer.reset( rate_matrix.reshape( -1 ) )
+        self.reset_array_views( )
+
+        self.rate_catalog.build( self.rate_buffer.return_buffer( ), keep_index_matrix.reshape( -1 ) )
 
-    def set_sum_numb_actions_list( self ) :
-        'set self.sum_numb_actions_list.'
+    def reset_array_views( self ) :
+        '''
+        reset self.ui_array, self.rate_array as views of self.ui_buffer, self.rate_buffer and self.size_rate_array,
+        must be called after every append, delete or reset of the buffers.
+        '''
 
-        self.sum_numb_actions_list = [ ]
+        self.ui_array = self.ui_buffer.return_array( )
+
+        self.rate_array = self.rate_buffer.return_array( )
+        self.size_rate_array = self.rate_array.size
 
-        tmp_sum = 0
+    def return_rate_matrix( self ) :
+        'return the view of self.rate_array as matrix ( self.numb_defectObject x self.width_rate_array ).'
 
-        for item in self.defectObject_list :
-            tmp_sum += item.return_numb_actions( )
-            self.sum_numb_actions_list.append( tmp_sum )
+        return self.rate_array.reshape( ( -1, self.width_rate_array ) )
 
     def _return_m_n( self, index ) :
         'return ( m, n ), m : which_defect, n : what_action, index in rate_array.'
@@ -297,21 +607,22 @@ class DefectSystem( object ) :
         if index < 0 or index >= self.size_rate_array :
             raise RuntimeError( 'defectObject index: %d is not in range [ 0, %d ]' %( index, self.size_rate_array ) )
 
-        if self.sum_numb_actions_list[ 0 ] > index : return ( 0, index )
+        ( m, n ) = divmod( int( index ), self.width_rate_array )
 
-        for i in range( 1, self.numb_defectObject ) :
-            if self.sum_numb_actions_list[ i ] > index :
-                return ( i, index - self.sum_numb_actions_list[ i - 1 ] )
+        if n >= self.numb_actions_list[ m ] :
+            raise RuntimeError( 'action %d of defectObject %d is a padded action, wrong !' % ( n, m ) )
+
+        return ( m, n )
 
     def _return_begin_end_index( self, index_defectObject ) :
-        'return begin index and end index in rate array, index_defectObject in self.defectObject_list.'
+        'return begin index and end index of actions in rate array, index_defectObject in self.defectObject_list.'
 
         if index_defectObject < 0 or index_defectObject >= self.numb_defectObject :
             raise RuntimeError( 'defectObject index is out of range [ 0, %d ]' %( self.numb_defectObject ) )
 
-        if index_defectObject == 0 : return ( 0, self.sum_numb_actions_list[ 0 ] )
+        begin_index = index_defectObject * self.width_rate_array
 
-        return ( self.sum_numb_actions_list[ index_defectObject - 1 ], self.sum_numb_actions_list[ index_defectObject ] )
+        return ( begin_index, begin_index + self.numb_actions_list[ index_defectObject ] )
 
     def return_rate_defectObject( self, 
                                   jdata, 
@@ -321,10 +632,53 @@ class DefectSystem( object ) :
         index_list = self.return_27_cells_index_list( jdata, index )
         defectObject_list_27_cells = self.return_defectObject_list_from_index( index_list )
 
-        rate_defectObject = self.defectObject_list[ index ].return_rate( jdata, self.temperature_evolution, self.ui_array[ index ], defectObject_list_27_cells )
+        rate_defectObject = self._return_rate_neighbour( jdata, index, self.ui_array[ index ], defectObject_list_27_cells )
 
         return rate_defectObject
 
+    def _return_rate_neighbour( self, 
+                                jdata, 
+                                index,
+                                ui,
+                                neighbour_list ) :
+        '''
+        return rate of defectObject with index, ui and neighbour_list, by 27.self.rate_table if it is set.
+        rates of a first-passage jump are returned when 30.self.first_passage gives a protective sphere,
+        otherwise rates of long glides are returned when 31.self.long_glide gives a glide segment.
+        zero rates are returned for a frozen defectObject in 32.self.frozen_handle_set.
+        '''
+
+        if len( self.frozen_handle_set ) != 0 and self.handle_list[ index ] in self.frozen_handle_set :
+            return [ 0.0 ] * self.numb_actions_list[ index ]
+
+        if self.rate_table is None :
+            rate_defectObject = self.defectObject_list[ index ].return_rate( jdata, self.temperature_evolution, ui, neighbour_list )
+        else :
+            rate_defectObject = self.rate_table.return_rate( jdata, self.defectObject_list[ index ], self.temperature_evolution, ui, neighbour_list )
+
+        if self.first_passage != None :
+            radius = self._return_first_passage_radius( index, neighbour_list )
+            if radius > 0.0 : return self.first_passage.return_rate( rate_defectObject, radius )
+
+        if self.long_glide != None and ui == 0.0 :
+            length = self._return_long_glide_length( index, neighbour_list )
+            if length > 0.0 : rate_defectObject = self.long_glide.return_rate( self.defectObject_list[ index ], rate_defectObject, length )
+
+        return rate_defectObject
+
+    def _return_first_passage_radius( self, 
+                                      index,
+                                      neighbour_list ) :
+        'return the radius of the protective sphere of index, 0.0 for hopping one jump, i.e. neighbour_list in 27 cells is not empty.'
+
+        if len( neighbour_list ) != 0 : return 0.0
+
+        tmp_defectObject = self.defectObject_list[ index ]
+
+        cell_index = self.linkcell.return_cell_index_defectObject( tmp_defectObject )
+
+        return self.first_passage.return_radius( tmp_defectObject, cell_index, self.box / self.linkcell.fnlc_vector )
+
     def return_rate_defectObject_test( self, 
                                        jdata, 
                                        index  ) :
@@ -344,21 +698,85 @@ class DefectSystem( object ) :
 
         ( begin_index, end_index ) = self._return_begin_end_index( index )
 
-        rate_array_defectObject = np.array( self.return_rate_defectObject( jdata, index ) )
+        'the whole slot is set, padded actions with zero rate.'
+        rate_array_defectObject = np.zeros( self.width_rate_array, dtype = np.float64 )
+        rate_array_defectObject[ : end_index - begin_index ] = self.return_rate_defectObject( jdata, index )
 
-        self.rate_array[ begin_index : end_index ] = rate_array_defectObject
+        'self.rate_catalog shares self.rate_array, rates are written into self.rate_array here.'
+        self.rate_catalog.set_rates( begin_index, rate_array_defectObject )
    
+    def set_ui_rate_index_list( self, 
+                                jdata, 
+                                tmp_ConstNumber,
+                                index_list       ) :
+        '''
+        reset ui, utotal and rates of all defectObjects in index_list in one pass :
+         a. the index list in 27 cells is collected once for every cell and shared by the defectObjects in this cell,
+            for every cell and level with Class MultiLinkcell,
+            or taken from 33.self.neighbour_list, the same neighbours are used for ui and rates.
+         b. rates are collected in the matrix ( len( index_list ) x self.width_rate_array ), padded with zero rates,
+            and set by self.rate_catalog.set_rates_list( ) at once.
+        ui and rates themselves are still evaluated per defectObject, by self._return_u_neighbour_index( ) and
+        self._return_rate_neighbour( ), since DefectObject.return_rate( ) of tungsten takes one defectObject and its neighbours,
+        only the neighbour search and the update of self.rate_catalog are shared, 27.self.rate_table saves repeated isolated rates.
+        '''
+
+        'delete repeated indexes, keep the order.'
+        index_list = list( dict.fromkeys( index_list ) )
+
+        if len( index_list ) == 0 : return
+
+        cells_index_dict = { }
+        rate_matrix = np.zeros( ( len( index_list ), self.width_rate_array ), dtype = np.float64 )
+
+        for ( k, index ) in enumerate( index_list ) :
+
+            tmp_defectObject = self.defectObject_list[ index ]
+
+            if self.neighbour_list != None and self.neighbour_list.active :
+                neighbour_index_list = self.return_27_cells_index_list( jdata, index )
+            else :
+                'defectObjects with the same key, i.e. cell and level of MultiLinkcell, share the index list.'
+                key = self.linkcell.return_cells_key_defectObject( tmp_defectObject )
+
+                if key not in cells_index_dict : cells_index_dict[ key ] = self.linkcell.return_27_cells_index_list_defectObject( tmp_defectObject )
+
+                neighbour_index_list = self._return_neighbour_index_list( cells_index_dict[ key ], index )
+
+            neighbour_list = self.return_defectObject_list_from_index( neighbour_index_list )
+
+            'reset 14.self.ui_array and 15.self.utotal, here ui = 0.5 * sigma_( j != i )^N U_elastic_( ij ).'
+            ui = 0.0
+            if self.having_elastic_interaction and self.pair_ledger != None :
+                'ui kept by 36.self.pair_ledger, no pair is evaluated here.'
+                ui = self.pair_ledger.return_ui( self.handle_list[ index ] )
+            elif self.having_elastic_interaction :
+                ui = 0.5 * self._return_u_neighbour_index( jdata, tmp_ConstNumber, index, neighbour_index_list )
+
+            'ui of far loops of the last refresh of 35.self.elastic_far_field.'
+            if self.having_elastic_interaction and self.elastic_far_field != None : ui += self.elastic_far_field.return_ui_far( self.defect_store, self.handle_list, index, tmp_ConstNumber )
+
+            self.utotal = self.utotal + ui - self.ui_array[ index ]
+            self.ui_array[ index ] = ui
+
+            rate_defectObject = self._return_rate_neighbour( jdata, index, ui, neighbour_list )
+            rate_matrix[ k, : len( rate_defectObject ) ] = rate_defectObject
+
+        'reset 16.self.rate_array and 18.self.rate_catalog.'
+        self.rate_catalog.set_rates_list( np.array( index_list, dtype = np.int64 ) * self.width_rate_array, rate_matrix )
+
     def set_rate_array( self, jdata ) :
         'set rate array for all defectObject in self.defectObject_list.'
 
-        rate_list = [ ]
+        self.rate_buffer = GrowableArray( np.zeros( self.numb_defectObject * self.width_rate_array, dtype = np.float64 ) )
+        self.rate_array = self.rate_buffer.return_array( )
+        self.size_rate_array = self.rate_array.size
+
+        rate_matrix = self.return_rate_matrix( )
 
         for i in range( self.numb_defectObject ) :
             rate_defectObject = self.return_rate_defectObject( jdata, i )
-            rate_list.extend( rate_defectObject )
-
-        self.rate_array = np.array( rate_list )
-        self.size_rate_array = self.rate_array.size
+            rate_matrix[ i, : len( rate_defectObject ) ] = rate_defectObject
 
         ''' 
         'Test_cgzhang, for detecting self.rate_array.'
@@ -366,36 +784,18 @@ class DefectSystem( object ) :
         print( '# ( self.rate_array, self.size_rate_array ): ', ( self.rate_array, self.size_rate_array ) )   
         '''
 
-    def set_sum_rate_array( self, 
-                            begin_index_of_defectObject = 0 ) :
+    def set_sum_rate( self ) :
         '''
-        set self.sum_rate_array and self.sum_rate.
-        a. if self.numb_defectObject == 0, self.sum_rate_array=np.array([]), self.sum_rate = 0.0.
-        b. if self.numb_defectObject != 0, set these two properties from begin_index_of_sum_rate_array to the end index of sum_rate_array.
+        set self.sum_rate from self.rate_catalog.
+        a. if self.numb_defectObject == 0, self.sum_rate = 0.0.
+        b. if self.numb_defectObject != 0, self.sum_rate = sum( self.rate_array ) in O( log M ), M = self.size_rate_array.
         '''
 
         if self.numb_defectObject == 0 :
-            self.sum_rate_array = np.array( [ ] )
             self.sum_rate = 0.0
             return
 
-        if begin_index_of_defectObject == 0 : 
-            self.sum_rate_array[ -1 ] = 0.0
-            begin_index_of_sum_rate_array = 0
-        else :
-            begin_index_of_sum_rate_array = self.sum_numb_actions_list[ begin_index_of_defectObject - 1 ]
-
-        for i in range( begin_index_of_sum_rate_array, self.size_rate_array ) :
-            self.sum_rate_array[ i ] = self.sum_rate_array[ i - 1 ] + self.rate_array[ i ]
-
-        self.sum_rate = self.sum_rate_array[ -1 ]
-
-        '''
-        'Test_cgzhang, for detecting self.sum_rate_array.'
-        print( '# efficiency:', begin_index_of_sum_rate_array / self.size_rate_array )
-        print( '# set_sum_rate_array' )
-        print( '# ( self.sum_rate_array, self.sum_rate ):', ( self.sum_rate_array, self.sum_rate ) )   
-        '''
+        self.sum_rate = self.rate_catalog.return_sum_rate( )
 
     def set_which_defect_action( self ) :
         '''
@@ -410,63 +810,143 @@ class DefectSystem( object ) :
         np.random.seed( seed )
         '''
 
-        if self.numb_defectObject == 0 :
+        if self.numb_defectObject == 0 or self.sum_rate <= 0.0 :
+            'no event, e.g. all defectObjects are frozen.'
             self.which_defect = -1
             self.what_action = -1
             self.delta_time = +math.inf
             return
 
+        if isinstance( self.rate_catalog, NextReactionCatalog ) :
+            'the next reaction method, the event firing first is selected, no random number is drawn.'
+            ( index, tau ) = self.rate_catalog.return_next( )
+            ( self.which_defect, self.what_action ) = self._return_m_n( index )
+            self.delta_time = tau - self.rate_catalog.c_time
+            return
+
+        '''
+        'Another Algorithm :'
+
         kesi_1 = np.random.rand( ) * self.sum_rate
+        sum_rate_array = np.cumsum( self.rate_array )
+        ( self.which_defect, self.what_action ) = self._return_m_n( np.searchsorted( sum_rate_array, kesi_1 ) )
+        '''
+
+        'select the event with probability rate / self.sum_rate, by the tree or the composition-rejection of self.rate_catalog.'
+        index = self.rate_catalog.select_index( self.sum_rate, self.random_stream )
 
-        kesi_2 = np.random.rand( )
-        self.delta_time = -math.log( kesi_2, math.e ) / self.sum_rate
+        'padded actions have zero rate, they are selected only due to rounding errors, select again.'
+        while self.rate_catalog.rate_array[ index ] == 0.0 : index = self.rate_catalog.select_index( self.sum_rate, self.random_stream )
 
+        ( self.which_defect, self.what_action ) = self._return_m_n( index )
+
+        'delta_time = -log( kesi_2 ) / self.sum_rate, kesi_2 in ( 0, 1 ], i.e. a standard exponential variate.'
+        self.delta_time = self.random_stream.exponential( ) / self.sum_rate
+
+    def _return_unwrap_position( self, index ) :
+        'return the position of index without periodic images.'
+
+        return self.defect_store.position[ index ] + self.defect_store.position_image_int[ index ] * self.box
+
+    def set_which_defect_action_superbasin( self, jdata ) :
+        '''
+        set self.which_defect, self.what_action and self.delta_time as self.set_which_defect_action( ),
+        and take superbasin exits by self.superbasin, after the same defectObject flickers between two states
+        A and B self.superbasin.min_flicker times in a row :
+         a. self.delta_time is the time of all visits of A and B before the exit,
+         b. exit from B, the internal event A -> B takes place here without time,
+         c. the exit event is selected among the events of the exit state except the internal one.
+        the visits sampled at once are not counted in self.c_step.
         '''
-        'Another Algorithm :'
 
-        for i in range( self.size_rate_array ) :
-            if self.sum_rate_array[ i ] >= kesi_1 :
-                ( self.which_defect, self.what_action ) = self._return_m_n( i )
+        if self.numb_defectObject == 0 :
+            self.set_which_defect_action( )
+            return
 
-                'Test_cgzhang, for detecting this algorithm.'
-                which_defect_1, what_action_1 = self._return_m_n( i )
-                #print( '# set_which_defect_action real:' )
-                #print( '# end_i real:', i )
-                #print( '# ( kesi_1, self.delta_time ): ', ( kesi_1, self.delta_time ) )
-                #print( '# ( self.which_defect, self.what_action ): ', ( self.which_defect, self.what_action ) )
+        handle = self.superbasin.return_handle( )
 
-                break
-        '''        
+        position = None
+        if handle in self.index_of_handle : position = self._return_unwrap_position( self.index_of_handle[ handle ] )
 
-        if kesi_1 <= self.sum_rate_array[ 0 ] :
-            self.which_defect = 0
-            self.what_action = 0
-        else :
-            begin_i = 0
-            end_i = self.size_rate_array - 1
-       
-            while True :
-                half_i = int( 0.5 * ( begin_i + end_i ) )
-                half = self.sum_rate_array[ half_i ]
-       
-                if begin_i == half_i :
-                    ( self.which_defect, self.what_action ) = self._return_m_n( end_i )
+        if self.superbasin.judge_flicker( self.c_step, self.numb_defectObject, position ) :
+            if self._set_superbasin_exit( jdata, handle ) : return
 
-                    'Test_cgzhang, for detecting this algorithm.'
-                    #which_defect_2, what_action_2 = self._return_m_n( end_i )
+        self.set_which_defect_action( )
 
-                    #if not judge_equal( which_defect_1, which_defect_2, 1.0E-3 ) : print( '# which_defect not equal!' )
-                    #if not judge_equal( what_action_1, what_action_2, 1.0E-3 ) : print( '# what_action not equal!' )
+        index = self.which_defect * self.width_rate_array + self.what_action
 
-                    #print( '# end_i:', end_i )
-                    #print( '# ( kesi_1, self.delta_time ): ', ( kesi_1, self.delta_time ) )
-                    #print( '# ( self.which_defect, self.what_action ): ', ( self.which_defect, self.what_action ) )
-                   
-                    'return is important!' 
-                    return
-       
-                if kesi_1 >  half : begin_i = half_i
-                if kesi_1 <= half : end_i = half_i
+        self.superbasin.record( self.c_step, self.handle_list[ self.which_defect ], self.what_action, 
+                                self._return_unwrap_position( self.which_defect ), self.numb_defectObject, 
+                                self.sum_rate, self.rate_array[ index ] )
+
+    def _set_superbasin_exit( self, 
+                              jdata, 
+                              handle ) :
+        'return True after self.which_defect, self.what_action and self.delta_time are set by the superbasin exit.'
+
+        ( record_A, record_B ) = self.superbasin.record_list
+
+        index = self.index_of_handle[ handle ] * self.width_rate_array + record_A[ 'what_action' ]
+
+        ( exit_A, basin_time ) = self.superbasin.return_exit( self.sum_rate, self.rate_array[ index ], self.random_stream )
+
+        if exit_A == None : return False
+
+        if not exit_A :
+            'the internal event A -> B, its time is included in basin_time.'
+            ( self.which_defect, self.what_action ) = self._return_m_n( index )
+
+            first_delete = self.sys_take_action( jdata )
+            if first_delete == None : self.sys_take_recombine( jdata )
+
+            if handle not in self.index_of_handle :
+                self.superbasin.clear( )
+                self.set_which_defect_action( )
+                self.delta_time += basin_time
+                return True
+
+            index = self.index_of_handle[ handle ] * self.width_rate_array + record_B[ 'what_action' ]
+
+        'select the exit event with the internal event excluded.'
+        rate = self.rate_array[ index ]
+
+        self.rate_catalog.set_rate( index, 0.0 )
+        self.set_sum_rate( )
+
+        self.set_which_defect_action( )
+
+        self.rate_catalog.set_rate( index, rate )
+        self.set_sum_rate( )
+
+        self.delta_time = basin_time
+
+        self.superbasin.clear( )
+
+        return True
+
+    def _return_glide_direction( self, index ) :
+        'return the unit vector along the burgers vector of index, None for no burgers vector.'
+
+        burgers_vector = self.defect_store.burgers_vector_scale[ index ] * self.box
+
+        norm = np.linalg.norm( burgers_vector )
+        if norm == 0.0 : return None
+
+        return burgers_vector / norm
+
+    def _return_long_glide_length( self, 
+                                   index,
+                                   neighbour_list ) :
+        'return L of the glide segment [ -L, L ] of index, 0.0 for gliding one jump, neighbour_list is all defectObjects in 27 cells.'
+
+        direction = self._return_glide_direction( index )
+        if direction is None : return 0.0
+
+        tmp_defectObject = self.defectObject_list[ index ]
+
+        cell_index = self.linkcell.return_cell_index_defectObject( tmp_defectObject )
+
+        return self.long_glide.return_length( tmp_defectObject, direction, neighbour_list, cell_index, self.box / self.linkcell.fnlc_vector )
 
     def sys_take_action( self, 
                          jdata, 
@@ -482,7 +962,34 @@ class DefectSystem( object ) :
         'return 0 when self.numb_defectObject eq 0.'
         if self.numb_defectObject == 0 : return 0
 
-        new_defectObject_list = self.defectObject_list[ self.which_defect ].defect_take_action( jdata, self.what_action )
+        'the next reaction method, the clock of self.rate_catalog moves to the firing time before rates are updated.'
+        if isinstance( self.rate_catalog, NextReactionCatalog ) :
+            self.rate_catalog.fire_index( self.which_defect * self.width_rate_array + self.what_action )
+
+        tmp_defectObject = self.defectObject_list[ self.which_defect ]
+
+        radius = 0.0
+        length = 0.0
+
+        if self.first_passage != None or self.long_glide != None :
+            neighbour_list = self.return_defectObject_list_from_index( self.return_27_cells_index_list( jdata, self.which_defect ) )
+
+        if self.first_passage != None :
+            radius = self._return_first_passage_radius( self.which_defect, neighbour_list )
+
+        if radius == 0.0 and self.long_glide != None and self.ui_array[ self.which_defect ] == 0.0 :
+            if self.long_glide.return_glide_action( tmp_defectObject, self.what_action ) :
+                length = self._return_long_glide_length( self.which_defect, neighbour_list )
+
+        if radius > 0.0 :
+            'first-passage jump to the surface of the protective sphere, every action of an isolated point defect is the same jump.'
+            new_defectObject_list = [ self.first_passage.return_jump_defectObject( jdata, tmp_defectObject, radius, self.random_stream ) ]
+        elif length > 0.0 :
+            'long glide to one end of the glide segment [ -length, length ].'
+            direction = self._return_glide_direction( self.which_defect )
+            new_defectObject_list = [ self.long_glide.return_glide_defectObject( jdata, tmp_defectObject, direction, length, self.random_stream ) ]
+        else :
+            new_defectObject_list = tmp_defectObject.defect_take_action( jdata, self.what_action )
 
         self.substitute_defectObject( jdata, self.which_defect, new_defectObject_list[ 0 ] )
 
@@ -504,6 +1011,13 @@ class DefectSystem( object ) :
                 'set self.trap of the DefectObject that added.'
                 self.defectObject_list[ index_second_delete ].reset_trap_defectObject( tmp_trapSys.return_judge_trap( new_defectObject_list[ 1 ] ) )
 
+        'refresh ui_far of all loops every interval steps of 35.self.elastic_far_field, and then ui and rates of loops with ui_far changed.'
+        if self.elastic_far_field != None and self.having_elastic_interaction and self.elastic_far_field.return_refresh_now( ) :
+            tmp_ConstNumber = ConstNumber( jdata )
+            changed_handle_list = self.elastic_far_field.refresh( self.defect_store, self.handle_list, tmp_ConstNumber )
+            self.set_ui_rate_index_list( jdata, tmp_ConstNumber, [ self.index_of_handle[ handle ] for handle in changed_handle_list ] )
+            self.set_sum_rate( )
+
         return first_delete
 
     def sys_take_recombine( self, jdata ) :
@@ -581,7 +1095,7 @@ class DefectSystem( object ) :
       
         if position_random != None :
 
-            tmp_move_vector = np.random.rand( 3 ) * self.box - self.return_center_defectSystem( tmp_defectObject_list )
+            tmp_move_vector = self.random_stream.rand_array( 3 ) * self.box - self.return_center_defectSystem( tmp_defectObject_list )
             if position_random == 'xy' : tmp_move_vector[ 2 ] = 0.0
  
             self.move_defectSystem( jdata, tmp_defectObject_list, tmp_move_vector, tmp_ConstNumber )
@@ -608,21 +1122,23 @@ class DefectSystem( object ) :
          9. self.defectObject_list
          10. self.linkcell in self.linkcell.add_defectObject_list( tmp_defectObject_list ).
          12. self.total_defects
-         13. self.sum_numb_actions_list
+         13. self.numb_actions_list, self.width_rate_array
          14. self.ui_array
          15. self.utotal
 
          16. self.rate_array in self.set_rate_defectObject_index( self, jdata, index ) with effect_index_list.
          17. self.size_rate_array
 
-         18. self.sum_rate_array
+         18. self.rate_catalog
          19. self.sum_rate
-         18-19 in self.set_sum_rate_array( self, begin_index_of_defectObject ) not in this function.
+         18-19 in self.set_sum_rate( self ) not in this function.
 
          20. self.delta_time
          21. self.which_defect
          22. self.what_action
          20-22 in self.set_which_defect_action( self ) not in this function.
+
+         23. self.handle_list, self.index_of_handle, self.next_handle
         '''
 
         if len( tmp_defectObject_list ) == 0 :
@@ -633,8 +1149,9 @@ class DefectSystem( object ) :
         'reset 10.self.linkcell.'
         self.linkcell.add_defectObject_list( tmp_defectObject_list )
 
-        'reset 9.self.defectObject_list.'
+        'reset 9.self.defectObject_list and its columns in self.defect_store.'
         self.defectObject_list.extend( tmp_defectObject_list )
+        self.defect_store.append( tmp_defectObject_list )
 
         old_numb_defectObject = self.numb_defectObject
 
@@ -646,64 +1163,73 @@ class DefectSystem( object ) :
             IV = item.defecttype[ 0 ]
             self.total_defects[ IV ] = self.total_defects[ IV ] + item.nsize
 
-        tmp_sum = self.sum_numb_actions_list[ -1 ]
-        effect_index_list = [ ]
+        'reset 23.self.handle_list, self.index_of_handle.'
+        for real_index in range( old_numb_defectObject, self.numb_defectObject ) :
+            self.handle_list.append( self.next_handle )
+            self.index_of_handle[ self.next_handle ] = real_index
+            self.next_handle += 1
 
-        for i in range( len(  tmp_defectObject_list ) ) :
+        'reset 33.self.neighbour_list, lists of added defectObjects are built before their effect index lists.'
+        if self.neighbour_list != None and self.neighbour_list.active :
+            self.neighbour_list.append( self.defect_store, self.handle_list, list( range( old_numb_defectObject, self.numb_defectObject ) ), self._return_cells_index_list )
 
-            real_index = i + old_numb_defectObject
+        effect_index_list = [ ]
+
+        for real_index in range( old_numb_defectObject, self.numb_defectObject ) :
 
             effect_index_list.extend( self.return_effect_index_list( jdata, real_index ) )
 
-            tmp_sum += self.defectObject_list[ real_index ].return_numb_actions( )
+            'reset 13.self.numb_actions_list.'
+            self.numb_actions_list.append( self.defectObject_list[ real_index ].return_numb_actions( ) )
 
-            'reset 13.self.sum_numb_actions_list.'
-            self.sum_numb_actions_list.append( tmp_sum )
+        'enlarge 13.self.width_rate_array when added defectObjects have more actions.'
+        max_numb_actions = max( self.numb_actions_list[ old_numb_defectObject : ] )
+        if max_numb_actions > self.width_rate_array : self._reset_width_rate_array( max_numb_actions )
 
-        numb_actions_add = self.sum_numb_actions_list[ -1 ] - self.sum_numb_actions_list[ old_numb_defectObject - 1 ]
+        'every added defectObject owns a slot of self.width_rate_array actions.'
+        numb_actions_add = ( self.numb_defectObject - old_numb_defectObject ) * self.width_rate_array
 
         'add ui_array space with length of ( self.numb_defectObject - old_numb_defectObject ).'
-        self.ui_array = np.concatenate( ( self.ui_array, np.zeros( ( self.numb_defectObject - old_numb_defectObject ), dtype = np.float64 ) ), axis = 0 )
+        self.ui_buffer.append_fill( self.numb_defectObject - old_numb_defectObject )
 
-        'add numb_actions_add space for self.rate_array and self.sum_rate_array.'
-        self.rate_array = np.concatenate( ( self.rate_array, np.zeros( ( numb_actions_add ), dtype = np.float64 ) ), axis = 0 )
-        self.sum_rate_array = np.concatenate( ( self.sum_rate_array, np.zeros( ( numb_actions_add ), dtype = np.float64 ) ), axis = 0 )
+        'add numb_actions_add zero rates for self.rate_array, rebuild 18.self.rate_catalog only when self.rate_buffer is reallocated, old events are kept.'
+        if self.rate_buffer.append_fill( numb_actions_add ) :
+            self.rate_catalog.build( self.rate_buffer.return_buffer( ), np.arange( self.rate_catalog.size_rate_array ) )
 
-        'reset 17.self.size_rate_array.'
-        self.size_rate_array = self.size_rate_array + numb_actions_add
+        'reset views 14.self.ui_array, 16.self.rate_array and 17.self.size_rate_array.'
+        self.reset_array_views( )
 
         effect_index_list = list( set( effect_index_list ) )
         effect_index_list.extend( list( range( old_numb_defectObject, self.numb_defectObject ) ) )
-        'for set_sum_rate_array, minimum element of effect_index_list.'
-        begin_index_of_defectObject = min( effect_index_list ) 
 
-        'reset 14.self.ui_array and 15.self.utotal.'
-        for item in effect_index_list :
-            ui = self.return_ui_index( jdata, tmp_ConstNumber, item )
-            self.utotal = self.utotal + ui - self.ui_array[ item ]
-            self.ui_array[ item ] = ui
+        'pairs of added defectObjects in 36.self.pair_ledger.'
+        self._update_pair_ledger_index_list( jdata, tmp_ConstNumber, list( range( old_numb_defectObject, self.numb_defectObject ) ) )
 
-            'reset 16.self.rate_array.'
-            self.set_rate_defectObject_index( jdata, item )
+        'reset 14.self.ui_array, 15.self.utotal, 16.self.rate_array and 18.self.rate_catalog in one pass.'
+        self.set_ui_rate_index_list( jdata, tmp_ConstNumber, effect_index_list )
 
-        'reset 18.self.sum_rate_array and 19.self.sum_rate.'
-        self.set_sum_rate_array( begin_index_of_defectObject )
+        'reset 19.self.sum_rate.'
+        self.set_sum_rate( )
 
     def return_ui_index( self, 
                          jdata, 
                          tmp_ConstNumber, 
                          tmp_index        ) :
         '''
-        Here ui = 0.5 * sigma_( j != i )^N U_elastic_( ij ), j is the neighbours of i.
+        Here ui = 0.5 * sigma_( j != i )^N U_elastic_( ij ), j is the neighbours of i,
+        and ui_far of far loops of the last refresh of 35.self.elastic_far_field.
         return ui of defectObject with tmp_index of self.defectObject_list.
         '''
 
         if not self.having_elastic_interaction : return 0.0
 
         effect_index_list = self.return_effect_index_list( jdata, tmp_index  )
-        effect_defectObject_list = self.return_defectObject_list_from_index( effect_index_list )
 
-        return 0.5 * self.defectObject_list[ tmp_index ].return_u_neighbour( jdata, tmp_ConstNumber, effect_defectObject_list )
+        ui = 0.5 * self._return_u_neighbour_index( jdata, tmp_ConstNumber, tmp_index, effect_index_list )
+
+        if self.elastic_far_field != None : ui += self.elastic_far_field.return_ui_far( self.defect_store, self.handle_list, tmp_index, tmp_ConstNumber )
+
+        return ui
 
     def delete_defectObject( self, 
                              jdata, 
@@ -738,23 +1264,28 @@ class DefectSystem( object ) :
         Changed properties of DefectSystem :
          8. self.numb_defectObject
          9. self.defectObject_list
-         10. self.linkcell in self.linkcell.delete_defectObject_list( tmp_delete_defectObject_list, index_list ).
+         10. self.linkcell in self.linkcell.delete_a_defectObject( ).
          12. self.total_defects
-         13. self.sum_numb_actions_list in self.delete_sum_numb_actions_list_index( item ).
+         13. self.numb_actions_list
          14. self.ui_array
          15. self.utotal
 
          16. self.rate_array in self.set_rate_defectObject_index( self, jdata, index ).
          17. self.size_rate_array
 
-         18. self.sum_rate_array
+         18. self.rate_catalog
          19. self.sum_rate
-         18-19 in self.set_sum_rate_array( self, begin_index_of_defectObject ).
+         18-19 in self.set_sum_rate( self ).
 
          20. self.delta_time
          21. self.which_defect
          22. self.what_action
          20-22 in self.set_which_defect_action( self ) not in this function.
+
+         23. self.handle_list, self.index_of_handle
+
+        every defectObject is deleted by swapping with the last one in self._swap_remove_defectObject( ),
+        so indexes of other defectObjects may change, but their handles do not change.
         '''
 
         if len( index_list ) < 1 :
@@ -781,6 +1312,9 @@ class DefectSystem( object ) :
         'old_effect_index delete index in index_list.'
         old_effect_index_list = [ item for item in old_effect_index_list if item not in index_list ]
 
+        'handles of effect defectObjects, their indexes may change after swapping with the last one.'
+        effect_handle_list = [ self.handle_list[ item ] for item in old_effect_index_list ]
+
         tmp_delete_defectObject_list = [ ]
 
         for i in index_list :
@@ -789,109 +1323,91 @@ class DefectSystem( object ) :
 
             tmp_delete_defectObject_list.append( self.defectObject_list[ i ] )
 
-        'reset 10.self.linkcell.'
-        self.linkcell.delete_defectObject_list( tmp_delete_defectObject_list, index_list )
-
-        'decreasing index_list[ index ] according value.'
+        'decreasing index_list[ index ] according value, then the last defectObject swapped is never in index_list.'
         index_list.sort( reverse = True )
  
         for item in index_list :
 
-            ( begin_index, end_index ) = self._return_begin_end_index( item )
-
-            'delete space of self.rate_array.'
-            self.rate_array = np.delete( self.rate_array, slice( begin_index, end_index ) )
-
-            'delete self.ui_array[ item ] and 15.reset self.utotal.'
-            self.utotal = self.utotal - self.ui_array[ item ]
-            self.ui_array = np.delete( self.ui_array, item )
-
-            'delete space of self.sum_numb_actions_list, reset 13.self.sum_numb_actions_list.'
-            self.delete_sum_numb_actions_list_index( item )
-
-            'delete self.defectObject_list, reset 9.self.defectObject_list.'
-            del self.defectObject_list[ item ]
+            'reset 15.self.utotal.'
+            self.utotal = self.utotal - self.ui_buffer.return_buffer( )[ item ]
 
-            'set 8.self.numb_defectObject.'
-            self.numb_defectObject -= 1
+            'remove pairs of item from 36.self.pair_ledger, ui of its partners are changed by differences.'
+            if self.pair_ledger != None and self.having_elastic_interaction : self.pair_ledger.remove( self.handle_list[ item ] )
 
-        'delete ( self.size_rate_array - self.rate_array.size ) spaces for self.sum_rate_array.'
-        self.sum_rate_array = np.delete( self.sum_rate_array, slice( self.rate_array.size, self.size_rate_array ) )
+            'reset 8-10, 13-14, 16, 18 and 23.'
+            self._swap_remove_defectObject( item )
 
-        'set 17.self.size_rate_array.'
-        self.size_rate_array = self.rate_array.size
-
-        if len( old_effect_index_list ) == 0 :
-            begin_index_of_defectObject = index_list[ -1 ]
+        'reset views 14.self.ui_array, 16.self.rate_array and 17.self.size_rate_array.'
+        self.reset_array_views( )
 
-        else :
-            new_effect_index_list = self._return_new_index_list( old_effect_index_list, index_list )
-            'for set_sum_rate_array, minimum element of new_effect_index_list.'
-            begin_index_of_defectObject = min( min( new_effect_index_list ), index_list[ -1 ] )
-        
-            'reset 14.self.ui_array and 15.self.utotal.'
-            for item in new_effect_index_list :
-                ui = self.return_ui_index( jdata, tmp_ConstNumber, item )
-                self.utotal = self.utotal + ui - self.ui_array[ item ]
-                self.ui_array[ item ] = ui
+        new_effect_index_list = [ self.index_of_handle[ handle ] for handle in effect_handle_list ]
 
-                'reset 16.self.rate_array.'
-                self.set_rate_defectObject_index( jdata, item )
+        'reset 14.self.ui_array, 15.self.utotal, 16.self.rate_array and 18.self.rate_catalog in one pass.'
+        self.set_ui_rate_index_list( jdata, tmp_ConstNumber, new_effect_index_list )
 
         '''
         'Test_cgzhang, detecting rate array.'
         print( '# new_effect_index_list:', new_effect_index_list )
-        print( '# begin_index_of_defectObject:', begin_index_of_defectObject )
         'self.set_rate_array( jdata )'
         '''
 
-        'reset 18.self.sum_rate_array and 19.self.sum_rate.'
-        self.set_sum_rate_array( begin_index_of_defectObject )
+        'reset 19.self.sum_rate.'
+        self.set_sum_rate( )
 
         "print( '# self.rate_array.size: %d, self.size_rate_array: %d' % ( self.rate_array.size, self.size_rate_array ) )"
 
         return tmp_delete_defectObject_list
 
-    def delete_sum_numb_actions_list_index( self, index ) :
-        'delete and reset sum_numb_actions_list after delete defectObject with index.'
+    def _swap_remove_defectObject( self, index ) :
+        '''
+        delete the defectObject with index by moving the last defectObject into index, 
+        O( self.width_rate_array * log M ) for the rates plus the walks in two cells of self.linkcell, no index is shifted.
+        reset 8.self.numb_defectObject, 9.self.defectObject_list, 10.self.linkcell, 13.self.numb_actions_list,
+        14.self.ui_buffer, 16.self.rate_buffer with 18.self.rate_catalog, 23.self.handle_list and self.index_of_handle.
+        views of buffers are reset in self.reset_array_views( ) by the caller.
+        '''
 
-        for i in range( self.numb_defectObject ) :
-           if i > index : self.sum_numb_actions_list[ i ] -= self.defectObject_list[ index ].return_numb_actions( )
+        last_index = self.numb_defectObject - 1
 
-        del self.sum_numb_actions_list[ index ]
+        ui_array = self.ui_buffer.return_array( )
+        rate_array = self.rate_buffer.return_array( )
 
-    def _return_new_index( self,
-                           old_index,
-                           delete_index_list ) :
-        'return new_index after delete defectObjects with delete_index_list.'
+        'reset 10.self.linkcell, the last defectObject takes index in its cell.'
+        self.linkcell.delete_a_defectObject( self.defectObject_list[ index ], index, self.defectObject_list[ last_index ] )
 
-        if len( delete_index_list ) == 0 : 
-            return old_index
+        'reset 33.self.neighbour_list, the last row takes index as in self.defect_store.'
+        if self.neighbour_list != None and self.neighbour_list.active : self.neighbour_list.swap_remove( index, self.handle_list[ index ] )
 
-        'increasing according to value.'
-        delete_index_list = sorted( delete_index_list, reverse = False )
+        del self.index_of_handle[ self.handle_list[ index ] ]
 
-        for i in range( len( delete_index_list ) ) :
+        if index != last_index :
 
-            if old_index < delete_index_list[ i ] : 
-                return old_index - i
-            elif old_index == delete_index_list[ i ] :
-                raise RuntimeError( 'Old_index in delete_index_list, wrong !' )
-        
-        return old_index - len( delete_index_list )
+            'move the slot of the last defectObject into the slot of index.'
+            begin_index = last_index * self.width_rate_array
+            self.rate_catalog.set_rates( index * self.width_rate_array, rate_array[ begin_index : begin_index + self.width_rate_array ].copy( ) )
 
-    def _return_new_index_list( self,
-                                old_index_list, 
-                                delete_index_list ) :
-        'return_new_index_list after delete defectObjects with delete_index_list.'
+            ui_array[ index ] = ui_array[ last_index ]
+            self.numb_actions_list[ index ] = self.numb_actions_list[ last_index ]
+            self.defectObject_list[ index ] = self.defectObject_list[ last_index ]
 
-        new_index_list = [ ]
+            self.handle_list[ index ] = self.handle_list[ last_index ]
+            self.index_of_handle[ self.handle_list[ index ] ] = index
+
+        'zero the slot of the last index, the rates beyond self.size_rate_array in self.rate_catalog are kept zero.'
+        self.rate_catalog.set_rates( last_index * self.width_rate_array, np.zeros( self.width_rate_array, dtype = np.float64 ) )
+
+        'pop the last index.'
+        self.rate_buffer.delete_slice( last_index * self.width_rate_array, ( last_index + 1 ) * self.width_rate_array )
+        self.ui_buffer.delete( last_index )
+
+        del self.numb_actions_list[ -1 ]
+        del self.defectObject_list[ -1 ]
+        del self.handle_list[ -1 ]
+
+        self.defect_store.swap_remove( index )
+
+        self.numb_defectObject -= 1
 
-        for item in old_index_list :
-            new_index_list.append( self._return_new_index( item, delete_index_list ) )
-       
-        return new_index_list
-   
     def substitute_defectObject( self, 
                                  jdata, 
                                  index, 
@@ -917,16 +1433,16 @@ class DefectSystem( object ) :
          9. self.defectObject_list
          10. self.linkcell in self.linkcell.substitute_defectObject( index, old_defectObject, tmp_defectObject ).
          12. self.total_defects
-         13. self.sum_numb_actions_list
+         13. self.numb_actions_list, self.width_rate_array
          14. self.ui_array
          15. self.utotal
 
          16. self.rate_array in self.set_rate_defectObject_index( self, jdata, index ).
          17. self.size_rate_array
 
-         18. self.sum_rate_array
+         18. self.rate_catalog
          19. self.sum_rate
-         18-19 in self.set_sum_rate_array( self, begin_index_of_defectObject ).
+         18-19 in self.set_sum_rate( self ).
 
          20. self.delta_time
          21. self.which_defect
@@ -964,8 +1480,9 @@ class DefectSystem( object ) :
 
         old_defectObject = self.defectObject_list[ index ]
 
-        'set 9.self.defectObject_list.'
+        'set 9.self.defectObject_list and its row in self.defect_store.'
         self.defectObject_list[ index ] = tmp_defectObject
+        self.defect_store.set_row( index, tmp_defectObject )
 
         '''
         'Test_cgzhang, for detecting variable assignment operation.'
@@ -977,46 +1494,29 @@ class DefectSystem( object ) :
         tmp_defectObject.print_properties( )
         '''
 
-        delta_numb_actions = tmp_defectObject.return_numb_actions( ) - old_defectObject.return_numb_actions( )
-
-        'get the begin_index and end_index in self.rate_array using old self.sum_numb_actions_list.'
-        ( begin_index, end_index ) = self._return_begin_end_index( index )
-
-        'set space and size of self.rate_array.'
-        if delta_numb_actions > 0 : 
-
-            'insert delta_numb_actions element in index: begin_index.'
-            self.rate_array = np.insert( self.rate_array, np.ones( delta_numb_actions, dtype = np.int ) * begin_index, 0.0 )
-            self.size_rate_array = self.size_rate_array + delta_numb_actions 
+        numb_actions = tmp_defectObject.return_numb_actions( )
 
-            'add delta_numb_actions space for self.sum_rate_array.'
-            self.sum_rate_array = np.concatenate( ( self.sum_rate_array, np.zeros( ( delta_numb_actions ), dtype = np.float64 ) ), axis = 0 )
+        'enlarge 13.self.width_rate_array when tmp_defectObject has more actions, otherwise no space of self.rate_array is changed.'
+        if numb_actions > self.width_rate_array : self._reset_width_rate_array( numb_actions )
 
-        elif delta_numb_actions < 0 :
-
-            'delete abs( delta_numb_actions ) element in from index : begin_index to begin_index + abs( delta_numb_actions ).'
-            self.rate_array = np.delete( self.rate_array, slice( begin_index, begin_index + abs( delta_numb_actions ) ) )
-            'reset 17.self.size_rate_array.'
-            self.size_rate_array = self.size_rate_array - abs( delta_numb_actions )
-         
-            'delete -delta_numb_actions space for self.sum_rate_array.'
-            self.sum_rate_array = np.delete( self.sum_rate_array, slice( self.size_rate_array + delta_numb_actions, self.size_rate_array ) )
-
-        'reset 13.self.sum_numb_actions_list.'
-        for i in range( self.numb_defectObject ) :
-            if i >= index : 
-                self.sum_numb_actions_list[ i ] = self.sum_numb_actions_list[ i ] + delta_numb_actions
+        'reset 13.self.numb_actions_list, only for index.'
+        self.numb_actions_list[ index ] = numb_actions
 
         'reset 10.self.linkcell.'
         self.linkcell.substitute_defectObject( index, old_defectObject, tmp_defectObject )
 
+        'reset 33.self.neighbour_list, the list of index is rebuilt only when it moves more than half the skin.'
+        if self.neighbour_list != None and self.neighbour_list.active :
+            self.neighbour_list.update( self.defect_store, self.handle_list, index, self._return_cells_index_list )
+
         'add effect_index_list due to new linkcell, and then add index into effect_index_list.'
         effect_index_list.extend( self.return_effect_index_list( jdata, index ) )
         effect_index_list.append( index )
 
         effect_index_list = list( set( effect_index_list ) )
-        'for set_sum_rate_array, minimum element of effect_index_list.'
-        begin_index_of_defectObject = min( effect_index_list )
+
+        'pairs of index in 36.self.pair_ledger, ui of old and new partners are changed by differences.'
+        self._update_pair_ledger_index_list( jdata, tmp_ConstNumber, [ index ] )
 
         '''
         'Test_cgzhang, for detecting self.ui_array and self.utotal.'
@@ -1031,19 +1531,8 @@ class DefectSystem( object ) :
             self.ui_array[ item ] = ui
         '''
 
-        'reset 14.self.ui_array and 15.self.utotal.'
-        for item in effect_index_list :
-            ui = self.return_ui_index( jdata, tmp_ConstNumber, item )
-            self.utotal = self.utotal + ui - self.ui_array[ item ]
-
-            '''
-            'Test_cgzhang, for detecting self.ui_array and self.utotal.'
-            print( '# delta_ui', ui - self.ui_array[ item ] )
-            '''
-
-            self.ui_array[ item ] = ui
-            'reset 16.self.rate_array.'
-            self.set_rate_defectObject_index( jdata, item )
+        'reset 14.self.ui_array, 15.self.utotal, 16.self.rate_array and 18.self.rate_catalog in one pass.'
+        self.set_ui_rate_index_list( jdata, tmp_ConstNumber, effect_index_list )
 
         '''
         'Test_cgzhang, for detecting rate array.'
@@ -1051,8 +1540,8 @@ class DefectSystem( object ) :
         print( '# effect_index_list:', effect_index_list )
         '''
 
-        'reset 18.self.sum_rate_array and 19.self.sum_rate.'
-        self.set_sum_rate_array( begin_index_of_defectObject )
+        'reset 19.self.sum_rate.'
+        self.set_sum_rate( )
 
     def return_defectObject_list_from_index( self, index_list ) :
         'return defectObject_list from index_list.'
@@ -1090,70 +1579,46 @@ class DefectSystem( object ) :
     def return_27_cells_index_list( self, 
                                     jdata, 
                                     index  ) :
-        'return 27_cells_defectObject_index_list in 27 cells of the index: index, no including its self index.'
+        '''
+        return 27_cells_defectObject_index_list in 27 cells of the index: index, no including its self index.
+        indexes within the cutoff of 33.self.neighbour_list are returned when it is built, for rates, ui, effect lists,
+        recombination and capture, the cutoff is not less than rcutoff_elastic and jdata[ 'linkcell_recombine_radius' ].
+        '''
 
-        cell_index = self.linkcell.return_cell_index_defectObject( self.defectObject_list [ index ] )
-        ip = self.linkcell.return_ip_cell_index( cell_index )
+        if self.neighbour_list != None and self.neighbour_list.active :
+            return self.neighbour_list.return_index_list( self.defect_store, self.handle_list, self.index_of_handle, index )
 
-        i = self.linkcell.ltop[ ip ]
-   
-        cells_defectObject_index_list = [ ]
-
-        'central cell.'
-        if i != -1 :
-            while True :
-                if i != index :
-                    cells_defectObject_index_list.append( i )
-                i = self.linkcell.linkmp[ i ]
-                if i == -1 : break
-
-        for kc in range( 1, 27 ) :
-
-            jx = cell_index[ 0 ] + self.linkcell.nix[ kc ]
-            jy = cell_index[ 1 ] + self.linkcell.niy[ kc ]
-            jz = cell_index[ 2 ] + self.linkcell.niz[ kc ]
-           
-            if cell_index[ 0 ] == self.linkcell.nlc_vector[ 0 ] - 1 and jx > cell_index[ 0 ] :
-                jx = 0
-                if not self.linkcell.periodic[ 0 ] or jx == cell_index[ 0 ] : break
-            elif cell_index[ 0 ] == 0 and jx < cell_index[ 0 ] :
-                jx = self.linkcell.nlc_vector[ 0 ] - 1
-                if not self.linkcell.periodic[ 0 ] or jx == cell_index[ 0 ] : break
-           
-            if cell_index[ 1 ] == self.linkcell.nlc_vector[ 1 ] - 1 and jy > cell_index[ 1 ] :
-                jy = 0
-                if not self.linkcell.periodic[ 1 ] or jy == cell_index[ 1 ] : break
-            elif cell_index[ 1 ] == 0 and jy < cell_index[ 1 ] :
-                jy = self.linkcell.nlc_vector[ 1 ] - 1
-                if not self.linkcell.periodic[ 1 ] or jy == cell_index[ 1 ] : break
-           
-            if cell_index[ 2 ] == self.linkcell.nlc_vector[ 2 ] - 1 and jz > cell_index[ 2 ] :
-                jz = 0
-                if not self.linkcell.periodic[ 2 ] or jz == cell_index[ 2 ] : break
-            elif cell_index[ 2 ] == 0 and jz < cell_index[ 2 ] :
-                jz = self.linkcell.nlc_vector[ 2 ] - 1
-                if not self.linkcell.periodic[ 2 ] or jz == cell_index[ 2 ] : break
-
-            jc = self.linkcell.return_ip_cell_index( [ jx, jy, jz ] )
-
-            j = self.linkcell.ltop[ jc ]
-
-            'Bypass this neighbouring cell if it is empty.'
-            if j != -1 :
-                while True :
-                    cells_defectObject_index_list.append( j )
-                    j = self.linkcell.linkmp[ j ]
-                    if j == -1 : break
-
-        if len( cells_defectObject_index_list ) > self.linkcell.nnbrs :
-            raise RuntimeError( 'Max1: %d .gt. nnbrs: %d something wrong' % ( len( cells_defectObject_index_list ), self.linkcell.nnbrs ) )
+        return self._return_neighbour_index_list( self._return_cells_index_list( index ), index )
 
-        return cells_defectObject_index_list
+    def _return_cells_index_list( self, index ) :
+        'return indexes in 27 cells of index by walking 12.self.linkcell, in every level searched by index with Class MultiLinkcell, including index.'
+
+        return self.linkcell.return_27_cells_index_list_defectObject( self.defectObject_list[ index ] )
+
+    def _return_neighbour_index_list( self, 
+                                      cells_defectObject_index_list,
+                                      index                          ) :
+        'return cells_defectObject_index_list without index.'
+
+        neighbour_index_list = [ i for i in cells_defectObject_index_list if i != index ]
+
+        self.linkcell.check_nnbrs( len( neighbour_index_list ) )
+
+        return neighbour_index_list
+
+    def return_27_cells_index_list_cell( self, cell_index ) :
+        'return 27_cells_defectObject_index_list in 27 cells of cell_index, including all indexes in the central cell.'
+
+        'neighbouring cells are taken from the table of self.linkcell, with periodic and non-periodic boundaries.'
+        return self.linkcell.return_27_cells_index_list_ip( self.linkcell.return_ip_cell_index( cell_index ) )
 
     def return_center_defectSystem( self, tmp_defectObject_list ) :
         'return the center position of tmp_defectObject_list. when len(tmp_defectObject_list) eq 0, return np.zeros( ( 3 ), dtype = np.float ).'
 
-        tmp_center_defectSystem = np.zeros( ( 3 ), dtype = np.float )
+        'vectorized by self.defect_store for self.defectObject_list.'
+        if tmp_defectObject_list is self.defectObject_list : return self.defect_store.return_center( )
+
+        tmp_center_defectSystem = np.zeros( ( 3 ), dtype = np.float64 )
         tmp_numb_defectObject = len( tmp_defectObject_list )
 
         if tmp_numb_defectObject == 0 : 
@@ -1173,37 +1638,56 @@ class DefectSystem( object ) :
                            tmp_ConstNumber         ) :
         'move defectObjects of tmp_defectObject_list with the vector of tmp_move_vector.'
 
+        'rows of self.defect_store are read back from self.defectObject_list.'
+        if tmp_defectObject_list is self.defectObject_list : 
+            self.defect_store.move( jdata, self.defectObject_list, tmp_move_vector, tmp_ConstNumber )
+            if self.neighbour_list != None and self.neighbour_list.active : self.neighbour_list.move( tmp_move_vector )
+            return
+
         for tmp_defectObject in tmp_defectObject_list :
             tmp_defectObject.move_defectObject( jdata, tmp_move_vector, tmp_ConstNumber )
 
     def return_judge_in_box( self,
                              jdata,
                              tmp_max_box_int ) :
-        'return judge in box or not, and corresponding delta_l.'
+        'return judge in box or not, and corresponding delta_l, rows out of box found by self.defect_store.'
  
-        'add this line to solve the problem of no defectObject in defectSystem.' 
-        delta_l = np.zeros( 3 )
-
-        for item in self.defectObject_list :
-            in_box, delta_l = item.return_judge_in_box( jdata, tmp_max_box_int )
-            if not all( in_box ) : return ( in_box, delta_l )
-
-        return ( [ True, True, True ], delta_l )
+        return self.defect_store.return_judge_in_box( jdata, self.defectObject_list, tmp_max_box_int )
 
     def remap_defectSystem( self, jdata ) :
-        'remap the defectSystem, i.e. set_position_scale_image_int.'
+        'remap the defectSystem, i.e. set_position_scale_image_int of defectObjects leaving the box found by self.defect_store.'
 
-        for item in self.defectObject_list :
-            item.set_position_scale_image_int( jdata )
+        self.defect_store.remap( jdata, self.defectObject_list )
 
     def reset_trap_defectSystem( self, 
                                  jdata, 
                                  tmp_trapSys ) :
-       'reset trap of defectSystem.'
+       'reset trap of defectSystem, traps of all defectObjects are judged at once.'
 
-       for item in self.defectObject_list :
-          item.reset_trap_defectObject( tmp_trapSys.return_judge_trap( jdata, item ) )
+       for ( item, judge_trap ) in zip( self.defectObject_list, tmp_trapSys.return_judge_trap_list( jdata, self.defectObject_list ) ) :
+          item.reset_trap_defectObject( judge_trap )
        
+    def set_jump_trap( self,
+                       jdata,
+                       tmp_trapSys ) :
+        '''
+        set traps of tmp_trapSys in 30.self.first_passage and 31.self.long_glide, protective spheres are bounded by traps
+        and glide segments are clipped at the first trap capture, rates of all defectObjects are reset,
+        and self.sum_rate, self.delta_time, self.which_defect and self.what_action.
+        '''
+
+        trap_radius_list = [ item.return_radius( ) for item in tmp_trapSys.trapObject_list ]
+
+        if self.first_passage != None : self.first_passage.set_trap( tmp_trapSys.trap_position, trap_radius_list )
+        if self.long_glide != None : self.long_glide.set_trap( tmp_trapSys.trap_position, trap_radius_list )
+
+        for i in range( self.numb_defectObject ) : self.set_rate_defectObject_index( jdata, i )
+
+        if self.superbasin != None : self.superbasin.clear( )
+        self.rate_catalog.build( self.rate_buffer.return_buffer( ) )
+        self.set_sum_rate( )
+        self.set_which_defect_action( )
+
     def deleted_due_2_out_max_box( self, 
                                    jdata, 
                                    index  ) :
@@ -1250,16 +1734,17 @@ class DefectSystem( object ) :
          12. self.linkcell
          13. self.initial_recombine
          14. self.total_defects
-         15. self.sum_numb_actions_list
-         16. self.ui_array
+         15. self.numb_actions_list, self.width_rate_array
+         16. self.ui_array, view of self.ui_buffer
          17. self.utotal
-         18. self.rate_array
+         18. self.rate_array, view of self.rate_buffer
          19. self.size_rate_array
-         20. self.sum_rate_array
+         20. self.rate_catalog
          21. self.sum_rate
          22. self.delta_time
          23. self.which_defect
          24. self.what_action
+         25. self.handle_list
         '''
 
         properties_list = [ [ 'box'                       , self.box                        ],
@@ -1275,16 +1760,17 @@ class DefectSystem( object ) :
                             [ 'numb_defectObject'         , self.numb_defectObject          ],
                             [ 'initial_recombine'         , self.initial_recombine          ],
                             [ 'total_defects'             , self.total_defects              ],
-                            [ 'sum_numb_actions_list'     , self.sum_numb_actions_list      ],
+                            [ 'numb_actions_list'         , self.numb_actions_list          ],
+                            [ 'width_rate_array'          , self.width_rate_array           ],
                             [ 'ui_array'                  , self.ui_array                   ],
                             [ 'utotal'                    , self.utotal                     ],
                             [ 'rate_array'                , self.rate_array                 ],
                             [ 'size_rate_array'           , self.size_rate_array            ],
-                            [ 'sum_rate_array'            , self.sum_rate_array             ],
                             [ 'sum_rate'                  , self.sum_rate                   ],
                             [ 'delta_time'                , self.delta_time                 ],
                             [ 'which_defect'              , self.which_defect               ],
-                            [ 'what_action'               , self.what_action                ]  ]
+                            [ 'what_action'               , self.what_action                ],
+                            [ 'handle_list'               , self.handle_list                ]  ]
 
         return properties_list
 
@@ -1319,12 +1805,209 @@ class DefectSystem( object ) :
             for item in self._return_properties( ) :
                 if item[ 0 ] == which_item : print( '# ', which_item, ':', item[ 1 ] )
  
+    def set_temperature( self, 
+                         jdata,
+                         temperature ) :
+        '''
+        change 3.self.temperature_evolution to temperature in place, 
+        defectObjects, self.linkcell and self.ui_array are not rebuilt.
+        Rates are not rescaled in one vectorized pass by default : a cached rate k = nu_i * exp( -E_i / ( kb * T ) ) does not tell
+        the prefactor nu_i from the energy E_i, and nu_i of DefectObject.return_rate( ) depends on the size of clusters and loops,
+        so only rebuilding the linkcell, ui and the catalog is saved by default, and rates are computed again per defectObject.
+        jdata[ 'temperature_rescale' ] :
+         1. 'recompute', default, rates of all defectObjects are computed again by DefectObject.return_rate( ).
+         2. 'arrhenius', every rate k = nu * exp( -E / ( kb * T ) ) is rescaled as k' = nu * ( k / nu ) ** ( T / T' ),
+            nu = ConstNumber.prefactor, in one vectorized pass over self.rate_array,
+            valid only if every DefectObject.return_rate( ) takes nu as prefactor without size or temperature dependence,
+            rates of jdata[ 'temperature_rescale_check' ] ( default 16 ) defectObjects spread over the list are computed again,
+            and a relative difference .gt. 1.0E-6 from the rescaled rates raises RuntimeError.
+        then self.rate_catalog is rebuilt, and self.sum_rate, self.delta_time, self.which_defect, self.what_action are reset.
+        '''
+
+        if temperature <= 0.0 : raise RuntimeError( 'temperature %f .le. 0, wrong !' % temperature )
+
+        old_temperature = self.temperature_evolution
+        self.temperature_evolution = temperature
+
+        if temperature == old_temperature : return
+
+        temperature_rescale = 'recompute'
+        if j_have( jdata, 'temperature_rescale' ) : temperature_rescale = jdata[ 'temperature_rescale' ]
+
+        if temperature_rescale == 'arrhenius' :
+
+            prefactor = ConstNumber( jdata ).prefactor
+
+            nonzero = self.rate_array > 0.0
+            self.rate_array[ nonzero ] = prefactor * np.power( self.rate_array[ nonzero ] / prefactor, old_temperature / temperature )
+
+            if self.first_passage != None or self.long_glide != None :
+                'rates of first-passage jumps and long glides are not arrhenius, they are computed again.'
+                rate_matrix = self.return_rate_matrix( )
+
+                for i in range( self.numb_defectObject ) :
+                    neighbour_list = self.return_defectObject_list_from_index( self.return_27_cells_index_list( jdata, i ) )
+
+                    scaled = False
+                    if self.first_passage != None : scaled = self._return_first_passage_radius( i, neighbour_list ) > 0.0
+                    if self.long_glide != None and self.ui_array[ i ] == 0.0 : scaled = scaled or self._return_long_glide_length( i, neighbour_list ) > 0.0
+
+                    if scaled :
+                        rate_defectObject = self.return_rate_defectObject( jdata, i )
+                        rate_matrix[ i, : len( rate_defectObject ) ] = rate_defectObject
+
+            self._check_rescaled_rate( jdata )
+
+        elif temperature_rescale == 'recompute' :
+
+            rate_matrix = self.return_rate_matrix( )
+
+            for i in range( self.numb_defectObject ) :
+                rate_defectObject = self.return_rate_defectObject( jdata, i )
+                rate_matrix[ i, : len( rate_defectObject ) ] = rate_defectObject
+
+        else :
+            raise RuntimeError( 'temperature_rescale %s not in [ arrhenius, recompute ], wrong !' % temperature_rescale )
+
+        'rebuild 20.self.rate_catalog, reset 21.self.sum_rate, 22.self.delta_time, 23.self.which_defect and 24.self.what_action.'
+        if self.superbasin != None : self.superbasin.clear( )
+        self.rate_catalog.build( self.rate_buffer.return_buffer( ) )
+        self.set_sum_rate( )
+        self.set_which_defect_action( )
+
+    def _check_rescaled_rate( self, jdata ) :
+        'compare rescaled rates of a few defectObjects spread over the list with DefectObject.return_rate( ) at the new temperature.'
+
+        numb_check = 16
+        if j_have( jdata, 'temperature_rescale_check' ) : numb_check = jdata[ 'temperature_rescale_check' ]
+
+        numb_check = min( numb_check, self.numb_defectObject )
+        if numb_check <= 0 : return
+
+        rate_matrix = self.return_rate_matrix( )
+
+        for i in sorted( set( np.linspace( 0, self.numb_defectObject - 1, numb_check ).astype( int ).tolist( ) ) ) :
+
+            rate_defectObject = np.array( self.return_rate_defectObject( jdata, i ), dtype = np.float64 )
+            rate_rescaled = rate_matrix[ i, : len( rate_defectObject ) ]
+
+            if np.any( np.abs( rate_rescaled - rate_defectObject ) > 1.0E-6 * np.abs( rate_defectObject ) ) :
+                raise RuntimeError( 'rates of defectObject %d rescaled by arrhenius differ from return_rate( ) at %f K, use temperature_rescale recompute, wrong !' % ( i, self.temperature_evolution ) )
+
+    def set_frozen_handle_list( self,
+                                jdata,
+                                handle_list ) :
+        '''
+        freeze defectObjects with handle_list, their rates are zero until the end, they do not move,
+        but react with other defectObjects, e.g. ghost defectObjects of a parallel domain.
+        self.sum_rate, self.delta_time, self.which_defect and self.what_action are reset.
+        '''
+
+        self.frozen_handle_set.update( handle_list )
+
+        for handle in handle_list : self.set_rate_defectObject_index( jdata, self.return_index_handle( handle ) )
+
+        'rebuild 20.self.rate_catalog, no rounding residue of the zeroed rates is left in self.sum_rate.'
+        if self.superbasin != None : self.superbasin.clear( )
+        self.rate_catalog.build( self.rate_buffer.return_buffer( ) )
+        self.set_sum_rate( )
+        self.set_which_defect_action( )
+
+    def evolution_time_horizon( self,
+                                jdata,
+                                time_horizon ) :
+        'evolve for time_horizon without output, the event later than the end is dropped by self.drop_next_event( ).'
+
+        end_time = self.c_time + time_horizon
+
+        while self.c_time + self.delta_time < end_time :
+
+            first_delete = self.sys_take_action( jdata, tmp_trapSys = None )
+            if first_delete == None : self.sys_take_recombine( jdata )
+
+            self.reset_iter( )
+
+            if self.superbasin == None :
+                self.set_which_defect_action( )
+            else :
+                self.set_which_defect_action_superbasin( jdata )
+
+        self.drop_next_event( end_time )
+
+    def drop_next_event( self, end_time ) :
+        '''
+        the next event is later than end_time, drop it, 2.self.c_time moves to end_time, and the next event is selected again,
+        i.e. 22.self.delta_time is drawn from end_time for every catalog, exact for poisson process since waiting times are memoryless.
+        firing times of the next reaction method are kept, the clock of 20.self.rate_catalog moves to end_time,
+        records of 29.self.superbasin are cleared, the dropped event is not taken.
+        '''
+
+        if isinstance( self.rate_catalog, NextReactionCatalog ) and self.numb_defectObject != 0 :
+            self.rate_catalog.advance_time( end_time - self.c_time )
+
+        self.c_time = end_time
+
+        if self.superbasin != None : self.superbasin.clear( )
+
+        self.set_which_defect_action( )
+
+    def reset_defectObject_list( self,
+                                 jdata,
+                                 tmp_defectObject_list ) :
+        '''
+        reset 11.self.defectObject_list to tmp_defectObject_list, and rebuild related properties as 
+        self.set_initial_recombine_and_related_properties( ) without initial recombine and moving to the center.
+        1.self.c_step and 2.self.c_time are not changed, 32.self.frozen_handle_set is cleared.
+        '''
+
+        tmp_ConstNumber = ConstNumber( jdata )
+
+        self.defectObject_list = tmp_defectObject_list
+        self.numb_defectObject = len( self.defectObject_list )
+
+        self.defect_store.reset( self.defectObject_list )
+
+        self.set_total_defects( )
+        self.set_numb_actions_list( jdata )
+
+        self.remap_defectSystem( jdata )
+
+        'handles are set again, no defectObject is frozen.'
+        self.frozen_handle_set = set( )
+
+        'very important ! reset 12.self.linkcell after ( self.remap_defectSystem: position, position_scale, position_image_int ) has been set.'
+        self.linkcell.linked( self.defectObject_list, self.defect_store.position_scale )
+
+        self.set_handle_list( )
+        self.set_neighbour_list( )
+        self.set_ui_and_utotal( jdata, tmp_ConstNumber )
+        self.set_rate_array( jdata )
+
+        self.rate_catalog = create_rate_catalog( jdata, self.rate_buffer.return_buffer( ), self.random_stream )
+        self.set_sum_rate( )
+
+        if self.superbasin != None : self.superbasin.clear( )
+        self.set_which_defect_action( )
+
     def evolution( self,
                    jdata,
                    outputFile,
                    tmp_trapSys = None ) :
         'the center of okmc simulation.'
 
+        if self.superbasin != None and isinstance( self.rate_catalog, NextReactionCatalog ) :
+            raise RuntimeError( 'superbasin with kmc_selector next_reaction, wrong !' )
+
+        if ( self.first_passage != None or self.long_glide != None ) and tmp_trapSys != None : self.set_jump_trap( jdata, tmp_trapSys )
+
+        if j_have( jdata, 'parallel_domain' ) :
+            self.evolution_parallel( jdata, outputFile, tmp_trapSys )
+            return
+
+        if j_have( jdata, 'temperature_schedule' ) :
+            self.evolution_temperature_schedule( jdata, outputFile, tmp_trapSys )
+            return
+
         while self.c_time < self.time_evolution and self.c_step < self.step_evolution :
 
             if outputFile.is_output_now( self, jdata ) : 
@@ -1336,7 +2019,93 @@ class DefectSystem( object ) :
 
             self.reset_iter( )
 
-            self.set_which_defect_action( )
+            if self.superbasin == None :
+                self.set_which_defect_action( )
+            else :
+                self.set_which_defect_action_superbasin( jdata )
+
+        if outputFile.is_output_now( self, jdata ) :
+            outputFile.output_results( self, jdata )
+
+    def evolution_temperature_schedule( self,
+                                        jdata,
+                                        outputFile,
+                                        tmp_trapSys = None ) :
+        '''
+        okmc simulation with jdata[ 'temperature_schedule' ] = [ [ T_1, time_1 ], [ T_2, time_2 ], ... ],
+        stage i anneals time_i( s ) at T_i( K ), e.g. an isochronal annealing is a series of stages with the same time
+        and increasing temperatures, and an isothermal annealing is one stage. 
+        the temperature is changed in place by self.set_temperature( ) between stages.
+        '''
+
+        temperature_schedule = j_must_have( jdata, 'temperature_schedule' )
+
+        stage_end_time = self.c_time
+
+        for ( temperature, stage_time ) in temperature_schedule :
+
+            self.set_temperature( jdata, temperature )
+
+            stage_end_time += stage_time
+
+            while self.c_step < self.step_evolution :
+
+                if outputFile.is_output_now( self, jdata ) : 
+                    outputFile.output_results( self, jdata )
+
+                'the next event is later than the end of this stage, drop it and draw again from the end.'
+                if self.c_time + self.delta_time >= stage_end_time :
+                    self.drop_next_event( stage_end_time )
+                    break
+
+                first_delete = self.sys_take_action( jdata, tmp_trapSys = None )
+                if first_delete == None : self.sys_take_recombine( jdata )
+
+                self.reset_iter( )
+
+                if self.superbasin == None :
+                    self.set_which_defect_action( )
+                else :
+                    self.set_which_defect_action_superbasin( jdata )
+
+        if outputFile.is_output_now( self, jdata ) :
+            outputFile.output_results( self, jdata )
+
+    def evolution_parallel( self,
+                            jdata,
+                            outputFile,
+                            tmp_trapSys = None ) :
+        '''
+        okmc simulation with jdata[ 'parallel_domain' ], domains of the linkcell grid evolve at the same time 
+        in a process pool by the synchronous sublattice scheme of Class ParallelSublattice, 
+        the system moves jdata[ 'parallel_time_horizon' ] forward by every cycle of 8 sectors, the last one ends at self.time_evolution.
+        jdata[ 'temperature_schedule' ] is not taken by domains, ParallelSublattice raises RuntimeError.
+        only 1.self.c_step, 2.self.c_time, 10.self.numb_defectObject, 11.self.defectObject_list and 14.self.total_defects
+        are kept between cycles for outputFile, the other properties are rebuilt at the end.
+        '''
+
+        parallelSublattice = ParallelSublattice( jdata, self )
+
+        while self.c_time < self.time_evolution and self.c_step < self.step_evolution :
+
+            if outputFile.is_output_now( self, jdata ) :
+                outputFile.output_results( self, jdata )
+
+            'the last cycle is shortened to end at 6.self.time_evolution.'
+            time_horizon = min( parallelSublattice.time_horizon, self.time_evolution - self.c_time )
+
+            self.c_step += parallelSublattice.take_cycle( self.random_stream, time_horizon )
+            self.c_time += time_horizon
+
+            self.defectObject_list = parallelSublattice.defectObject_list
+            self.numb_defectObject = len( self.defectObject_list )
+
+            self.defect_store.reset( self.defectObject_list )
+            self.set_total_defects( )
+
+        parallelSublattice.close( )
+
+        self.reset_defectObject_list( jdata, self.defectObject_list )
 
         if outputFile.is_output_now( self, jdata ) :
             outputFile.output_results( self, jdata )
@@ -1,3 +1,333 @@
+#!/usr/bin/env python3
+'pytest checks of DefectSystem, new paths are compared with the serial baseline path, skipped without the package tungsten.'
+
+import copy
+import numpy as np
+import pytest
+
+pytest.importorskip( 'tungsten' )
+
+from DefectSystem import DefectSystem
+from ConstNumber import ConstNumber
+from DefectStore import DefectStore
+from ElasticKernel import create_elastic_kernel
+from tungsten.Create import create_random_defectObject_list
+
+def return_jdata( **kwargs ) :
+    'return jdata of a periodic box 30 nm with cells 5 nm, more keys by kwargs.'
+
+    jdata = { 'box' :                  [ 30.0, 30.0, 30.0 ],
+              'periodic' :             [ True, True, True ],
+              'max_box_image_int' :    [ 1000, 1000, 1000 ],
+              'linkcell_space' :       [ 5.0, 5.0, 5.0 ],
+              'max_numb_in_27_cells' : 5000,
+              'rcutoff_elastic' :      4.0,
+              'alatt' :                0.3165,
+              'lattice' :              'bcc',
+              'temperature' :          600.0,
+              'time' :                 1.0,
+              'individual_cascade' :   False,
+              'initial_recombine' :    True }
+
+    jdata.update( kwargs )
+
+    return jdata
+
+def return_defectObject_list( jdata, numb = 200, seed = 3 ) :
+    'return numb random defectObjects of jdata with seed.'
+
+    np.random.seed( seed )
+
+    return create_random_defectObject_list( jdata, numb )
+
+def return_rate_defectSystem( defectSystem, jdata ) :
+    'return rates of all defectObjects of defectSystem computed again by DefectObject.return_rate( ), as a matrix padded with zero rates.'
+
+    rate_matrix = np.zeros( ( defectSystem.numb_defectObject, defectSystem.width_rate_array ) )
+
+    for i in range( defectSystem.numb_defectObject ) :
+        rate_defectObject = defectSystem.return_rate_defectObject( jdata, i )
+        rate_matrix[ i, : len( rate_defectObject ) ] = rate_defectObject
+
+    return rate_matrix
+
+class NoOutputFile( object ) :
+    'outputFile of DefectSystem.evolution( ) without output.'
+
+    def is_output_now( self, defectSystem, jdata ) :
+        return False
+
+def return_balance( defectSystem ) :
+    'return the number of interstitials minus vacancies, kept by every reaction.'
+
+    return defectSystem.total_defects[ 'I' ] - defectSystem.total_defects[ 'V' ]
+
+def assert_equal_baseline( defectSystem, jdata ) :
+    '''
+    a defectSystem after new paths has the same ui, utotal and rates as the serial baseline path, 
+    i.e. a DefectSystem of jdata built again from its defectObjects without initial recombination.
+    '''
+
+    defectSystem_baseline = DefectSystem( dict( jdata, initial_recombine = False ), copy.deepcopy( defectSystem.defectObject_list ) )
+
+    numb = defectSystem.numb_defectObject
+
+    assert defectSystem_baseline.numb_defectObject == numb
+    assert np.allclose( defectSystem.ui_array[ : numb ], defectSystem_baseline.ui_array[ : numb ], rtol = 1.0E-6, atol = 1.0E-9 )
+    assert defectSystem.utotal == pytest.approx( defectSystem_baseline.utotal, rel = 1.0E-6, abs = 1.0E-9 )
+
+    width = min( defectSystem.width_rate_array, defectSystem_baseline.width_rate_array )
+    rate_matrix = defectSystem.return_rate_matrix( )
+    rate_matrix_baseline = defectSystem_baseline.return_rate_matrix( )
+
+    assert np.allclose( rate_matrix[ :, : width ], rate_matrix_baseline[ :, : width ], rtol = 1.0E-6, atol = 0.0 )
+    assert not np.any( rate_matrix[ :, width : ] ) and not np.any( rate_matrix_baseline[ :, width : ] )
+    assert defectSystem.sum_rate == pytest.approx( defectSystem_baseline.sum_rate, rel = 1.0E-6 )
+
+def test_set_temperature_recompute( ) :
+    'rates after set_temperature( ) by the default recompute are the rates of a system built at the new temperature.'
+
+    jdata = return_jdata( )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+
+    defectSystem.set_temperature( jdata, 700.0 )
+
+    jdata_700 = return_jdata( temperature = 700.0, initial_recombine = False )
+    defectSystem_700 = DefectSystem( jdata_700, copy.deepcopy( defectSystem.defectObject_list ) )
+
+    assert defectSystem.numb_defectObject == defectSystem_700.numb_defectObject
+    assert np.allclose( defectSystem.return_rate_matrix( ), defectSystem_700.return_rate_matrix( ), rtol = 1.0E-9, atol = 0.0 )
+    assert defectSystem.sum_rate == pytest.approx( defectSystem_700.sum_rate, rel = 1.0E-9 )
+
+def return_arrhenius_rate_function( size_prefactor = False ) :
+    '''
+    return DefectSystem._return_rate_neighbour( ) with rates nu * exp( -E / ( kb * T ) ) of energies E by the index and action,
+    nu = ConstNumber.prefactor, or nu scaled by 1, 2 or 3 with the index for size_prefactor, the prefactor of a size-dependent DefectObject.return_rate( ).
+    '''
+
+    def return_rate_neighbour( defectSystem, jdata, index, ui, neighbour_list ) :
+        tmp_ConstNumber = ConstNumber( jdata )
+        prefactor = tmp_ConstNumber.prefactor * ( 1 + index % 3 if size_prefactor else 1 )
+        return [ prefactor * np.exp( - ( 0.3 + 0.01 * ( index % 13 ) + 0.1 * k ) / ( tmp_ConstNumber.kb * defectSystem.temperature_evolution ) ) 
+                 for k in range( defectSystem.numb_actions_list[ index ] ) ]
+
+    return return_rate_neighbour
+
+def test_set_temperature_arrhenius( monkeypatch ) :
+    'the opt-in arrhenius rescaling agrees with recomputed rates of the prefactor nu, and raises RuntimeError for size-dependent prefactors.'
+
+    jdata = return_jdata( temperature_rescale = 'arrhenius', temperature_rescale_check = 1000000 )
+
+    monkeypatch.setattr( DefectSystem, '_return_rate_neighbour', return_arrhenius_rate_function( ) )
+
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+    defectSystem.set_temperature( jdata, 700.0 )
+
+    assert np.allclose( defectSystem.return_rate_matrix( ), return_rate_defectSystem( defectSystem, jdata ), rtol = 1.0E-6, atol = 0.0 )
+    assert defectSystem.sum_rate == pytest.approx( np.sum( return_rate_defectSystem( defectSystem, jdata ) ), rel = 1.0E-6 )
+
+    monkeypatch.setattr( DefectSystem, '_return_rate_neighbour', return_arrhenius_rate_function( size_prefactor = True ) )
+
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+
+    with pytest.raises( RuntimeError ) :
+        defectSystem.set_temperature( jdata, 700.0 )
+
+def test_evolution_parallel( ) :
+    '''
+    evolution_parallel( ) ends at the time of jdata, a pool gives the same defectObjects as one process, 
+    and the balance of interstitials and vacancies is the same as by the serial evolution( ).
+    '''
+
+    result_list = [ ]
+
+    for numb_process in [ 1, 2 ] :
+        jdata = return_jdata( box = [ 60.0, 60.0, 60.0 ], time = 1.0E-12, individual_cascade = True, seed = 5, parallel_domain = [ 2, 2, 1 ], 
+                              parallel_time_horizon = 3.0E-13, parallel_process = numb_process )
+        defectSystem = DefectSystem( jdata, return_defectObject_list( jdata, 300 ) )
+
+        defectSystem.evolution( jdata, NoOutputFile( ) )
+
+        assert defectSystem.c_time == pytest.approx( 1.0E-12, rel = 1.0E-12 )
+        assert defectSystem.c_step > 0
+
+        result_list.append( ( defectSystem.c_step, defectSystem.total_defects, np.sort( defectSystem.defect_store.position, axis = 0 ) ) )
+
+    assert result_list[ 0 ][ : 2 ] == result_list[ 1 ][ : 2 ]
+    assert np.array_equal( result_list[ 0 ][ 2 ], result_list[ 1 ][ 2 ] )
+
+    jdata = return_jdata( box = [ 60.0, 60.0, 60.0 ], time = 1.0E-12, individual_cascade = True, seed = 5 )
+    defectSystem_serial = DefectSystem( jdata, return_defectObject_list( jdata, 300 ) )
+
+    defectSystem_serial.evolution( jdata, NoOutputFile( ) )
+
+    assert return_balance( defectSystem_serial ) == return_balance( defectSystem )
+
+def test_evolution_parallel_temperature_schedule( ) :
+    'parallel_domain with temperature_schedule raises RuntimeError.'
+
+    jdata = return_jdata( box = [ 60.0, 60.0, 60.0 ], time = 1.0E-12, individual_cascade = True, parallel_domain = [ 2, 2, 1 ], parallel_time_horizon = 3.0E-13,
+                          parallel_process = 1, temperature_schedule = [ [ 600.0, 1.0E-12 ] ] )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata, 300 ) )
+
+    with pytest.raises( RuntimeError ) :
+        defectSystem.evolution( jdata, NoOutputFile( ) )
+
+def test_evolution_temperature_schedule( ) :
+    'evolution( ) with temperature_schedule ends at the sum of stage times, at the last temperature, with the rates of the baseline path.'
+
+    jdata = return_jdata( individual_cascade = True, seed = 5, temperature_schedule = [ [ 600.0, 2.0E-14 ], [ 650.0, 2.0E-14 ], [ 700.0, 2.0E-14 ] ] )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+
+    defectSystem.evolution( jdata, NoOutputFile( ) )
+
+    assert defectSystem.c_time == pytest.approx( 6.0E-14, rel = 1.0E-12 )
+    assert defectSystem.temperature_evolution == 700.0
+
+    assert_equal_baseline( defectSystem, return_jdata( individual_cascade = True, temperature = 700.0 ) )
+
+@pytest.mark.parametrize( 'kmc_selector', [ 'binary_tree', 'composition_rejection', 'next_reaction' ] )
+def test_evolution_temperature_schedule_equal_stages( kmc_selector ) :
+    '''
+    an isothermal annealing split into 10 stages of the same temperature takes the same number of events as one stage, 
+    the event after the end of a stage is dropped and the waiting time is drawn again from the end.
+    '''
+
+    jdata = return_jdata( individual_cascade = True, initial_recombine = False, kmc_selector = kmc_selector )
+    defectObject_list = return_defectObject_list( jdata, 40 )
+
+    stage_time = 5.0 / DefectSystem( jdata, copy.deepcopy( defectObject_list ) ).sum_rate
+
+    numb_step_dict = { 1 : [ ], 10 : [ ] }
+
+    for seed in range( 200 ) :
+        for numb_stage in [ 1, 10 ] :
+            jdata_stage = dict( jdata, seed = seed, temperature_schedule = [ [ 600.0, stage_time / numb_stage ] ] * numb_stage )
+            defectSystem = DefectSystem( jdata_stage, copy.deepcopy( defectObject_list ) )
+            defectSystem.evolution( jdata_stage, NoOutputFile( ) )
+            assert defectSystem.c_time == pytest.approx( stage_time, rel = 1.0E-9 )
+            numb_step_dict[ numb_stage ].append( defectSystem.c_step )
+
+    ( mean_1, mean_10 ) = ( np.mean( numb_step_dict[ 1 ] ), np.mean( numb_step_dict[ 10 ] ) )
+    sigma = np.sqrt( ( np.var( numb_step_dict[ 1 ] ) + np.var( numb_step_dict[ 10 ] ) ) / 200 )
+
+    assert abs( mean_1 - mean_10 ) < 5.0 * sigma
+
+def test_evolution_next_reaction( ) :
+    'kmc_selector next_reaction starts with the rates of binary_tree, and keeps ui and rates of the baseline path.'
+
+    jdata = return_jdata( individual_cascade = True, seed = 5, step = 300, kmc_selector = 'next_reaction' )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+    defectSystem.evolution( jdata, NoOutputFile( ) )
+
+    assert defectSystem.c_step == 300
+    assert defectSystem.rate_catalog.c_time == pytest.approx( defectSystem.c_time, rel = 1.0E-9 )
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+def test_evolution_superbasin( ) :
+    'superbasin exits keep ui and rates of the baseline path.'
+
+    jdata = return_jdata( individual_cascade = True, seed = 5, step = 300, superbasin = True, superbasin_min_flicker = 1 )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata, 60 ) )
+
+    defectSystem.evolution( jdata, NoOutputFile( ) )
+
+    assert defectSystem.c_step <= 300
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+@pytest.mark.parametrize( 'kwargs', [ { 'neighbour_skin' : 0.5, 'linkcell_recombine_radius' : 0.5 },
+                                      { 'elastic_pair_ledger' : True },
+                                      { 'neighbour_skin' : 0.5, 'linkcell_recombine_radius' : 0.5, 'elastic_pair_ledger' : True } ] )
+def test_evolution_neighbour_list_pair_ledger( kwargs ) :
+    'neighbour lists and the pair ledger keep ui, utotal and rates of the baseline path after events.'
+
+    jdata = return_jdata( individual_cascade = True, seed = 5, step = 300, **kwargs )
+    defectSystem = DefectSystem( jdata, return_defectObject_list( jdata ) )
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+    defectSystem.evolution( jdata, NoOutputFile( ) )
+
+    assert defectSystem.c_step == 300
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+def set_kernel_u_neighbour( monkeypatch, jdata, defectObject_list, factor ) :
+    '''
+    DefectObject.return_u_neighbour( ) of every class in defectObject_list is set to factor times U_ij of elastic_kernel of jdata,
+    return the list of the numbers of neighbours of every call.
+    '''
+
+    elastic_kernel = create_elastic_kernel( jdata )
+    call_list = [ ]
+
+    def return_u_neighbour( tmp_defectObject, tmp_jdata, tmp_ConstNumber, neighbour_list ) :
+        call_list.append( len( neighbour_list ) )
+        if len( neighbour_list ) == 0 : return 0.0
+        defect_store = DefectStore( jdata, [ tmp_defectObject ] + list( neighbour_list ) )
+        return factor * elastic_kernel.return_u_neighbour( defect_store, tmp_ConstNumber, 0, list( range( 1, len( neighbour_list ) + 1 ) ) )
+
+    for item in set( type( tmp_defectObject ) for tmp_defectObject in defectObject_list ) :
+        monkeypatch.setattr( item, 'return_u_neighbour', return_u_neighbour )
+
+    return call_list
+
+def test_elastic_kernel_check( monkeypatch ) :
+    '''
+    elastic_kernel dipole agrees with DefectObject.return_u_neighbour( ) equal to the kernel on the checked pairs, 
+    and the system equals the baseline path by DefectObject.return_u_neighbour( ), a DefectObject.return_u_neighbour( ) 10 % off raises RuntimeError.
+    '''
+
+    jdata = return_jdata( elastic_kernel = 'dipole', elastic_kernel_check = 1000000, initial_recombine = False )
+
+    defectObject_list = return_defectObject_list( jdata )
+
+    call_list = set_kernel_u_neighbour( monkeypatch, jdata, defectObject_list, 1.0 )
+
+    defectSystem = DefectSystem( jdata, copy.deepcopy( defectObject_list ) )
+
+    assert len( call_list ) > 0
+
+    assert_equal_baseline( defectSystem, return_jdata( ) )
+
+    set_kernel_u_neighbour( monkeypatch, jdata, defectObject_list, 1.1 )
+
+    with pytest.raises( RuntimeError ) :
+        DefectSystem( jdata, copy.deepcopy( defectObject_list ) )
+
+def test_elastic_kernel_bulk( ) :
+    '''
+    ui of the bulk path of elastic_kernel dipole, pairs by kdtree or by cells, equal ui summed over neighbours by return_ui_index( ),
+    the kernel is not compared with DefectObject.return_u_neighbour( ) here, see test_elastic_kernel_check( ).
+    '''
+
+    jdata = return_jdata( elastic_kernel = 'dipole', elastic_kernel_check = 0, initial_recombine = False )
+    jdata_kdtree = return_jdata( elastic_kernel = 'dipole', elastic_kernel_check = 0, initial_recombine = False, neighbour_backend = 'kdtree' )
+
+    defectObject_list = return_defectObject_list( jdata, 300 )
+
+    defectSystem = DefectSystem( jdata, copy.deepcopy( defectObject_list ) )
+    defectSystem_kdtree = DefectSystem( jdata_kdtree, copy.deepcopy( defectObject_list ) )
+
+    pair_array = defectSystem.return_pair_array( jdata )
+    pair_array_kdtree = defectSystem_kdtree.return_pair_array( jdata_kdtree )
+
+    'pairs within rcutoff_elastic are the same, cells may give more pairs beyond it.'
+    u_array = defectSystem.elastic_kernel.return_pair_energy_array( defectSystem.defect_store, ConstNumber( jdata ), pair_array[ :, 0 ], pair_array[ :, 1 ] )
+    assert set( map( tuple, pair_array[ u_array != 0.0 ].tolist( ) ) ) <= set( map( tuple, pair_array_kdtree.tolist( ) ) )
+
+    const_number = ConstNumber( jdata )
+    ui_array = np.array( [ defectSystem.return_ui_index( jdata, const_number, index ) for index in range( defectSystem.numb_defectObject ) ] )
+
+    assert np.allclose( defectSystem.ui_array[ : defectSystem.numb_defectObject ], ui_array, rtol = 1.0E-9, atol = 1.0E-12 )
+    assert np.allclose( defectSystem_kdtree.ui_array[ : defectSystem.numb_defectObject ], ui_array, rtol = 1.0E-9, atol = 1.0E-12 )
+    assert defectSystem_kdtree.utotal == pytest.approx( float( np.sum( ui_array ) ), rel = 1.0E-9, abs = 1.0E-12 )
+
 if __name__ == '__main__' :
 
     '''
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+'This is an ElasticFarField module, long-range elastic interaction of dislocation loops by a Barnes-Hut tree of elastic dipoles.'
+
+import numpy as np
+import argparse
+import math
+
+from Auxiliary import j_have, j_must_have
+from DefectStore import defecttype_list
+
+def return_dipole_energy_array( dipole_1_array,
+                                dipole_2_array,
+                                delta_array,
+                                shear_modulus,
+                                poisson_ratio   ) :
+    '''
+    return the interaction energy E = - P1_ij P2_kl G_ik,jl( r ) of elastic dipoles P1 and P2 at r = delta_array[ m, 3 ],
+    G is the isotropic Green's function G_ik = [ ( 3 - 4 nu ) delta_ik + n_i n_k ] / ( 16 pi mu ( 1 - nu ) r ),
+    dipole_1_array and dipole_2_array are [ m, 3, 3 ] or [ 3, 3 ], symmetric, unit: eV.
+    E = - [ -2 ( 1 - 2 nu ) P1:P2 - 12 nu ( P1 n ).( P2 n ) + trP1 trP2 - 3 ( trP1 nP2n + trP2 nP1n ) + 15 nP1n nP2n ] / ( 16 pi mu ( 1 - nu ) r^3 ),
+    E is zero for two centres of dilatation, i.e. P1 and P2 are isotropic.
+    '''
+
+    delta_array = np.asarray( delta_array, dtype = np.float64 ).reshape( -1, 3 )
+
+    r_array = np.sqrt( np.sum( delta_array * delta_array, axis = 1 ) )
+    n_array = delta_array / r_array[ :, np.newaxis ]
+
+    dipole_1_array = np.broadcast_to( dipole_1_array, ( len( r_array ), 3, 3 ) )
+    dipole_2_array = np.broadcast_to( dipole_2_array, ( len( r_array ), 3, 3 ) )
+
+    Pn_1 = np.einsum( 'mij,mj->mi', dipole_1_array, n_array )
+    Pn_2 = np.einsum( 'mij,mj->mi', dipole_2_array, n_array )
+
+    nPn_1 = np.sum( Pn_1 * n_array, axis = 1 )
+    nPn_2 = np.sum( Pn_2 * n_array, axis = 1 )
+
+    trace_1 = np.trace( dipole_1_array, axis1 = 1, axis2 = 2 )
+    trace_2 = np.trace( dipole_2_array, axis1 = 1, axis2 = 2 )
+
+    contract = - 2.0 * ( 1.0 - 2.0 * poisson_ratio ) * np.einsum( 'mij,mij->m', dipole_1_array, dipole_2_array ) \
+               - 12.0 * poisson_ratio * np.sum( Pn_1 * Pn_2, axis = 1 ) \
+               + trace_1 * trace_2 - 3.0 * ( trace_1 * nPn_2 + trace_2 * nPn_1 ) + 15.0 * nPn_1 * nPn_2
+
+    return - contract / ( 16.0 * math.pi * shear_modulus * ( 1.0 - poisson_ratio ) * r_array ** 3 )
+
+def create_elastic_far_field( jdata ) :
+    'return Class ElasticFarField when jdata[ "elastic_far_cutoff" ] is set, otherwise None, i.e. elastic interaction is truncated at rcutoff_elastic.'
+
+    if j_have( jdata, 'elastic_far_cutoff' ) : return ElasticFarField( jdata )
+
+    return None
+
+class ElasticFarField( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        Loops interact beyond rcutoff_elastic up to self.far_cutoff as elastic dipoles P = C : Omega, Omega_ij = +- nsize * Omega_atom * b_i b_j
+        of a prismatic loop with the unit burgers vector b, + for interstitial and - for vacancy loops, C isotropic with ConstNumber.
+        ui_far = 0.5 * sigma_( j ) E_ij over loops j with rcutoff_elastic .le. r_ij .lt. self.far_cutoff, the nearest periodic image,
+        pairs within rcutoff_elastic are the near field of DefectSystem in 27 cells, so no pair is taken twice.
+        The sum is taken by a Barnes-Hut tree, O( N log N ) :
+         a. a kd tree of loops, split at the median along the longest side, every node keeps its box, the sum of its dipoles
+            and the mean position of its loops,
+         b. a node is taken as one dipole at its mean position with the first moment of its loops, when it is between
+            rcutoff_elastic and self.far_cutoff and its size / distance .lt. self.theta, otherwise it is opened,
+            loops of a leaf are taken pair by pair,
+         c. the tree is walked by blocks of loops at once in numpy arrays, one level by one iteration.
+        ui_far of all loops is refreshed every self.interval steps, a moved loop changes ui_far of far loops only a little,
+        and only ui_far changed by more than self.tolerance is taken, so only these loops are reset by DefectSystem.
+        A loop added after the last refresh takes ui_far by the tree of the last refresh, until the next refresh.
+        The near field must be the same dipole model, i.e. jdata[ 'elastic_kernel' ] is 'dipole', so U_ij of two loops is continuous at rcutoff_elastic.
+
+        Properties of ElasticFarField :
+         1. self.near_cutoff, rcutoff_elastic, self.far_cutoff, jdata[ 'elastic_far_cutoff' ]
+         2. self.theta, jdata[ 'elastic_far_theta' ], 0.2 by default, the error of ui_far is about 1 % at 0.2 and 10 % at 0.3.
+         3. self.leaf_size, jdata[ 'elastic_far_leaf' ], 8 by default.
+         4. self.interval, jdata[ 'elastic_far_interval' ], 100 steps by default.
+         5. self.box, self.periodic
+         6. self.loop_code_array, type codes of DefectStore of loops.
+         7. self.ui_far_dict, { handle : ui_far } of the last refresh and loops added after it, 0.0 for other defectObjects.
+         8. self.numb_step, steps since the last refresh, self.numb_refresh
+         9. self.tolerance, jdata[ 'elastic_far_tolerance' ], 1.0E-6 eV by default.
+         10. self.tree, ( tree, position_array, dipole_array ) of loops of the last refresh, None for no loop.
+        '''
+
+        self.near_cutoff = j_must_have( jdata, 'rcutoff_elastic' )
+        self.far_cutoff = j_must_have( jdata, 'elastic_far_cutoff' )
+
+        self.theta = 0.2
+        if j_have( jdata, 'elastic_far_theta' ) : self.theta = jdata[ 'elastic_far_theta' ]
+
+        self.leaf_size = 8
+        if j_have( jdata, 'elastic_far_leaf' ) : self.leaf_size = jdata[ 'elastic_far_leaf' ]
+
+        self.interval = 100
+        if j_have( jdata, 'elastic_far_interval' ) : self.interval = jdata[ 'elastic_far_interval' ]
+
+        self.tolerance = 1.0E-6
+        if j_have( jdata, 'elastic_far_tolerance' ) : self.tolerance = jdata[ 'elastic_far_tolerance' ]
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = bool )
+
+        if self.far_cutoff <= self.near_cutoff :
+            raise RuntimeError( 'elastic_far_cutoff %f .le. rcutoff_elastic %f, wrong !' % ( self.far_cutoff, self.near_cutoff ) )
+
+        'the nearest image is unique within self.far_cutoff.'
+        if np.any( self.periodic & ( 2.0 * self.far_cutoff > self.box ) ) :
+            raise RuntimeError( 'elastic_far_cutoff %f .gt. half of the periodic box, wrong !' % self.far_cutoff )
+
+        self.loop_code_array = np.array( [ i for ( i, item ) in enumerate( defecttype_list ) if 'Loop' in item ], dtype = np.int64 )
+
+        self.ui_far_dict = { }
+
+        self.numb_step = 0
+        self.numb_refresh = 0
+
+        self.tree = None
+
+    def return_dipole_array( self,
+                             defect_store,
+                             const_number,
+                             index_array  ) :
+        'return dipoles [ len( index_array ), 3, 3 ] of loops with index_array in defect_store, unit: eV.'
+
+        burgers_array = defect_store.burgers_vector_scale[ index_array ]
+        burgers_array = burgers_array / np.sqrt( np.sum( burgers_array * burgers_array, axis = 1 ) )[ :, np.newaxis ]
+
+        sign_array = 1.0 - 2.0 * defect_store.IV_code_array[ defect_store.type_code[ index_array ] ]
+
+        'Omega_ij = +- nsize * Omega_atom * b_i b_j, trace( Omega ) = +- nsize * Omega_atom.'
+        volume_array = sign_array * defect_store.nsize[ index_array ] * const_number.volume
+
+        shear_modulus = const_number.shear_modulus
+        lame = 2.0 * shear_modulus * const_number.poisson_ratio / ( 1.0 - 2.0 * const_number.poisson_ratio )
+
+        return lame * volume_array[ :, np.newaxis, np.newaxis ] * np.eye( 3 )[ np.newaxis, :, : ] \
+               + 2.0 * shear_modulus * volume_array[ :, np.newaxis, np.newaxis ] * burgers_array[ :, :, np.newaxis ] * burgers_array[ :, np.newaxis, : ]
+
+    def _build_tree( self,
+                     position_array,
+                     dipole_array    ) :
+        '''
+        return the kd tree ( order, start, count, lower, upper, centre, dipole, moment, child ) of arrays of nodes, the root is node 0,
+        loops of node k are order[ start[ k ] : start[ k ] + count[ k ] ], child[ k ] is [ left, right ] or [ -1, -1 ] for a leaf,
+        dipole[ k ] = sigma_( j ) P_j and moment[ k, :, :, l ] = sigma_( j ) P_j ( x_j - centre[ k ] )_l over loops j of node k.
+        '''
+
+        order = np.arange( len( position_array ) )
+
+        start_list = [ 0 ]
+        count_list = [ len( position_array ) ]
+        child_list = [ [ -1, -1 ] ]
+
+        node = 0
+
+        while node < len( start_list ) :
+
+            ( start, count ) = ( start_list[ node ], count_list[ node ] )
+
+            if count > self.leaf_size :
+                position = position_array[ order[ start : start + count ] ]
+
+                axis = int( np.argmax( np.max( position, axis = 0 ) - np.min( position, axis = 0 ) ) )
+                half = count // 2
+
+                order[ start : start + count ] = order[ start : start + count ][ np.argpartition( position[ :, axis ], half ) ]
+
+                child_list[ node ] = [ len( start_list ), len( start_list ) + 1 ]
+
+                start_list.extend( [ start, start + half ] )
+                count_list.extend( [ half, count - half ] )
+                child_list.extend( [ [ -1, -1 ], [ -1, -1 ] ] )
+
+            node += 1
+
+        start_array = np.array( start_list, dtype = np.int64 )
+        count_array = np.array( count_list, dtype = np.int64 )
+
+        'boxes, mean positions and sums of dipoles of all nodes by the sorted loops.'
+        sorted_position = position_array[ order ]
+        sorted_dipole = dipole_array[ order ]
+
+        cumsum_position = np.concatenate( ( np.zeros( ( 1, 3 ) ), np.cumsum( sorted_position, axis = 0 ) ) )
+        cumsum_dipole = np.concatenate( ( np.zeros( ( 1, 3, 3 ) ), np.cumsum( sorted_dipole, axis = 0 ) ) )
+        cumsum_moment = np.concatenate( ( np.zeros( ( 1, 3, 3, 3 ) ), np.cumsum( sorted_dipole[ :, :, :, np.newaxis ] * sorted_position[ :, np.newaxis, np.newaxis, : ], axis = 0 ) ) )
+
+        centre_array = ( cumsum_position[ start_array + count_array ] - cumsum_position[ start_array ] ) / count_array[ :, np.newaxis ]
+        node_dipole_array = cumsum_dipole[ start_array + count_array ] - cumsum_dipole[ start_array ]
+        node_moment_array = cumsum_moment[ start_array + count_array ] - cumsum_moment[ start_array ] \
+                            - node_dipole_array[ :, :, :, np.newaxis ] * centre_array[ :, np.newaxis, np.newaxis, : ]
+
+        lower_array = np.array( [ np.min( sorted_position[ item : item + numb ], axis = 0 ) for ( item, numb ) in zip( start_list, count_list ) ] )
+        upper_array = np.array( [ np.max( sorted_position[ item : item + numb ], axis = 0 ) for ( item, numb ) in zip( start_list, count_list ) ] )
+
+        return ( order, start_array, count_array, lower_array, upper_array, centre_array, node_dipole_array, node_moment_array, np.array( child_list, dtype = np.int64 ) )
+
+    def _return_image_array( self, position_array ) :
+        '''
+        return ( image_position, image_index ), images of every row of position_array which may be within self.far_cutoff
+        of the box along periodic directions, image_index is the row of every image.
+        '''
+
+        image_position = np.array( position_array, dtype = np.float64 )
+        image_index = np.arange( len( position_array ) )
+
+        for j in range( 3 ) :
+            if not self.periodic[ j ] : continue
+
+            shift = np.zeros( len( image_position ) )
+            shift[ image_position[ :, j ] < self.far_cutoff ] = self.box[ j ]
+            shift[ image_position[ :, j ] > self.box[ j ] - self.far_cutoff ] = - self.box[ j ]
+
+            select = shift != 0.0
+
+            shift_position = image_position[ select ].copy( )
+            shift_position[ :, j ] += shift[ select ]
+
+            image_position = np.concatenate( ( image_position, shift_position ) )
+            image_index = np.concatenate( ( image_index, image_index[ select ] ) )
+
+        return ( image_position, image_index )
+
+    def return_node_energy_array( self,
+                                  dipole_array,
+                                  node_dipole_array,
+                                  node_moment_array,
+                                  delta_array,
+                                  shear_modulus,
+                                  poisson_ratio      ) :
+        '''
+        return the energy of dipoles with nodes at delta_array, expanded to the first order of loops around the centres of nodes,
+        E = E( P, dipole, delta ) + sigma_( l ) d E( P, moment[ :, :, l ], delta ) / d delta_l, the derivative by central differences,
+        E is linear in the second dipole, so the error is O( ( size / distance )^2 ) even if I and V loops cancel in dipole.
+        '''
+
+        energy_array = return_dipole_energy_array( dipole_array, node_dipole_array, delta_array, shear_modulus, poisson_ratio )
+
+        step_array = 1.0E-4 * np.sqrt( np.sum( delta_array * delta_array, axis = 1 ) )
+
+        for l in range( 3 ) :
+            shift_array = np.zeros( delta_array.shape )
+            shift_array[ :, l ] = step_array
+
+            energy_array += ( return_dipole_energy_array( dipole_array, node_moment_array[ :, :, :, l ], delta_array + shift_array, shear_modulus, poisson_ratio )
+                              - return_dipole_energy_array( dipole_array, node_moment_array[ :, :, :, l ], delta_array - shift_array, shear_modulus, poisson_ratio ) ) / ( 2.0 * step_array )
+
+        return energy_array
+
+    def return_energy_array( self,
+                             position_array,
+                             dipole_array,
+                             shear_modulus,
+                             poisson_ratio,
+                             block = 256     ) :
+        'return sigma_( j ) E_ij of every loop i over loops j with self.near_cutoff .le. r_ij .lt. self.far_cutoff.'
+
+        tree = self._build_tree( position_array, dipole_array )
+
+        return self.return_tree_energy_array( tree, position_array, dipole_array, position_array, dipole_array, shear_modulus, poisson_ratio, block )
+
+    def return_tree_energy_array( self,
+                                  tree,
+                                  position_array,
+                                  dipole_array,
+                                  target_position_array,
+                                  target_dipole_array,
+                                  shear_modulus,
+                                  poisson_ratio,
+                                  block = 256            ) :
+        '''
+        return sigma_( j ) E_ij of every target i over loops j of tree with self.near_cutoff .le. r_ij .lt. self.far_cutoff,
+        tree of self._build_tree( position_array, dipole_array ).
+        the tree is walked by all images of a block of targets at once, level by level, every pair ( image, node ) is
+         a. dropped, when the node is out of the shell [ self.near_cutoff, self.far_cutoff ) of the image,
+         b. taken as one dipole with its first moment, when the node is in the shell and its size / distance .lt. self.theta,
+         c. taken pair by pair, when the node is a leaf,
+         d. replaced by the pairs of its children.
+        '''
+
+        ( order, start_array, count_array, lower_array, upper_array, centre_array, node_dipole_array, node_moment_array, child_array ) = tree
+
+        'the size of a node is the distance from its centre to the farthest corner of its box.'
+        size_array = np.sqrt( np.sum( np.maximum( upper_array - centre_array, centre_array - lower_array ) ** 2, axis = 1 ) )
+
+        ( image_position, image_index ) = self._return_image_array( target_position_array )
+
+        energy_array = np.zeros( len( target_position_array ) )
+
+        for block_start in range( 0, len( image_index ), block ) :
+
+            row_array = np.arange( block_start, min( block_start + block, len( image_index ) ) )
+            node_array = np.zeros( len( row_array ), dtype = np.int64 )
+
+            while len( row_array ) != 0 :
+
+                position = image_position[ row_array ]
+                index_array = image_index[ row_array ]
+
+                'the nearest and the farthest distances between images and boxes of nodes.'
+                lower = lower_array[ node_array ] - position
+                upper = position - upper_array[ node_array ]
+
+                min_distance = np.sqrt( np.sum( np.maximum( np.maximum( lower, upper ), 0.0 ) ** 2, axis = 1 ) )
+                max_distance = np.sqrt( np.sum( np.maximum( np.abs( lower ), np.abs( upper ) ) ** 2, axis = 1 ) )
+
+                delta = centre_array[ node_array ] - position
+                distance = np.sqrt( np.sum( delta * delta, axis = 1 ) )
+
+                keep = ( min_distance < self.far_cutoff ) & ( max_distance >= self.near_cutoff )
+
+                accept = keep & ( min_distance >= self.near_cutoff ) & ( max_distance < self.far_cutoff ) & ( size_array[ node_array ] < self.theta * distance )
+                leaf = keep & ~accept & ( child_array[ node_array, 0 ] == -1 )
+                split = keep & ~accept & ~leaf
+
+                'b. nodes taken as one dipole.'
+                if np.any( accept ) :
+                    energy = self.return_node_energy_array( target_dipole_array[ index_array[ accept ] ], node_dipole_array[ node_array[ accept ] ],
+                                                            node_moment_array[ node_array[ accept ] ], delta[ accept ], shear_modulus, poisson_ratio )
+                    np.add.at( energy_array, index_array[ accept ], energy )
+
+                'c. loops of leaves pair by pair.'
+                if np.any( leaf ) :
+                    leaf_count = count_array[ node_array[ leaf ] ]
+
+                    pair_row = np.repeat( np.flatnonzero( leaf ), leaf_count )
+                    pair_offset = np.arange( np.sum( leaf_count ) ) - np.repeat( np.cumsum( leaf_count ) - leaf_count, leaf_count )
+                    pair_source = order[ np.repeat( start_array[ node_array[ leaf ] ], leaf_count ) + pair_offset ]
+
+                    pair_delta = position_array[ pair_source ] - position[ pair_row ]
+                    pair_distance = np.sqrt( np.sum( pair_delta * pair_delta, axis = 1 ) )
+
+                    shell = ( pair_distance >= self.near_cutoff ) & ( pair_distance < self.far_cutoff )
+
+                    if np.any( shell ) :
+                        pair_index = index_array[ pair_row[ shell ] ]
+                        energy = return_dipole_energy_array( target_dipole_array[ pair_index ], dipole_array[ pair_source[ shell ] ], pair_delta[ shell ], shear_modulus, poisson_ratio )
+                        np.add.at( energy_array, pair_index, energy )
+
+                'd. children of opened nodes.'
+                row_array = np.concatenate( ( row_array[ split ], row_array[ split ] ) )
+                node_array = np.concatenate( ( child_array[ node_array[ split ], 0 ], child_array[ node_array[ split ], 1 ] ) )
+
+        return energy_array
+
+    def _return_loop_index_array( self,
+                                  defect_store,
+                                  index_array   ) :
+        'return indexes of loops with a burgers vector in index_array of defect_store.'
+
+        index_array = np.asarray( index_array, dtype = np.int64 )
+
+        loop_array = np.isin( defect_store.type_code[ index_array ], self.loop_code_array ) & np.any( defect_store.burgers_vector_scale[ index_array ] != 0.0, axis = 1 )
+
+        return index_array[ loop_array ]
+
+    def refresh( self,
+                 defect_store,
+                 handle_list,
+                 const_number ) :
+        '''
+        reset self.ui_far_dict of all loops in defect_store by one tree, defectObjects other than loops have ui_far of 0.0,
+        ui_far changed by not more than self.tolerance is kept, return handles with ui_far changed.
+        '''
+
+        old_ui_far_dict = self.ui_far_dict
+
+        self.ui_far_dict = { }
+        self.numb_step = 0
+        self.numb_refresh += 1
+        self.tree = None
+
+        index_array = self._return_loop_index_array( defect_store, np.arange( len( handle_list ) ) )
+
+        if len( index_array ) != 0 :
+            position_array = defect_store.position[ index_array ]
+            dipole_array = self.return_dipole_array( defect_store, const_number, index_array )
+
+            self.tree = ( self._build_tree( position_array, dipole_array ), position_array, dipole_array )
+
+            energy_array = self.return_tree_energy_array( self.tree[ 0 ], position_array, dipole_array, position_array, dipole_array, const_number.shear_modulus, const_number.poisson_ratio )
+
+            self.ui_far_dict = { handle_list[ index ] : 0.5 * energy for ( index, energy ) in zip( index_array.tolist( ), energy_array.tolist( ) ) }
+
+        changed_handle_list = [ ]
+
+        for handle in handle_list :
+            old_ui_far = old_ui_far_dict.get( handle, 0.0 )
+
+            if abs( self.ui_far_dict.get( handle, 0.0 ) - old_ui_far ) > self.tolerance :
+                changed_handle_list.append( handle )
+            elif handle in self.ui_far_dict or old_ui_far != 0.0 :
+                self.ui_far_dict[ handle ] = old_ui_far
+
+        return changed_handle_list
+
+    def return_ui_far( self,
+                       defect_store,
+                       handle_list,
+                       index,
+                       const_number  ) :
+        '''
+        return ui_far of index in defect_store of the last refresh, 
+        ui_far of a loop added after it is taken by the tree of the last refresh and kept until the next refresh.
+        '''
+
+        handle = handle_list[ index ]
+
+        if handle in self.ui_far_dict : return self.ui_far_dict[ handle ]
+
+        ui_far = 0.0
+
+        if self.tree != None and len( self._return_loop_index_array( defect_store, [ index ] ) ) != 0 :
+            ( tree, position_array, dipole_array ) = self.tree
+            energy_array = self.return_tree_energy_array( tree, position_array, dipole_array, defect_store.position[ [ index ] ],
+                                                          self.return_dipole_array( defect_store, const_number, np.array( [ index ] ) ),
+                                                          const_number.shear_modulus, const_number.poisson_ratio )
+            ui_far = 0.5 * float( energy_array[ 0 ] )
+
+        self.ui_far_dict[ handle ] = ui_far
+
+        return ui_far
+
+    def return_refresh_now( self ) :
+        'count one step, return True every self.interval steps.'
+
+        self.numb_step += 1
+
+        return self.numb_step >= self.interval
+
+    def _return_properties( self ) :
+        '''
+        Properties of ElasticFarField :
+         1. self.near_cutoff, self.far_cutoff
+         2. self.theta
+         3. self.leaf_size
+         4. self.interval
+         5. self.box, self.periodic
+         6. self.numb_step, self.numb_refresh
+         7. the sum of ui_far.
+         8. self.tolerance
+        '''
+
+        properties_list = [ [ 'near_cutoff',  self.near_cutoff                     ],
+                            [ 'far_cutoff',   self.far_cutoff                      ],
+                            [ 'theta',        self.theta                           ],
+                            [ 'leaf_size',    self.leaf_size                       ],
+                            [ 'interval',     self.interval                        ],
+                            [ 'box',          self.box                             ],
+                            [ 'periodic',     self.periodic                        ],
+                            [ 'numb_step',    self.numb_step                       ],
+                            [ 'numb_refresh', self.numb_refresh                    ],
+                            [ 'utotal_far',   sum( self.ui_far_dict.values( ) )    ],
+                            [ 'tolerance',    self.tolerance                       ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for ElasticFarField --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class ElasticFarField detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 400,
+                         help = 'the number of loops' )
+
+    args = parser.parse_args( )
+
+    from ConstNumber import ConstNumber
+
+    jdata = { 'box' : [ 60.0, 60.0, 40.0 ], 'periodic' : [ True, True, False ], 'alatt' : 0.3165, 'lattice' : 'bcc',
+              'rcutoff_elastic' : 3.0, 'elastic_far_cutoff' : 20.0, 'elastic_far_leaf' : 4 }
+
+    const_number = ConstNumber( jdata )
+
+    elasticFarField = ElasticFarField( jdata )
+
+    'the dipole energy of two coaxial prismatic loops, E = - 2 mu^2 V1 V2 ( 1 + nu ) / ( pi mu ( 1 - nu ) r^3 ) * ( 1 - 2 nu + nu ) / ( 1 - 2 nu ) by the tensor form.'
+    mu = const_number.shear_modulus
+    nu = const_number.poisson_ratio
+
+    b = np.array( [ 0.0, 0.0, 1.0 ] )
+    P = elasticFarField.return_dipole_array( type( 'Store', ( object, ), { 'burgers_vector_scale' : np.array( [ b ] ), 'IV_code_array' : np.array( [ 0 ] ),
+                                                                           'type_code' : np.array( [ 0 ] ), 'nsize' : np.array( [ 1 ] ) } )( ), const_number, np.array( [ 0 ] ) )[ 0 ]
+
+    'brute force: E = - P1_ij P2_kl G_ik,jl by central differences of the Green function.'
+    def return_green( x ) :
+        r = np.linalg.norm( x )
+        return ( ( 3.0 - 4.0 * nu ) * np.eye( 3 ) / r + np.outer( x, x ) / r ** 3 ) / ( 16.0 * math.pi * mu * ( 1.0 - nu ) )
+
+    x = np.array( [ 1.3, -0.7, 2.1 ] )
+    h = 1.0E-3
+    second = np.zeros( ( 3, 3, 3, 3 ) )
+    for j in range( 3 ) :
+        for l in range( 3 ) :
+            ( ej, el ) = ( np.eye( 3 )[ j ] * h, np.eye( 3 )[ l ] * h )
+            second[ :, :, j, l ] = ( return_green( x + ej + el ) - return_green( x + ej - el ) - return_green( x - ej + el ) + return_green( x - ej - el ) ) / ( 4.0 * h * h )
+
+    P2 = P.copy( )
+    P2[ 0, 1 ] = P2[ 1, 0 ] = 0.3 * P[ 2, 2 ]
+    real_energy = - np.einsum( 'ij,kl,ikjl->', P, P2, second )
+
+    if abs( return_dipole_energy_array( P, P2, x, mu, nu )[ 0 ] / real_energy - 1.0 ) > 1.0E-5 :
+        raise RuntimeError( '# dipole energy wrong !' )
+
+    if abs( return_dipole_energy_array( np.eye( 3 ), 2.0 * np.eye( 3 ), x, mu, nu )[ 0 ] ) > 1.0E-12 :
+        raise RuntimeError( '# two centres of dilatation interact, wrong !' )
+
+    'loops in a periodic box, ui_far by the tree equals the pair by pair sum.'
+    class LoopStore( object ) :
+        def __init__( self, numb ) :
+            random_state = np.random.RandomState( 7 )
+            self.position = random_state.rand( numb, 3 ) * elasticFarField.box
+            self.burgers_vector_scale = np.array( [ [ 1.0, 1.0, 1.0 ], [ 1.0, -1.0, 1.0 ], [ 0.0, 0.0, 1.0 ] ] )[ random_state.randint( 3, size = numb ) ]
+            self.type_code = np.array( [ defecttype_list.index( item ) for item in random_state.choice( [ 'ILoop111', 'VLoop111', 'ILoop100' ], size = numb ) ] )
+            self.IV_code_array = np.array( [ int( item[ 0 ] == 'V' ) for item in defecttype_list ] )
+            self.nsize = random_state.randint( 10, 200, size = numb )
+
+    store = LoopStore( args.numb )
+    handle_list = list( range( args.numb ) )
+
+    elasticFarField.refresh( store, handle_list, const_number )
+
+    dipole_array = elasticFarField.return_dipole_array( store, const_number, np.arange( args.numb ) )
+
+    real_ui_array = np.zeros( args.numb )
+    for i in range( args.numb ) :
+        delta_array = store.position - store.position[ i ]
+        delta_array -= elasticFarField.periodic * elasticFarField.box * np.round( delta_array / elasticFarField.box )
+        distance_array = np.sqrt( np.sum( delta_array * delta_array, axis = 1 ) )
+        keep = ( distance_array >= 3.0 ) & ( distance_array < 20.0 )
+        real_ui_array[ i ] = 0.5 * np.sum( return_dipole_energy_array( dipole_array[ i ], dipole_array[ keep ], delta_array[ keep ], mu, nu ) )
+
+    ui_far_array = np.array( [ elasticFarField.return_ui_far( store, handle_list, item, const_number ) for item in range( args.numb ) ] )
+
+    error = np.max( np.abs( ui_far_array - real_ui_array ) ) / np.max( np.abs( real_ui_array ) )
+
+    if error > 0.01 :
+        raise RuntimeError( '# ui_far by the tree wrong, relative error %f !' % error )
+
+    print( '# relative error of ui_far by the tree : %e' % error )
+
+    'a loop added after the refresh, the last loop with a new handle, takes ui_far by the tree of the refresh.'
+    new_handle_list = handle_list[ : -1 ] + [ 2 * args.numb ]
+    ui_far = elasticFarField.return_ui_far( store, new_handle_list, args.numb - 1, const_number )
+
+    if abs( ui_far - real_ui_array[ -1 ] ) > 0.01 * np.max( np.abs( real_ui_array ) ) :
+        raise RuntimeError( '# ui_far of an added loop wrong !' )
+
+    'a moved loop, only ui_far changed by more than the tolerance is returned, the others are kept.'
+    elasticFarField.refresh( store, handle_list, const_number )
+    old_ui_far_array = np.array( [ elasticFarField.return_ui_far( store, handle_list, item, const_number ) for item in range( args.numb ) ] )
+
+    store.position[ 0 ] += np.array( [ 1.0, 0.0, 0.0 ] )
+    changed_handle_list = elasticFarField.refresh( store, handle_list, const_number )
+
+    ui_far_array = np.array( [ elasticFarField.return_ui_far( store, handle_list, item, const_number ) for item in range( args.numb ) ] )
+    real_ui_far_array = 0.5 * elasticFarField.return_energy_array( store.position, dipole_array, mu, nu )
+
+    if len( changed_handle_list ) == 0 or len( changed_handle_list ) == args.numb :
+        raise RuntimeError( '# changed ui_far of a moved loop wrong !' )
+
+    if np.any( ui_far_array[ ~np.isin( handle_list, changed_handle_list ) ] != old_ui_far_array[ ~np.isin( handle_list, changed_handle_list ) ] ) :
+        raise RuntimeError( '# unchanged ui_far is not kept, wrong !' )
+
+    if np.max( np.abs( ui_far_array - real_ui_far_array ) ) > elasticFarField.tolerance :
+        raise RuntimeError( '# ui_far beyond the tolerance, wrong !' )
+
+    'the near field of the dipole kernel is the same model, U_ij of two loops is continuous at rcutoff_elastic.'
+    from ElasticKernel import ElasticKernel
+
+    jdata[ 'elastic_kernel' ] = 'dipole'
+    elasticKernel = ElasticKernel( jdata )
+
+    store.position[ 1 ] = store.position[ 0 ] + 0.999999 * 3.0 * np.array( [ 0.6, 0.0, 0.8 ] )
+
+    near_energy = elasticKernel.return_pair_energy_array( store, const_number, [ 0 ], [ 1 ] )[ 0 ]
+    far_energy = return_dipole_energy_array( dipole_array[ 0 ], dipole_array[ 1 ], store.position[ 1 ] - store.position[ 0 ], mu, nu )[ 0 ]
+
+    if abs( near_energy / far_energy - 1.0 ) > 1.0E-5 :
+        raise RuntimeError( '# near and far fields differ at rcutoff_elastic, wrong !' )
+
+    elasticFarField.print_properties( )
+    print( '# every is OK !' )
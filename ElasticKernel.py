@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+'This is an ElasticKernel module, vectorized elastic energies of pairs of loops ( disks ) and point defects or clusters ( spheres ).'
+
+import numpy as np
+import argparse
+
+from Auxiliary import j_have, j_must_have
+from DefectStore import defecttype_list
+
+def create_elastic_kernel( jdata ) :
+    'return Class ElasticKernel when jdata[ "elastic_kernel" ] is "dipole", otherwise None, i.e. U_ij by DefectObject.return_u_neighbour( ).'
+
+    kernel = 'tungsten'
+    if j_have( jdata, 'elastic_kernel' ) : kernel = jdata[ 'elastic_kernel' ]
+
+    if kernel == 'dipole' : return ElasticKernel( jdata )
+
+    if kernel != 'tungsten' : raise RuntimeError( 'elastic_kernel %s not in [ tungsten, dipole ], wrong !' % kernel )
+
+    return None
+
+class ElasticKernel( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        U_ij of pairs within rcutoff_elastic in the dipole limit of isotropic elasticity, evaluated over numpy arrays of pairs :
+         a. disk-disk, two prismatic loops with s = +- nsize * Omega_atom, + for interstitial and - for vacancy loops,
+            and unit normals m parallel to burgers vectors, c = m1.m2, a = m.n, n = r / | r |,
+            U = u_disk_disk_prefactor * s1 * s2 / r^3 * [ ( 4 nu - 1 ) + 2 ( 1 - 2 nu ) c^2 + 3 ( 1 - 2 nu ) ( a1^2 + a2^2 ) + 12 nu a1 a2 c - 15 a1^2 a2^2 ],
+         b. sphere-disk, a point defect or a cluster with relaxation volume dV and a loop,
+            U = u_sphere_disk_prefactor * dV * s / ( 2 r^3 ) * ( 1 - 3 a^2 ),
+         c. sphere-sphere, zero, two centres of dilatation do not interact in isotropic elasticity.
+        Prefactors are those of ConstNumber, r is not less than the first nearest neighbour distance.
+        This is a model of its own, not DefectObject.return_u_neighbour( ) of tungsten, DefectSystem compares both by self.return_check_pair_array( )
+        on disk-disk and sphere-disk pairs and stops when they differ beyond jdata[ 'elastic_kernel_tolerance' ].
+
+        Properties of ElasticKernel :
+         1. self.cutoff, rcutoff_elastic
+         2. self.box, self.periodic
+         3. self.relaxation_volume_dict, { 'I' : dV, 'V' : dV } of one point defect in Omega_atom, jdata[ 'elastic_relaxation_volume' ],
+            { 'I' : 1.68, 'V' : -0.37 } of W by default, dV of a cluster is nsize * dV, to be set for other materials.
+         4. self.loop_code_array, type codes of DefectStore of loops.
+         5. self.numb_pair, the number of evaluated pairs.
+        '''
+
+        self.cutoff = j_must_have( jdata, 'rcutoff_elastic' )
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = np.float64 )
+
+        self.relaxation_volume_dict = { 'I' : 1.68, 'V' : -0.37 }
+        if j_have( jdata, 'elastic_relaxation_volume' ) : self.relaxation_volume_dict.update( jdata[ 'elastic_relaxation_volume' ] )
+
+        self.loop_code_array = np.array( [ i for ( i, item ) in enumerate( defecttype_list ) if 'Loop' in item ], dtype = np.int64 )
+
+        self.numb_pair = 0
+
+    def return_source_array( self,
+                             defect_store,
+                             const_number,
+                             index_array   ) :
+        '''
+        return ( loop_array, strength_array, normal_array ) of index_array in defect_store,
+        loop_array is True for loops, strength_array is s of loops or dV of spheres, unit: nm^3, normal_array is m of loops, zero for spheres.
+        '''
+
+        type_code_array = defect_store.type_code[ index_array ]
+        IV_array = defect_store.IV_code_array[ type_code_array ]
+
+        burgers_array = defect_store.burgers_vector_scale[ index_array ]
+        length_array = np.sqrt( np.sum( burgers_array * burgers_array, axis = 1 ) )
+
+        loop_array = np.isin( type_code_array, self.loop_code_array ) & ( length_array > 0.0 )
+
+        volume_array = defect_store.nsize[ index_array ] * const_number.volume
+
+        relaxation_array = np.where( IV_array == 0, self.relaxation_volume_dict[ 'I' ], self.relaxation_volume_dict[ 'V' ] )
+        strength_array = np.where( loop_array, ( 1.0 - 2.0 * IV_array ) * volume_array, relaxation_array * volume_array )
+
+        normal_array = np.zeros( burgers_array.shape )
+        normal_array[ loop_array ] = burgers_array[ loop_array ] / length_array[ loop_array, np.newaxis ]
+
+        return ( loop_array, strength_array, normal_array )
+
+    def return_pair_energy_array( self,
+                                  defect_store,
+                                  const_number,
+                                  index_array,
+                                  index_j_array ) :
+        'return U_ij of pairs ( index_array[ k ], index_j_array[ k ] ) in defect_store with the nearest periodic images, zero beyond self.cutoff.'
+
+        index_array = np.asarray( index_array, dtype = np.int64 )
+        index_j_array = np.asarray( index_j_array, dtype = np.int64 )
+
+        self.numb_pair += len( index_array )
+
+        delta_array = defect_store.position[ index_j_array ] - defect_store.position[ index_array ]
+        delta_array -= self.periodic * self.box * np.round( delta_array / self.box )
+
+        distance_array = np.sqrt( np.sum( delta_array * delta_array, axis = 1 ) )
+        r_array = np.maximum( distance_array, const_number.first )
+
+        n_array = delta_array / r_array[ :, np.newaxis ]
+
+        ( loop_1, strength_1, normal_1 ) = self.return_source_array( defect_store, const_number, index_array )
+        ( loop_2, strength_2, normal_2 ) = self.return_source_array( defect_store, const_number, index_j_array )
+
+        a_1 = np.sum( normal_1 * n_array, axis = 1 )
+        a_2 = np.sum( normal_2 * n_array, axis = 1 )
+        c_12 = np.sum( normal_1 * normal_2, axis = 1 )
+
+        nu = const_number.poisson_ratio
+
+        'a. disk-disk.'
+        u_disk_disk = const_number.u_disk_disk_prefactor * strength_1 * strength_2 / r_array ** 3 \
+                      * ( ( 4.0 * nu - 1.0 ) + 2.0 * ( 1.0 - 2.0 * nu ) * c_12 * c_12 + 3.0 * ( 1.0 - 2.0 * nu ) * ( a_1 * a_1 + a_2 * a_2 )
+                          + 12.0 * nu * a_1 * a_2 * c_12 - 15.0 * a_1 * a_1 * a_2 * a_2 )
+
+        'b. sphere-disk, a of the loop, either 1 or 2.'
+        a_loop = np.where( loop_1, a_1, a_2 )
+        u_sphere_disk = const_number.u_sphere_disk_prefactor * strength_1 * strength_2 / ( 2.0 * r_array ** 3 ) * ( 1.0 - 3.0 * a_loop * a_loop )
+
+        u_array = np.where( loop_1 & loop_2, u_disk_disk, np.where( loop_1 ^ loop_2, u_sphere_disk, 0.0 ) )
+
+        return np.where( distance_array < self.cutoff, u_array, 0.0 )
+
+    def return_check_pair_array( self,
+                                 defect_store,
+                                 const_number,
+                                 pair_array,
+                                 numb_check    ) :
+        'return at most numb_check disk-disk and numb_check sphere-disk pairs within self.cutoff of pair_array( numb_pair x 2 ), spread over pair_array.'
+
+        if len( pair_array ) == 0 : return pair_array
+
+        ( loop_1, strength_1, normal_1 ) = self.return_source_array( defect_store, const_number, pair_array[ :, 0 ] )
+        ( loop_2, strength_2, normal_2 ) = self.return_source_array( defect_store, const_number, pair_array[ :, 1 ] )
+
+        delta_array = defect_store.position[ pair_array[ :, 1 ] ] - defect_store.position[ pair_array[ :, 0 ] ]
+        delta_array -= self.periodic * self.box * np.round( delta_array / self.box )
+        inside = np.sum( delta_array * delta_array, axis = 1 ) < self.cutoff * self.cutoff
+
+        check_list = [ ]
+
+        for kind in [ loop_1 & loop_2, loop_1 ^ loop_2 ] :
+            item_array = np.flatnonzero( kind & inside )
+            if len( item_array ) == 0 or numb_check <= 0 : continue
+            check_list.append( item_array[ np.unique( np.linspace( 0, len( item_array ) - 1, numb_check ).astype( int ) ) ] )
+
+        if len( check_list ) == 0 : return pair_array[ : 0 ]
+
+        return pair_array[ np.concatenate( check_list ) ]
+
+    def return_u_neighbour( self,
+                            defect_store,
+                            const_number,
+                            index,
+                            index_list    ) :
+        'return sigma_( j ) U_ij of index over index_list, as DefectObject.return_u_neighbour( ).'
+
+        if len( index_list ) == 0 : return 0.0
+
+        return float( np.sum( self.return_pair_energy_array( defect_store, const_number, np.full( len( index_list ), index ), index_list ) ) )
+
+    def return_ui_array( self,
+                         defect_store,
+                         const_number,
+                         pair_array,
+                         numb          ) :
+        '''
+        return ( ui_array, u_array ), ui = 0.5 * sigma_( j != i ) U_ij of numb defectObjects,
+        every pair [ i, j ] of pair_array( numb_pair x 2 ) is evaluated once and scattered into both ui.
+        '''
+
+        u_array = self.return_pair_energy_array( defect_store, const_number, pair_array[ :, 0 ], pair_array[ :, 1 ] )
+
+        ui_array = np.zeros( numb, dtype = np.float64 )
+        np.add.at( ui_array, pair_array[ :, 0 ], 0.5 * u_array )
+        np.add.at( ui_array, pair_array[ :, 1 ], 0.5 * u_array )
+
+        return ( ui_array, u_array )
+
+    def _return_properties( self ) :
+        '''
+        Properties of ElasticKernel :
+         1. self.cutoff
+         2. self.box, self.periodic
+         3. self.relaxation_volume_dict
+         4. self.loop_code_array
+         5. self.numb_pair
+        '''
+
+        properties_list = [ [ 'cutoff',                 self.cutoff                 ],
+                            [ 'box',                    self.box                    ],
+                            [ 'periodic',               self.periodic               ],
+                            [ 'relaxation_volume_dict', self.relaxation_volume_dict ],
+                            [ 'loop_code_array',        self.loop_code_array        ],
+                            [ 'numb_pair',              self.numb_pair              ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for ElasticKernel --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class ElasticKernel detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 300,
+                         help = 'the number of defectObjects' )
+
+    args = parser.parse_args( )
+
+    from ConstNumber import ConstNumber
+    from ElasticFarField import return_dipole_energy_array
+
+    jdata = { 'box' : [ 12.0, 12.0, 10.0 ], 'periodic' : [ True, True, False ], 'alatt' : 0.3165, 'lattice' : 'bcc',
+              'rcutoff_elastic' : 3.0, 'elastic_kernel' : 'dipole' }
+
+    const_number = ConstNumber( jdata )
+
+    elasticKernel = create_elastic_kernel( jdata )
+
+    'defectObjects with the columns of DefectStore, loops of both burgers vectors and point defects or clusters.'
+    class PointStore( object ) :
+        def __init__( self, numb ) :
+            random_state = np.random.RandomState( 7 )
+            self.position = random_state.rand( numb, 3 ) * np.array( jdata[ 'box' ] )
+            self.type_code = random_state.randint( len( defecttype_list ), size = numb )
+            self.IV_code_array = np.array( [ int( item[ 0 ] == 'V' ) for item in defecttype_list ] )
+            self.nsize = random_state.randint( 1, 100, size = numb )
+            self.burgers_vector_scale = np.zeros( ( numb, 3 ) )
+            for i in range( numb ) :
+                if 'Loop111' in defecttype_list[ self.type_code[ i ] ] : self.burgers_vector_scale[ i ] = random_state.choice( [ -1.0, 1.0 ], size = 3 )
+                if 'Loop100' in defecttype_list[ self.type_code[ i ] ] : self.burgers_vector_scale[ i, random_state.randint( 3 ) ] = 1.0
+
+    store = PointStore( args.numb )
+
+    'U_ij equals - P1_ij P2_kl G_ik,jl of dipoles P = C : Omega, Omega = s m m of a loop and dV / 3 I of a sphere.'
+    mu = const_number.shear_modulus
+    nu = const_number.poisson_ratio
+    lame = 2.0 * mu * nu / ( 1.0 - 2.0 * nu )
+
+    ( loop_array, strength_array, normal_array ) = elasticKernel.return_source_array( store, const_number, np.arange( args.numb ) )
+
+    dipole_array = np.where( loop_array[ :, np.newaxis, np.newaxis ],
+                             strength_array[ :, np.newaxis, np.newaxis ] * ( lame * np.eye( 3 ) + 2.0 * mu * normal_array[ :, :, np.newaxis ] * normal_array[ :, np.newaxis, : ] ),
+                             strength_array[ :, np.newaxis, np.newaxis ] * ( lame + 2.0 * mu / 3.0 ) * np.eye( 3 ) )
+
+    pair_array = np.array( [ [ i, j ] for i in range( args.numb ) for j in range( i + 1, args.numb ) ], dtype = np.int64 )
+
+    delta_array = store.position[ pair_array[ :, 1 ] ] - store.position[ pair_array[ :, 0 ] ]
+    delta_array -= elasticKernel.periodic * elasticKernel.box * np.round( delta_array / elasticKernel.box )
+    distance_array = np.sqrt( np.sum( delta_array * delta_array, axis = 1 ) )
+
+    keep = ( distance_array < 3.0 ) & ( distance_array > const_number.first )
+
+    real_u_array = return_dipole_energy_array( dipole_array[ pair_array[ keep, 0 ] ], dipole_array[ pair_array[ keep, 1 ] ], delta_array[ keep ], mu, nu )
+
+    ( ui_array, u_array ) = elasticKernel.return_ui_array( store, const_number, pair_array, args.numb )
+
+    if np.max( np.abs( u_array[ keep ] - real_u_array ) ) > 1.0E-9 * np.max( np.abs( real_u_array ) ) or np.any( u_array[ distance_array >= 3.0 ] != 0.0 ) :
+        raise RuntimeError( '# U_ij of disks and spheres wrong !' )
+
+    'ui by pairs of the bulk equals the sum over all neighbours of every defectObject.'
+    for i in range( args.numb ) :
+        ui = 0.5 * elasticKernel.return_u_neighbour( store, const_number, i, [ j for j in range( args.numb ) if j != i ] )
+        if abs( ui - ui_array[ i ] ) > 1.0E-9 * max( 1.0, abs( ui ) ) :
+            raise RuntimeError( '# ui of %d by pairs wrong !' % i )
+
+    'pairs to be compared with DefectObject.return_u_neighbour( ), of both kinds and within the cutoff.'
+    check_array = elasticKernel.return_check_pair_array( store, const_number, pair_array, 8 )
+    ( loop_1, strength_1, normal_1 ) = elasticKernel.return_source_array( store, const_number, check_array[ :, 0 ] )
+    ( loop_2, strength_2, normal_2 ) = elasticKernel.return_source_array( store, const_number, check_array[ :, 1 ] )
+    check_delta_array = store.position[ check_array[ :, 1 ] ] - store.position[ check_array[ :, 0 ] ]
+    check_delta_array -= elasticKernel.periodic * elasticKernel.box * np.round( check_delta_array / elasticKernel.box )
+
+    if len( check_array ) != 16 or np.sum( loop_1 & loop_2 ) != 8 or np.sum( loop_1 ^ loop_2 ) != 8 \
+       or np.any( np.sqrt( np.sum( check_delta_array * check_delta_array, axis = 1 ) ) >= 3.0 ) :
+        raise RuntimeError( '# pairs to check wrong !' )
+
+    elasticKernel.print_properties( )
+    print( '# every is OK !' )
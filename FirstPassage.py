@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+'This is an FirstPassage module, protective spheres for isolated point defects.'
+
+import numpy as np
+import argparse
+import math
+import copy
+
+from Auxiliary import j_have, j_must_have
+from ConstNumber import ConstNumber
+from RandomStream import RandomStream
+
+def create_first_passage( jdata ) :
+    'return Class FirstPassage when jdata[ "first_passage" ] is True, otherwise None, i.e. every defectObject hops one jump by one event.'
+
+    first_passage = False
+    if j_have( jdata, 'first_passage' ) : first_passage = jdata[ 'first_passage' ]
+
+    if first_passage : return FirstPassage( jdata )
+
+    return None
+
+class FirstPassage( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        An isolated point defect, i.e. no defectObject in its 27 cells and not trapped, random-walks in a protective sphere
+        with radius R = d - self.capture_radius, d is the distance to the boundary of its 27 cells, R is not larger than
+        the distance to the sphere of every trap of self.set_trap( ) and to the surfaces of the box in non-periodic directions,
+        so no other defectObject or trap reacts with it inside the sphere. The walk to the surface of the sphere is one event :
+         a. the exit point is uniform on the surface,
+         b. the rate of every action is scaled by ( self.jump_length / R )^2, the sum of rates is 6 * D / R^2 with
+            D = sum( rates ) * self.jump_length^2 / 6, i.e. the exit time is exponential with the mean first-passage time R^2 / ( 6 * D ),
+            an approximation of the first-passage time distribution, which the event selection of one rate can not sample,
+            the mean, and so the diffusion coefficient over many jumps, are kept.
+        The defectObject hops one jump by one event when R .lt. self.min_radius.
+        I is not in self.defecttype_list by default, it migrates one dimensionally as a crowdion, not a three dimensional walk.
+
+        Properties of FirstPassage :
+         1. self.defecttype_list, defecttypes taking first-passage jumps, jdata[ 'first_passage_defecttype' ], [ 'V' ] by default.
+         2. self.capture_radius, the largest reaction distance between the point defect and another defectObject.
+         3. self.jump_length, the length of one jump, the first nearest neighbour distance.
+         4. self.min_radius
+         5. self.const_number, Class ConstNumber.
+         6. self.numb_jump, the number of first-passage jumps.
+         7. self.box, self.periodic
+         8. self.trap_position[ numb_trap, 3 ], self.trap_radius_array[ numb_trap ], traps of Class TrapSystem, no trap by default.
+        '''
+
+        self.defecttype_list = [ 'V' ]
+        if j_have( jdata, 'first_passage_defecttype' ) : self.defecttype_list = jdata[ 'first_passage_defecttype' ]
+
+        self.capture_radius = j_must_have( jdata, 'first_passage_capture_radius' )
+
+        self.const_number = ConstNumber( jdata )
+
+        self.jump_length = self.const_number.first
+
+        self.min_radius = 5.0 * self.jump_length
+        if j_have( jdata, 'first_passage_min_radius' ) : self.min_radius = jdata[ 'first_passage_min_radius' ]
+
+        if self.min_radius < self.jump_length :
+            raise RuntimeError( 'first_passage_min_radius %f .lt. jump length %f, wrong !' % ( self.min_radius, self.jump_length ) )
+
+        self.numb_jump = 0
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = bool )
+
+        self.trap_position = np.zeros( ( 0, 3 ), dtype = np.float64 )
+        self.trap_radius_array = np.zeros( 0, dtype = np.float64 )
+
+    def set_trap( self,
+                  trap_position,
+                  trap_radius_array ) :
+        'set traps bounding protective spheres, trap_position[ numb_trap, 3 ] and trap_radius_array[ numb_trap ] as TrapSystem.'
+
+        self.trap_position = np.array( trap_position, dtype = np.float64 ).reshape( -1, 3 )
+        self.trap_radius_array = np.array( trap_radius_array, dtype = np.float64 )
+
+    def return_radius( self,
+                       tmp_defectObject,
+                       cell_index,
+                       cell_space        ) :
+        '''
+        return the radius of the protective sphere of tmp_defectObject in the cell with cell_index, 0.0 for no sphere.
+        the caller makes sure no defectObject in the 27 cells, cell_space is the length of one cell.
+        '''
+
+        if tmp_defectObject.defecttype not in self.defecttype_list : return 0.0
+
+        if hasattr( tmp_defectObject, 'trap' ) and tmp_defectObject.trap[ 0 ] : return 0.0
+
+        position = tmp_defectObject.return_position( )
+
+        lower = ( np.asarray( cell_index ) - 1 ) * cell_space
+        upper = ( np.asarray( cell_index ) + 2 ) * cell_space
+
+        radius = min( np.min( position - lower ), np.min( upper - position ) ) - self.capture_radius
+
+        'surfaces of the box in non-periodic directions.'
+        if not np.all( self.periodic ) :
+            radius = min( radius, np.min( position[ ~self.periodic ] ), np.min( self.box[ ~self.periodic ] - position[ ~self.periodic ] ) )
+
+        'spheres of traps, as TrapObject.return_judge_trap( ).'
+        if len( self.trap_position ) != 0 :
+
+            delta = self.trap_position - position
+            delta -= self.periodic * self.box * np.round( delta / self.box )
+
+            radius = min( radius, np.min( np.sqrt( np.sum( delta * delta, axis = 1 ) ) - self.trap_radius_array ) )
+
+        if radius < self.min_radius : return 0.0
+
+        return float( radius )
+
+    def return_rate( self,
+                     rate_list,
+                     radius     ) :
+        'return rates of the first-passage jump with radius, from rates of one jump.'
+
+        factor = ( self.jump_length / radius ) ** 2
+
+        return [ item * factor for item in rate_list ]
+
+    def return_jump_vector( self,
+                            radius,
+                            random_stream ) :
+        'return a vector with length radius, uniform on the sphere.'
+
+        z = 2.0 * random_stream.rand( ) - 1.0
+        phi = 2.0 * math.pi * random_stream.rand( )
+
+        r_xy = math.sqrt( max( 0.0, 1.0 - z * z ) )
+
+        return radius * np.array( [ r_xy * math.cos( phi ), r_xy * math.sin( phi ), z ] )
+
+    def return_jump_defectObject( self,
+                                  jdata,
+                                  tmp_defectObject,
+                                  radius,
+                                  random_stream     ) :
+        'return a new defectObject, tmp_defectObject jumps to the surface of its protective sphere with radius.'
+
+        new_defectObject = copy.deepcopy( tmp_defectObject )
+        new_defectObject.move_defectObject( jdata, self.return_jump_vector( radius, random_stream ), self.const_number )
+
+        self.numb_jump += 1
+
+        return new_defectObject
+
+    def _return_properties( self ) :
+        '''
+        Properties of FirstPassage :
+         1. self.defecttype_list
+         2. self.capture_radius
+         3. self.jump_length
+         4. self.min_radius
+         5. self.const_number
+         6. self.numb_jump
+         7. self.box, self.periodic
+         8. self.trap_position, self.trap_radius_array
+        '''
+
+        properties_list = [ [ 'defecttype_list', self.defecttype_list ],
+                            [ 'capture_radius',  self.capture_radius  ],
+                            [ 'jump_length',     self.jump_length     ],
+                            [ 'min_radius',      self.min_radius      ],
+                            [ 'const_number',    self.const_number    ],
+                            [ 'numb_jump',       self.numb_jump       ],
+                            [ 'box',             self.box             ],
+                            [ 'periodic',        self.periodic        ],
+                            [ 'numb_trap',       len( self.trap_position ) ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for FirstPassage --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class FirstPassage detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 100000,
+                         help = 'the number of jump vectors' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'alatt' : 0.3165, 'lattice' : 'bcc', 'box' : [ 30.0, 30.0, 30.0 ], 'periodic' : [ True, True, False ], 'first_passage_capture_radius' : 0.5 }
+
+    firstPassage = FirstPassage( jdata )
+    random_stream = RandomStream( 7 )
+
+    'jump vectors are uniform on the sphere, mean 0 and mean of x^2 is radius^2 / 3.'
+    radius = 3.0
+    vector_array = np.array( [ firstPassage.return_jump_vector( radius, random_stream ) for i in range( args.numb ) ] )
+
+    if not np.allclose( np.linalg.norm( vector_array, axis = 1 ), radius ) :
+        raise RuntimeError( '# length of jump vectors wrong !' )
+
+    if np.any( np.abs( vector_array.mean( axis = 0 ) ) > 5.0 * radius / np.sqrt( 3.0 * args.numb ) ) :
+        raise RuntimeError( '# jump vectors are not isotropic, wrong !' )
+
+    if np.any( np.abs( ( vector_array ** 2 ).mean( axis = 0 ) / radius ** 2 - 1.0 / 3.0 ) > 0.01 ) :
+        raise RuntimeError( '# jump vectors are not isotropic, wrong !' )
+
+    'the diffusion coefficient of first-passage jumps, radius^2 * sum( rates ) / 6, equals the one of single jumps.'
+    rate_list = [ 1.0E12 ] * 8
+    radius = 10.0 * firstPassage.jump_length
+
+    D_jump = sum( rate_list ) * firstPassage.jump_length ** 2 / 6.0
+    D_first_passage = sum( firstPassage.return_rate( rate_list, radius ) ) * radius ** 2 / 6.0
+
+    if abs( D_first_passage / D_jump - 1.0 ) > 1.0E-12 :
+        raise RuntimeError( '# diffusion coefficient of first-passage jumps wrong !' )
+
+    'a defectObject near the boundary of its 27 cells has no protective sphere.'
+    class PointDefect( object ) :
+        def __init__( self, position ) :
+            ( self.defecttype, self.position, self.trap ) = ( 'V', np.array( position ), ( False, None ) )
+        def return_position( self ) :
+            return self.position
+
+    cell_space = np.array( [ 5.0, 5.0, 5.0 ] )
+
+    if abs( firstPassage.return_radius( PointDefect( [ 7.5, 7.5, 7.5 ] ), [ 1, 1, 1 ], cell_space ) - ( 7.5 - 0.5 ) ) > 1.0E-12 :
+        raise RuntimeError( '# radius of the protective sphere wrong !' )
+
+    if firstPassage.return_radius( PointDefect( [ 1.5, 1.5, 1.05 ] ), [ 1, 1, 1 ], cell_space * 0.2 ) != 0.0 :
+        raise RuntimeError( '# radius of the protective sphere wrong !' )
+
+    'the surface of the box in the non-periodic direction z.'
+    if abs( firstPassage.return_radius( PointDefect( [ 7.5, 7.5, 3.0 ] ), [ 1, 1, 0 ], cell_space ) - 3.0 ) > 1.0E-12 :
+        raise RuntimeError( '# radius of the protective sphere at the surface wrong !' )
+
+    'a trap of radius 1.0 nm at 4.0 nm, across the periodic boundary in x.'
+    firstPassage.set_trap( [ [ 29.5, 7.5, 7.5 ] ], [ 1.0 ] )
+
+    if abs( firstPassage.return_radius( PointDefect( [ 3.5, 7.5, 7.5 ] ), [ 0, 1, 1 ], cell_space ) - 3.0 ) > 1.0E-12 :
+        raise RuntimeError( '# radius of the protective sphere by a trap wrong !' )
+
+    if firstPassage.return_radius( PointDefect( [ 7.5, 7.5, 7.5 ] ), [ 1, 1, 1 ], cell_space ) != 7.0 :
+        raise RuntimeError( '# radius of the protective sphere by a far trap wrong !' )
+
+    'I migrates as a crowdion, no first-passage jump by default.'
+    interstitial = PointDefect( [ 7.5, 7.5, 7.5 ] )
+    interstitial.defecttype = 'I'
+
+    if firstPassage.return_radius( interstitial, [ 1, 1, 1 ], cell_space ) != 0.0 :
+        raise RuntimeError( '# first-passage jump of I, wrong !' )
+
+    firstPassage.print_properties( )
+    print( '# every is OK !' )
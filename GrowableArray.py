@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+'This is an GrowableArray module, capacity-managed numpy buffer for the per-defect arrays.'
+
+import numpy as np
+import argparse
+
+class GrowableArray( object ) :
+
+    def __init__( self,
+                  tmp_array,
+                  dtype = np.float64,
+                  fill_value = 0,
+                  growth_factor = 2.0,
+                  min_capacity = 16,
+                  row_shape = ( ) ) :
+        '''
+        numpy buffer with capacity larger than size, geometric growth on append and in-place compaction on delete,
+        so appending or deleting does not allocate except when the capacity is exceeded, amortized O( 1 ) allocation.
+        self.buffer[ self.size : self.capacity ] always keeps self.fill_value.
+        every element is a row with shape self.row_shape, e.g. row_shape = ( 3, ) for positions.
+
+        Properties of GrowableArray :
+         1. self.dtype
+         2. self.fill_value
+         3. self.growth_factor
+         4. self.min_capacity
+         5. self.row_shape
+         6. self.buffer[ 0 : self.capacity ]
+         7. self.size
+         8. self.capacity
+         9. self.numb_reallocate, the number of reallocations of self.buffer.
+        '''
+
+        self.dtype = dtype
+        self.fill_value = fill_value
+        self.growth_factor = growth_factor
+        self.min_capacity = min_capacity
+        self.row_shape = tuple( row_shape )
+
+        self.numb_reallocate = 0
+
+        self.size = 0
+        self.capacity = 0
+        self.buffer = np.full( ( 0, ) + self.row_shape, self.fill_value, dtype = self.dtype )
+
+        self.reset( tmp_array )
+
+    def return_array( self ) :
+        'return the view of self.buffer[ 0 : self.size ], it is invalid after a reallocation.'
+
+        return self.buffer[ : self.size ]
+
+    def return_buffer( self ) :
+        'return the whole self.buffer[ 0 : self.capacity ], it is invalid after a reallocation.'
+
+        return self.buffer
+
+    def reserve( self, capacity ) :
+        'make self.capacity >= capacity, return True if self.buffer is reallocated.'
+
+        if capacity <= self.capacity : return False
+
+        new_capacity = max( self.min_capacity, int( self.capacity * self.growth_factor ), capacity )
+
+        new_buffer = np.full( ( new_capacity, ) + self.row_shape, self.fill_value, dtype = self.dtype )
+        new_buffer[ : self.size ] = self.buffer[ : self.size ]
+
+        self.buffer = new_buffer
+        self.capacity = new_capacity
+
+        self.numb_reallocate += 1
+
+        return True
+
+    def reset( self, tmp_array ) :
+        'reset the contents to tmp_array, return True if self.buffer is reallocated.'
+
+        tmp_array = np.asarray( tmp_array, dtype = self.dtype ).reshape( ( -1, ) + self.row_shape )
+        numb = tmp_array.shape[ 0 ]
+
+        old_size = self.size
+        self.size = 0
+
+        reallocate = self.reserve( numb )
+
+        self.buffer[ : numb ] = tmp_array
+
+        'fill the space left by the old contents.'
+        if old_size > numb : self.buffer[ numb : old_size ] = self.fill_value
+
+        self.size = numb
+
+        return reallocate
+
+    def append( self, tmp_values ) :
+        'append tmp_values at the end, return True if self.buffer is reallocated.'
+
+        tmp_values = np.asarray( tmp_values, dtype = self.dtype ).reshape( ( -1, ) + self.row_shape )
+        numb = tmp_values.shape[ 0 ]
+
+        reallocate = self.reserve( self.size + numb )
+
+        self.buffer[ self.size : self.size + numb ] = tmp_values
+        self.size += numb
+
+        return reallocate
+
+    def append_fill( self, numb ) :
+        'append numb values of self.fill_value at the end, return True if self.buffer is reallocated.'
+
+        reallocate = self.reserve( self.size + numb )
+
+        'self.buffer[ self.size : self.capacity ] is already self.fill_value.'
+        self.size += numb
+
+        return reallocate
+
+    def delete_slice( self,
+                      begin_index,
+                      end_index    ) :
+        'delete self.buffer[ begin_index : end_index ] by moving the tail in place, no reallocation.'
+
+        if begin_index < 0 or end_index > self.size or begin_index > end_index :
+            raise RuntimeError( 'slice [ %d, %d ) is not in range [ 0, %d ), wrong !' % ( begin_index, end_index, self.size ) )
+
+        numb = end_index - begin_index
+        if numb == 0 : return
+
+        'the same strides, numpy copies overlapping data in place for one dimension.'
+        self.buffer[ begin_index : self.size - numb ] = self.buffer[ end_index : self.size ]
+        self.buffer[ self.size - numb : self.size ] = self.fill_value
+
+        self.size -= numb
+
+    def delete( self, index ) :
+        'delete self.buffer[ index ] in place, no reallocation.'
+
+        self.delete_slice( index, index + 1 )
+
+    def _return_properties( self ) :
+        '''
+        Properties of GrowableArray :
+         1. self.dtype
+         2. self.fill_value
+         3. self.growth_factor
+         4. self.min_capacity
+         5. self.row_shape
+         6. self.buffer[ 0 : self.capacity ]
+         7. self.size
+         8. self.capacity
+         9. self.numb_reallocate
+        '''
+
+        properties_list = [ [ 'dtype',           self.dtype           ],
+                            [ 'fill_value',      self.fill_value      ],
+                            [ 'growth_factor',   self.growth_factor   ],
+                            [ 'min_capacity',    self.min_capacity    ],
+                            [ 'row_shape',       self.row_shape       ],
+                            [ 'buffer',          self.buffer          ],
+                            [ 'size',            self.size            ],
+                            [ 'capacity',        self.capacity        ],
+                            [ 'numb_reallocate', self.numb_reallocate ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for GrowableArray --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class GrowableArray detecting ---' )
+
+    parser.add_argument( '-n', '--numb_step', type = int, default = 10000,
+                         help = 'the number of random appends and deletes' )
+
+    args = parser.parse_args( )
+
+    np.random.seed( 0 )
+
+    'compare GrowableArray with np.append and np.delete.'
+    real_array = np.random.rand( 10 )
+    tmp_growable = GrowableArray( real_array )
+
+    for step in range( args.numb_step ) :
+
+        if np.random.rand( ) < 0.55 or real_array.size == 0 :
+            tmp_values = np.random.rand( np.random.randint( 1, 4 ) )
+            real_array = np.append( real_array, tmp_values )
+            tmp_growable.append( tmp_values )
+        else :
+            begin_index = np.random.randint( real_array.size )
+            end_index = min( real_array.size, begin_index + np.random.randint( 1, 4 ) )
+            real_array = np.delete( real_array, slice( begin_index, end_index ) )
+            tmp_growable.delete_slice( begin_index, end_index )
+
+        if not np.array_equal( real_array, tmp_growable.return_array( ) ) :
+            raise RuntimeError( '# GrowableArray not equal np.append and np.delete at step %d, wrong !' % step )
+
+        if np.any( tmp_growable.return_buffer( )[ tmp_growable.size : ] != tmp_growable.fill_value ) :
+            raise RuntimeError( '# the tail of GrowableArray is not fill_value at step %d, wrong !' % step )
+
+    print( '# size: %d, capacity: %d, numb_reallocate: %d' % ( tmp_growable.size, tmp_growable.capacity, tmp_growable.numb_reallocate ) )
+    print( '# every is OK !' )
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+'This is an KDTreeNeighbour module, neighbours of bulk searches by scipy.spatial.cKDTree with periodic boxes.'
+
+import numpy as np
+import argparse
+
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from Auxiliary import j_have, j_must_have
+
+def create_kdtree_neighbour( jdata ) :
+    'return Class KDTreeNeighbour when jdata[ "neighbour_backend" ] is "kdtree", otherwise None, i.e. bulk searches walk cells or all pairs.'
+
+    backend = 'linkcell'
+    if j_have( jdata, 'neighbour_backend' ) : backend = jdata[ 'neighbour_backend' ]
+
+    if backend == 'kdtree' : return KDTreeNeighbour( jdata )
+
+    if backend != 'linkcell' : raise RuntimeError( 'neighbour_backend %s not in [ linkcell, kdtree ], wrong !' % backend )
+
+    return None
+
+class KDTreeNeighbour( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        All pairs within a radius are found by one call of cKDTree, for bulk searches at the start of cascades :
+         a. initial recombination of DefectSystem, candidates of every defectObject within self.radius,
+         b. traps of all defectObjects of TrapSystem, candidates within the largest trap radius,
+         c. clusters of ClusterSystem, connected components of pairs within rcut.
+        A periodic direction is a torus of the box, cKDTree takes boxsize 0.0 for a non-periodic direction.
+        Pairs are found within the radius, not within 27 cells, so self.radius must cover the largest recombination distance,
+        and candidates of the initial recombination are taken in increasing index, not in the order of walking 27 cells.
+
+        Properties of KDTreeNeighbour :
+         1. self.box, self.periodic
+         2. self.radius, jdata[ 'kdtree_radius' ], by default the largest of jdata[ 'linkcell_space' ], 
+            all reached by 27 cells, kdtree_radius must be set without linkcell_space.
+         3. self.numb_query, the number of calls of cKDTree.
+        '''
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = bool )
+
+        if j_have( jdata, 'kdtree_radius' ) :
+            self.radius = jdata[ 'kdtree_radius' ]
+        else :
+            self.radius = np.max( j_must_have( jdata, 'linkcell_space' ) )
+
+        self.numb_query = 0
+
+    def _return_boxsize( self,
+                         box,
+                         periodic ) :
+        'return boxsize of cKDTree, the box along periodic directions and 0.0 along the others.'
+
+        if box is None : box = self.box
+        if periodic is None : periodic = self.periodic
+
+        return np.where( np.asarray( periodic, dtype = bool ), np.asarray( box, dtype = np.float64 ), 0.0 )
+
+    def _return_wrap_position( self,
+                               position,
+                               boxsize   ) :
+        'return position[ :, 3 ] wrapped into [ 0, boxsize ) along periodic directions, as cKDTree needs.'
+
+        wrap_position = np.array( position, dtype = np.float64 ).reshape( -1, 3 )
+
+        for j in range( 3 ) :
+            if boxsize[ j ] > 0.0 :
+                wrap_position[ :, j ] = np.mod( wrap_position[ :, j ], boxsize[ j ] )
+                wrap_position[ wrap_position[ :, j ] >= boxsize[ j ], j ] = 0.0
+
+        return wrap_position
+
+    def return_tree( self,
+                     position,
+                     box = None,
+                     periodic = None ) :
+        'return cKDTree of position[ :, 3 ] with the periodic box.'
+
+        boxsize = self._return_boxsize( box, periodic )
+
+        return cKDTree( self._return_wrap_position( position, boxsize ), boxsize = boxsize )
+
+    def return_pair_array( self,
+                           position,
+                           radius = None,
+                           box = None,
+                           periodic = None ) :
+        'return all pairs [ i, j ] with i .lt. j within radius in position[ :, 3 ], array( numb_pair x 2 ).'
+
+        if radius is None : radius = self.radius
+
+        self.numb_query += 1
+
+        return self.return_tree( position, box, periodic ).query_pairs( radius, output_type = 'ndarray' ).reshape( -1, 2 )
+
+    def return_neighbour_index_list( self,
+                                     position,
+                                     radius = None ) :
+        'return indexes within radius of every row in position[ :, 3 ], in increasing order, not including the row itself.'
+
+        numb = len( position )
+
+        pair_array = self.return_pair_array( position, radius )
+
+        'both directions of every pair sorted by the row, CSR of neighbours.'
+        row_array = np.concatenate( ( pair_array[ :, 0 ], pair_array[ :, 1 ] ) )
+        column_array = np.concatenate( ( pair_array[ :, 1 ], pair_array[ :, 0 ] ) )
+
+        order = np.lexsort( ( column_array, row_array ) )
+        split_array = np.cumsum( np.bincount( row_array, minlength = numb ) )[ : -1 ]
+
+        return [ item.tolist( ) for item in np.split( column_array[ order ], split_array ) ]
+
+    def return_ball_index_list( self,
+                                tree_position,
+                                query_position,
+                                radius = None   ) :
+        'return indexes of tree_position within radius of every row of query_position, in increasing order.'
+
+        if radius is None : radius = self.radius
+
+        boxsize = self._return_boxsize( None, None )
+
+        self.numb_query += 1
+
+        return self.return_tree( tree_position ).query_ball_point( self._return_wrap_position( query_position, boxsize ), radius, return_sorted = True )
+
+    def return_cluster_label_array( self,
+                                    position,
+                                    radius,
+                                    box,
+                                    periodic = None ) :
+        '''
+        return ( numb_cluster, label_array ), the cluster of every row in position[ :, 3 ], clusters are connected by pairs within radius,
+        and labelled in the order of their smallest rows.
+        '''
+
+        numb = len( position )
+
+        pair_array = self.return_pair_array( position, radius, box, periodic )
+
+        graph = coo_matrix( ( np.ones( len( pair_array ) ), ( pair_array[ :, 0 ], pair_array[ :, 1 ] ) ), shape = ( numb, numb ) )
+
+        ( numb_cluster, label_array ) = connected_components( graph, directed = False )
+
+        ( unique_label_array, first_array ) = np.unique( label_array, return_index = True )
+
+        relabel_array = np.empty( numb_cluster, dtype = np.int64 )
+        relabel_array[ unique_label_array[ np.argsort( first_array ) ] ] = np.arange( numb_cluster )
+
+        return ( numb_cluster, relabel_array[ label_array ] )
+
+    def _return_properties( self ) :
+        '''
+        Properties of KDTreeNeighbour :
+         1. self.box, self.periodic
+         2. self.radius
+         3. self.numb_query
+        '''
+
+        properties_list = [ [ 'box',        self.box        ],
+                            [ 'periodic',   self.periodic   ],
+                            [ 'radius',     self.radius     ],
+                            [ 'numb_query', self.numb_query ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for KDTreeNeighbour --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class KDTreeNeighbour detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 500,
+                         help = 'the number of points' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'box' : [ 10.0, 12.0, 8.0 ], 'periodic' : [ True, True, False ], 'kdtree_radius' : 1.2 }
+
+    kdtreeNeighbour = KDTreeNeighbour( jdata )
+
+    random_state = np.random.RandomState( 7 )
+
+    'points along the non-periodic direction may be out of the box.'
+    position = random_state.rand( args.numb, 3 ) * np.array( [ 10.0, 12.0, 10.0 ] ) - np.array( [ 0.0, 0.0, 1.0 ] )
+
+    def return_distance_array( position, index, box, periodic ) :
+        delta = position - position[ index ]
+        delta -= np.array( periodic ) * np.array( box ) * np.round( delta / np.array( box ) )
+        return np.sqrt( np.sum( delta * delta, axis = 1 ) )
+
+    'neighbours of every point by the brute force.'
+    neighbour_index_list = kdtreeNeighbour.return_neighbour_index_list( position )
+
+    for i in range( args.numb ) :
+        real_list = [ j for j in np.flatnonzero( return_distance_array( position, i, jdata[ 'box' ], jdata[ 'periodic' ] ) <= 1.2 ) if j != i ]
+        if neighbour_index_list[ i ] != real_list :
+            raise RuntimeError( '# neighbours of %d wrong !' % i )
+
+    'points of another set within the radius.'
+    query_position = random_state.rand( 50, 3 ) * np.array( [ 10.0, 12.0, 8.0 ] )
+    ball_index_list = kdtreeNeighbour.return_ball_index_list( position, query_position, 0.8 )
+
+    for i in range( 50 ) :
+        real_list = np.flatnonzero( return_distance_array( np.vstack( ( position, query_position[ i ] ) ), args.numb, jdata[ 'box' ], jdata[ 'periodic' ] )[ : -1 ] <= 0.8 ).tolist( )
+        if ball_index_list[ i ] != real_list :
+            raise RuntimeError( '# points within the radius of %d wrong !' % i )
+
+    'clusters in a periodic box are the same as the transitive closure of pairs.'
+    ( numb_cluster, label_array ) = kdtreeNeighbour.return_cluster_label_array( position, 0.6, jdata[ 'box' ], [ True, True, True ] )
+
+    label_list = list( range( args.numb ) )
+    for i in range( args.numb ) :
+        for j in np.flatnonzero( return_distance_array( position, i, jdata[ 'box' ], [ True, True, True ] ) <= 0.6 ) :
+            ( old, new ) = ( max( label_list[ i ], label_list[ j ] ), min( label_list[ i ], label_list[ j ] ) )
+            label_list = [ new if item == old else item for item in label_list ]
+
+    if numb_cluster != len( set( label_list ) ) or not np.array_equal( np.unique( label_list, return_inverse = True )[ 1 ].ravel( ), label_array ) :
+        raise RuntimeError( '# clusters wrong !' )
+
+    kdtreeNeighbour.print_properties( )
+    print( '# every is OK !' )
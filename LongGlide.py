@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+'This is an LongGlide module, multi-jump one dimensional glide of ILoop111 and SIA with collision look-ahead.'
+
+import numpy as np
+import argparse
+import math
+import copy
+
+from Auxiliary import j_have, j_must_have
+from ConstNumber import ConstNumber
+from RandomStream import RandomStream
+
+def create_long_glide( jdata ) :
+    'return Class LongGlide when jdata[ "long_glide" ] is True, otherwise None, i.e. every glide action is one jump.'
+
+    long_glide = False
+    if j_have( jdata, 'long_glide' ) : long_glide = jdata[ 'long_glide' ]
+
+    if long_glide : return LongGlide( jdata )
+
+    return None
+
+class LongGlide( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        A defectObject without elastic interaction, i.e. ui == 0.0, glides one dimensionally along its burgers vector
+        by its glide actions. The walk in the segment [ -L, L ] of its glide line is one event :
+         a. L is clipped by the first possible reaction along the glide line, i.e. the glide line passes another defectObject
+            in its 27 cells within self.capture_radius, by the first trap capture, i.e. the glide line enters the sphere of a trap
+            of self.set_trap( ), and by the boundary of its 27 cells shrunk by self.capture_radius,
+         b. the defectObject exits at -L or L with the same probability,
+         c. the rates of glide actions are scaled by ( self.jump_length / L )^2, the sum of them is 2 * D / L^2 with
+            D = sum( glide rates ) * self.jump_length^2 / 2, i.e. the exit time is exponential with the mean first-passage time.
+        Other actions, e.g. rotation and emission, are not changed. The defectObject glides one jump by one event when L .lt. self.min_length.
+
+        Properties of LongGlide :
+         1. self.glide_action_dict, { defecttype : list of glide actions }.
+         2. self.capture_radius, the largest reaction distance between the gliding defectObject and another defectObject.
+         3. self.jump_length, the length of one glide jump, the first nearest neighbour distance.
+         4. self.min_length
+         5. self.box, self.periodic
+         6. self.const_number, Class ConstNumber.
+         7. self.numb_glide, the number of long glides.
+         8. self.trap_position[ numb_trap, 3 ], self.trap_radius_array[ numb_trap ], traps of Class TrapSystem, no trap by default.
+        '''
+
+        self.glide_action_dict = j_must_have( jdata, 'long_glide_action' )
+
+        self.capture_radius = j_must_have( jdata, 'long_glide_capture_radius' )
+
+        self.const_number = ConstNumber( jdata )
+
+        self.jump_length = self.const_number.first
+
+        self.min_length = 5.0 * self.jump_length
+        if j_have( jdata, 'long_glide_min_length' ) : self.min_length = jdata[ 'long_glide_min_length' ]
+
+        if self.min_length < self.jump_length :
+            raise RuntimeError( 'long_glide_min_length %f .lt. jump length %f, wrong !' % ( self.min_length, self.jump_length ) )
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = np.float64 )
+
+        self.numb_glide = 0
+
+        self.trap_position = np.zeros( ( 0, 3 ), dtype = np.float64 )
+        self.trap_radius_array = np.zeros( 0, dtype = np.float64 )
+
+    def set_trap( self,
+                  trap_position,
+                  trap_radius_array ) :
+        'set traps clipping glide segments, trap_position[ numb_trap, 3 ] and trap_radius_array[ numb_trap ] as TrapSystem.'
+
+        self.trap_position = np.array( trap_position, dtype = np.float64 ).reshape( -1, 3 )
+        self.trap_radius_array = np.array( trap_radius_array, dtype = np.float64 )
+
+    def return_glide_action( self,
+                             tmp_defectObject,
+                             what_action       ) :
+        'return True if what_action of tmp_defectObject is a glide action.'
+
+        if tmp_defectObject.defecttype not in self.glide_action_dict : return False
+
+        return what_action in self.glide_action_dict[ tmp_defectObject.defecttype ]
+
+    def return_length( self,
+                       tmp_defectObject,
+                       direction,
+                       neighbour_list,
+                       cell_index,
+                       cell_space        ) :
+        '''
+        return L of the glide segment [ -L, L ] of tmp_defectObject along the unit vector direction, 0.0 for no long glide.
+        neighbour_list is all defectObjects in the 27 cells, cell_space is the length of one cell.
+        '''
+
+        if tmp_defectObject.defecttype not in self.glide_action_dict : return 0.0
+
+        if hasattr( tmp_defectObject, 'trap' ) and tmp_defectObject.trap[ 0 ] : return 0.0
+
+        position = tmp_defectObject.return_position( )
+
+        'a. the boundary of 27 cells shrunk by self.capture_radius, in both directions of the glide line.'
+        lower = ( np.asarray( cell_index ) - 1 ) * cell_space + self.capture_radius
+        upper = ( np.asarray( cell_index ) + 2 ) * cell_space - self.capture_radius
+
+        if np.any( position <= lower ) or np.any( position >= upper ) : return 0.0
+
+        length = math.inf
+
+        for j in range( 3 ) :
+            if direction[ j ] != 0.0 :
+                length = min( length, ( upper[ j ] - position[ j ] ) / abs( direction[ j ] ), ( position[ j ] - lower[ j ] ) / abs( direction[ j ] ) )
+
+        'b. collision look-ahead, the first defectObject within self.capture_radius of the glide line.'
+        capture_radius_square = self.capture_radius * self.capture_radius
+
+        for item in neighbour_list :
+
+            delta = item.return_position( ) - position
+            delta -= self.periodic * self.box * np.round( delta / self.box )
+
+            along = np.dot( delta, direction )
+            perpendicular_square = np.dot( delta, delta ) - along * along
+
+            if perpendicular_square < capture_radius_square :
+                length = min( length, abs( along ) - math.sqrt( capture_radius_square - perpendicular_square ) )
+
+        'c. trap look-ahead, the first trap sphere entered by the glide line, as TrapObject.return_judge_trap( ).'
+        if len( self.trap_position ) != 0 :
+
+            delta = self.trap_position - position
+            delta -= self.periodic * self.box * np.round( delta / self.box )
+
+            along = np.dot( delta, direction )
+            perpendicular_square = np.sum( delta * delta, axis = 1 ) - along * along
+
+            radius_square = self.trap_radius_array * self.trap_radius_array
+            crossed = perpendicular_square < radius_square
+
+            if np.any( crossed ) :
+                length = min( length, np.min( np.abs( along[ crossed ] ) - np.sqrt( radius_square[ crossed ] - perpendicular_square[ crossed ] ) ) )
+
+        if length < self.min_length : return 0.0
+
+        return float( length )
+
+    def return_rate( self,
+                     tmp_defectObject,
+                     rate_list,
+                     length            ) :
+        'return rates of tmp_defectObject, rates of glide actions are scaled for the segment [ -length, length ].'
+
+        factor = ( self.jump_length / length ) ** 2
+
+        rate_list = list( rate_list )
+
+        for item in self.glide_action_dict[ tmp_defectObject.defecttype ] :
+            if item < len( rate_list ) : rate_list[ item ] *= factor
+
+        return rate_list
+
+    def return_glide_defectObject( self,
+                                   jdata,
+                                   tmp_defectObject,
+                                   direction,
+                                   length,
+                                   random_stream     ) :
+        'return a new defectObject, tmp_defectObject glides to -length or length along direction with the same probability.'
+
+        sign = 1.0
+        if random_stream.rand( ) < 0.5 : sign = -1.0
+
+        new_defectObject = copy.deepcopy( tmp_defectObject )
+        new_defectObject.move_defectObject( jdata, sign * length * np.asarray( direction ), self.const_number )
+
+        self.numb_glide += 1
+
+        return new_defectObject
+
+    def _return_properties( self ) :
+        '''
+        Properties of LongGlide :
+         1. self.glide_action_dict
+         2. self.capture_radius
+         3. self.jump_length
+         4. self.min_length
+         5. self.box, self.periodic
+         6. self.const_number
+         7. self.numb_glide
+         8. self.trap_position, self.trap_radius_array
+        '''
+
+        properties_list = [ [ 'glide_action_dict', self.glide_action_dict ],
+                            [ 'capture_radius',    self.capture_radius    ],
+                            [ 'jump_length',       self.jump_length       ],
+                            [ 'min_length',        self.min_length        ],
+                            [ 'box',               self.box               ],
+                            [ 'periodic',          self.periodic          ],
+                            [ 'const_number',      self.const_number      ],
+                            [ 'numb_glide',        self.numb_glide        ],
+                            [ 'numb_trap',         len( self.trap_position ) ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for LongGlide --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class LongGlide detecting ---' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'alatt' : 0.3165, 'lattice' : 'bcc', 'box' : [ 30.0, 30.0, 30.0 ], 'periodic' : [ True, True, True ],
+              'long_glide_action' : { 'ILoop111' : [ 0, 1 ] }, 'long_glide_capture_radius' : 0.5 }
+
+    longGlide = LongGlide( jdata )
+
+    class GlideDefect( object ) :
+        def __init__( self, defecttype, position ) :
+            ( self.defecttype, self.position, self.trap ) = ( defecttype, np.array( position ), ( False, None ) )
+        def return_position( self ) :
+            return self.position
+        def move_defectObject( self, jdata, vector, const_number ) :
+            self.position = self.position + vector
+
+    direction = np.array( [ 1.0, 1.0, 1.0 ] ) / math.sqrt( 3.0 )
+    cell_space = np.array( [ 10.0, 10.0, 10.0 ] )
+
+    'no neighbour, L is clipped by the boundary of 27 cells, ( 30.0 - 0.5 - 15.0 ) * sqrt( 3 ).'
+    length = longGlide.return_length( GlideDefect( 'ILoop111', [ 15.0, 15.0, 15.0 ] ), direction, [ ], [ 1, 1, 1 ], cell_space )
+
+    if abs( length - 14.5 * math.sqrt( 3.0 ) ) > 1.0E-9 :
+        raise RuntimeError( '# length clipped by 27 cells wrong !' )
+
+    'a neighbour 0.3 nm off the glide line at 3.0 nm ahead, L = 3.0 - sqrt( 0.5^2 - 0.3^2 ).'
+    neighbour = GlideDefect( 'V', np.array( [ 15.0, 15.0, 15.0 ] ) + 3.0 * direction + np.array( [ 0.3, -0.3, 0.0 ] ) / math.sqrt( 2.0 ) )
+    length = longGlide.return_length( GlideDefect( 'ILoop111', [ 15.0, 15.0, 15.0 ] ), direction, [ neighbour ], [ 1, 1, 1 ], cell_space )
+
+    if abs( length - ( 3.0 - 0.4 ) ) > 1.0E-9 :
+        raise RuntimeError( '# length clipped by collision look-ahead wrong !' )
+
+    'a neighbour far from the glide line does not clip L.'
+    neighbour = GlideDefect( 'V', np.array( [ 15.0, 15.0, 15.0 ] ) + 3.0 * direction + np.array( [ 1.0, -1.0, 0.0 ] ) )
+    length = longGlide.return_length( GlideDefect( 'ILoop111', [ 15.0, 15.0, 15.0 ] ), direction, [ neighbour ], [ 1, 1, 1 ], cell_space )
+
+    if abs( length - 14.5 * math.sqrt( 3.0 ) ) > 1.0E-9 :
+        raise RuntimeError( '# length clipped by a far neighbour, wrong !' )
+
+    'a trap of radius 0.6 nm 0.2 nm off the glide line at 5.0 nm behind, L = 5.0 - sqrt( 0.6^2 - 0.2^2 ).'
+    longGlide.set_trap( [ np.array( [ 15.0, 15.0, 15.0 ] ) - 5.0 * direction + np.array( [ 0.2, -0.2, 0.0 ] ) / math.sqrt( 2.0 ) ], [ 0.6 ] )
+    length = longGlide.return_length( GlideDefect( 'ILoop111', [ 15.0, 15.0, 15.0 ] ), direction, [ ], [ 1, 1, 1 ], cell_space )
+
+    if abs( length - ( 5.0 - math.sqrt( 0.32 ) ) ) > 1.0E-9 :
+        raise RuntimeError( '# length clipped by trap look-ahead wrong !' )
+
+    longGlide.set_trap( np.zeros( ( 0, 3 ) ), [ ] )
+
+    'the diffusion coefficient of long glides, L^2 * sum( glide rates ) / 2, equals the one of single jumps.'
+    rate_list = [ 1.0E12, 1.0E12, 1.0E9 ]
+    glide_rate_list = longGlide.return_rate( GlideDefect( 'ILoop111', [ 0.0, 0.0, 0.0 ] ), rate_list, 3.0 )
+
+    if abs( sum( glide_rate_list[ : 2 ] ) * 3.0 ** 2 / ( sum( rate_list[ : 2 ] ) * longGlide.jump_length ** 2 ) - 1.0 ) > 1.0E-12 or glide_rate_list[ 2 ] != rate_list[ 2 ] :
+        raise RuntimeError( '# rates of long glides wrong !' )
+
+    'a glider with a neighbour, a trap and the boundary of 27 cells at the same time, L is clipped by the nearest of them.'
+    glide_case_list = [ [ [ 15.0, 15.0, 15.0 ],  3.0, -5.0, 3.0 - 0.4                ],
+                        [ [ 15.0, 15.0, 15.0 ],  8.0, -5.0, 5.0 - math.sqrt( 0.32 ) ],
+                        [ [ 25.0, 15.0, 15.0 ], -9.0, -9.5, 4.5 * math.sqrt( 3.0 )  ] ]
+
+    random_stream = RandomStream( 7 )
+    numb_exit = 2000
+
+    for ( position, neighbour_along, trap_along, length_must ) in glide_case_list :
+
+        glider = GlideDefect( 'ILoop111', position )
+
+        neighbour = GlideDefect( 'V', glider.position + neighbour_along * direction + np.array( [ 0.3, -0.3, 0.0 ] ) / math.sqrt( 2.0 ) )
+        longGlide.set_trap( [ glider.position + trap_along * direction + np.array( [ 0.2, -0.2, 0.0 ] ) / math.sqrt( 2.0 ) ], [ 0.6 ] )
+
+        length = longGlide.return_length( glider, direction, [ neighbour ], [ 1, 1, 1 ], cell_space )
+
+        if abs( length - length_must ) > 1.0E-9 :
+            raise RuntimeError( '# length %f clipped by neighbour, trap and 27 cells, not %f, wrong !' % ( length, length_must ) )
+
+        'rates of glide actions are scaled by ( a / L )^2, the other actions are kept.'
+        glide_rate_list = longGlide.return_rate( glider, rate_list, length )
+
+        if not np.allclose( glide_rate_list[ : 2 ], np.array( rate_list[ : 2 ] ) * ( longGlide.jump_length / length ) ** 2, rtol = 1.0E-12, atol = 0.0 ) or glide_rate_list[ 2 ] != rate_list[ 2 ] :
+            raise RuntimeError( '# rates of long glides not scaled by ( a / L )^2, wrong !' )
+
+        'the glider exits at -L or L with the same probability, the glider itself is not moved.'
+        numb_glide = longGlide.numb_glide
+        sign_array = np.zeros( numb_exit )
+
+        for k in range( numb_exit ) :
+            delta = longGlide.return_glide_defectObject( jdata, glider, direction, length, random_stream ).position - glider.position
+            sign_array[ k ] = np.dot( delta, direction ) / length
+
+            if np.linalg.norm( delta - sign_array[ k ] * length * direction ) > 1.0E-9 or abs( abs( sign_array[ k ] ) - 1.0 ) > 1.0E-9 :
+                raise RuntimeError( '# long glide not to -L or L, wrong !' )
+
+        if not np.array_equal( glider.position, np.array( position ) ) or longGlide.numb_glide - numb_glide != numb_exit :
+            raise RuntimeError( '# glider moved or long glides not counted, wrong !' )
+
+        if abs( np.mean( sign_array ) ) > 5.0 / math.sqrt( numb_exit ) :
+            raise RuntimeError( '# exits at -L and L not symmetric, wrong !' )
+
+    longGlide.print_properties( )
+    print( '# every is OK !' )
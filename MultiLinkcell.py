@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+'This is an MultiLinkcell module, linkcells of several levels for defectObjects of different sizes.'
+
+import numpy as np
+import argparse
+import copy
+
+from Auxiliary import j_have, j_must_have
+from BoxLinkcell import create_box_linkcell
+
+def create_linkcell( jdata,
+                     tmp_defectObject_list,
+                     position_scale_array = None ) :
+    'return Class MultiLinkcell when jdata[ "linkcell_level_space" ] is set, otherwise one grid by jdata[ "linkcell_backend" ].'
+
+    if j_have( jdata, 'linkcell_level_space' ) : return MultiLinkcell( jdata, tmp_defectObject_list, position_scale_array )
+
+    return create_box_linkcell( jdata, tmp_defectObject_list, position_scale_array )
+
+class MultiLinkcell( object ) :
+
+    def __init__( self,
+                  jdata,
+                  tmp_defectObject_list,
+                  position_scale_array = None ) :
+        '''
+        A defectObject with nsize is in level l = searchsorted( self.level_nsize, nsize ), i.e. nsize .le. self.level_nsize[ 0 ] in level 0,
+        and every level has its cell length self.level_space[ l ], increasing with l, not less than the largest reach of a pair
+        of one defectObject in level l and another one in level .le. l, e.g. point defects in fine cells and large loops in coarse cells.
+        Level l has two linkcells with the same cells :
+         a. self.linkcell_list[ l ] links defectObjects in level l,
+         b. self.lower_linkcell_list[ l ] links defectObjects in levels .lt. l, None for level 0.
+        The neighbours of a defectObject in level l are 27 cells of self.linkcell_list[ k ] for every k .ge. l,
+        and 27 cells of self.lower_linkcell_list[ l ], so point defects in dense cascades never walk cells of the large loops size.
+        Every linkcell takes all indexes of DefectSystem, indexes of other levels are not linked.
+
+        Properties of MultiLinkcell :
+         1. self.box, self.periodic
+         2. self.level_nsize, self.level_space
+         3. self.numb_level
+         4. self.linkcell_list, self.lower_linkcell_list, Class BoxLinkcell or SparseLinkcell for every level.
+         5. self.nnbrs
+         6. self.numb_defectObject
+        '''
+
+        self.box = np.array( j_must_have( jdata, 'box' ) )
+        self.periodic = j_must_have( jdata, 'periodic' )
+
+        self.level_space = list( j_must_have( jdata, 'linkcell_level_space' ) )
+
+        self.level_nsize = [ ]
+        if j_have( jdata, 'linkcell_level_nsize' ) : self.level_nsize = list( jdata[ 'linkcell_level_nsize' ] )
+
+        self.numb_level = len( self.level_space )
+
+        if len( self.level_nsize ) != self.numb_level - 1 :
+            raise RuntimeError( 'len( linkcell_level_nsize ) .ne. len( linkcell_level_space ) - 1, wrong !' )
+
+        if any( self.level_nsize[ l ] >= self.level_nsize[ l + 1 ] for l in range( self.numb_level - 2 ) ) or \
+           any( self.level_space[ l ] > self.level_space[ l + 1 ] for l in range( self.numb_level - 1 ) ) :
+            raise RuntimeError( 'linkcell_level_nsize and linkcell_level_space are not increasing, wrong !' )
+
+        if self.level_space[ -1 ] < j_must_have( jdata, 'rcutoff_elastic' ) :
+            raise RuntimeError( 'the largest linkcell_level_space .lt. rcutoff_elastic, wrong !' )
+
+        if j_have( jdata, 'linkcell_auto' ) and jdata[ 'linkcell_auto' ] :
+            raise RuntimeError( 'linkcell_level_space with linkcell_auto, wrong !' )
+
+        self.nnbrs = j_must_have( jdata, 'max_numb_in_27_cells' )
+
+        'every level is a BoxLinkcell or SparseLinkcell with its cell length, a fine level may be shorter than rcutoff_elastic.'
+        self.linkcell_list = [ ]
+        self.lower_linkcell_list = [ ]
+
+        for l in range( self.numb_level ) :
+            level_jdata = copy.deepcopy( jdata )
+            level_jdata[ 'linkcell_space' ] = [ self.level_space[ l ] ] * 3
+            level_jdata[ 'rcutoff_elastic' ] = self.level_space[ l ]
+
+            self.linkcell_list.append( create_box_linkcell( level_jdata, [ ] ) )
+
+            if l == 0 :
+                self.lower_linkcell_list.append( None )
+            else :
+                self.lower_linkcell_list.append( create_box_linkcell( level_jdata, [ ] ) )
+
+        self.linked( tmp_defectObject_list, position_scale_array )
+
+    def return_level( self, tmp_defectObject ) :
+        'return the level of tmp_defectObject.'
+
+        return int( np.searchsorted( self.level_nsize, tmp_defectObject.nsize ) )
+
+    def _return_member_list( self ) :
+        'return [ ( linkcell, function ) ], function( level ) is True if defectObjects of level are linked in linkcell.'
+
+        member_list = [ ]
+
+        for l in range( self.numb_level ) :
+            member_list.append( ( self.linkcell_list[ l ], lambda level, l = l : level == l ) )
+            if l > 0 : member_list.append( ( self.lower_linkcell_list[ l ], lambda level, l = l : level < l ) )
+
+        return member_list
+
+    def linked( self,
+                tmp_defectObject_list,
+                position_scale_array = None ) :
+        'link tmp_defectObject_list in every level, vectorized in every linkcell.'
+
+        self.numb_defectObject = len( tmp_defectObject_list )
+
+        level_array = np.searchsorted( self.level_nsize, np.array( [ item.nsize for item in tmp_defectObject_list ], dtype = np.int64 ) )
+
+        for ( linkcell, function ) in self._return_member_list( ) :
+            linkcell.linked( tmp_defectObject_list, position_scale_array, function( level_array ) )
+
+    def add_defectObject_list( self, tmp_defectObject_list ) :
+
+        for tmp_defectObject in tmp_defectObject_list :
+
+            level = self.return_level( tmp_defectObject )
+
+            for ( linkcell, function ) in self._return_member_list( ) :
+                if function( level ) :
+                    linkcell.add_a_defectObject( tmp_defectObject )
+                else :
+                    linkcell.append_unlinked( )
+
+            self.numb_defectObject += 1
+
+    def substitute_defectObject( self,
+                                 index,
+                                 old_defectObject,
+                                 tmp_defectObject  ) :
+        'substitute tmp_defectObject for old_defectObject with index, it moves between levels when its nsize crosses a level.'
+
+        old_level = self.return_level( old_defectObject )
+        level = self.return_level( tmp_defectObject )
+
+        for ( linkcell, function ) in self._return_member_list( ) :
+            if function( old_level ) and function( level ) :
+                linkcell.substitute_defectObject( index, old_defectObject, tmp_defectObject )
+            elif function( old_level ) :
+                linkcell.unlink_defectObject( index, old_defectObject )
+            elif function( level ) :
+                linkcell.link_defectObject( index, tmp_defectObject )
+
+    def delete_a_defectObject( self,
+                               tmp_defectObject,
+                               tmp_index,
+                               last_defectObject ) :
+        'delete tmp_defectObject with tmp_index by swapping with the last one in every level, as BoxLinkcell does.'
+
+        if tmp_index < 0 or tmp_index > self.numb_defectObject - 1 :
+            raise RuntimeError( 'tmp_index %d out of range [ 0, %d ] !' % ( tmp_index, self.numb_defectObject ) )
+
+        last_index = self.numb_defectObject - 1
+
+        level = self.return_level( tmp_defectObject )
+        last_level = self.return_level( last_defectObject )
+
+        for ( linkcell, function ) in self._return_member_list( ) :
+
+            if function( level ) : linkcell.unlink_defectObject( tmp_index, tmp_defectObject )
+
+            if tmp_index != last_index and function( last_level ) :
+                linkcell.unlink_defectObject( last_index, last_defectObject )
+                linkcell.link_defectObject( tmp_index, last_defectObject )
+
+            linkcell.pop_last( )
+
+        self.numb_defectObject -= 1
+
+    def return_cells_key_defectObject( self, tmp_defectObject ) :
+        'return the key of cells searched for tmp_defectObject, its level and its cells in levels .ge. its level.'
+
+        level = self.return_level( tmp_defectObject )
+
+        return ( level, ) + tuple( self.linkcell_list[ l ].return_ip_defectObject( tmp_defectObject ) for l in range( level, self.numb_level ) )
+
+    def return_27_cells_index_list_defectObject( self, tmp_defectObject ) :
+        'return indexes of defectObjects that may react with tmp_defectObject, including tmp_defectObject itself.'
+
+        level = self.return_level( tmp_defectObject )
+
+        index_list = [ ]
+
+        for l in range( level, self.numb_level ) :
+            index_list.extend( self.linkcell_list[ l ].return_27_cells_index_list_defectObject( tmp_defectObject ) )
+
+        if level > 0 :
+            index_list.extend( self.lower_linkcell_list[ level ].return_27_cells_index_list_defectObject( tmp_defectObject ) )
+
+        return index_list
+
+    def check_nnbrs( self, numb ) :
+        'check numb of neighbours with self.nnbrs.'
+
+        if numb > self.nnbrs :
+            raise RuntimeError( 'Max1: %d .gt. nnbrs: %d something wrong' % ( numb, self.nnbrs ) )
+
+    def _return_properties( self ) :
+        '''
+        Properties of MultiLinkcell :
+         1. self.box, self.periodic
+         2. self.level_nsize, self.level_space
+         3. self.numb_level
+         4. self.nnbrs
+         5. self.numb_defectObject
+         6. the number of defectObjects in every level.
+        '''
+
+        properties_list = [ [ 'box',               self.box                                                          ],
+                            [ 'periodic',          self.periodic                                                     ],
+                            [ 'level_nsize',       self.level_nsize                                                  ],
+                            [ 'level_space',       self.level_space                                                  ],
+                            [ 'numb_level',        self.numb_level                                                   ],
+                            [ 'nnbrs',             self.nnbrs                                                        ],
+                            [ 'numb_defectObject', self.numb_defectObject                                            ],
+                            [ 'numb_level_list',   [ int( np.sum( item.linkmp != -1 ) ) + item.return_numb_occupied_cell( ) for item in self.linkcell_list ] ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for MultiLinkcell --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+    def equal( self,
+               tmp_linkcell,
+               delta         ) :
+        'compare the value between tmp_linkcell and self, level by level.'
+
+        for l in range( self.numb_level ) :
+            if not self.linkcell_list[ l ].equal( tmp_linkcell.linkcell_list[ l ], delta ) : return False
+            if l > 0 and not self.lower_linkcell_list[ l ].equal( tmp_linkcell.lower_linkcell_list[ l ], delta ) : return False
+
+        return True
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class MultiLinkcell detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 300,
+                         help = 'the number of defectObjects' )
+
+    parser.add_argument( '-s', '--step', type = int, default = 300,
+                         help = 'the number of random changes' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'box' : [ 24.0, 24.0, 24.0 ], 'periodic' : [ True, True, True ], 'rcutoff_elastic' : 6.0, 'max_numb_in_27_cells' : 100000,
+              'linkcell_level_nsize' : [ 1, 20 ], 'linkcell_level_space' : [ 1.5, 3.0, 6.0 ] }
+
+    'defectObjects with nsize and the position scale of DefectObject.'
+    class SizeDefect( object ) :
+        def __init__( self, nsize, position ) :
+            ( self.nsize, self.position ) = ( nsize, np.array( position ) )
+        def return_position_scale( self ) :
+            return self.position / 24.0
+
+    random_state = np.random.RandomState( 7 )
+
+    def return_random_defectObject( ) :
+        nsize = int( random_state.choice( [ 1, 1, 1, 1, 5, 50 ] ) )
+        return SizeDefect( nsize, random_state.rand( 3 ) * 24.0 )
+
+    defectObject_list = [ return_random_defectObject( ) for i in range( args.numb ) ]
+
+    multiLinkcell = MultiLinkcell( jdata, defectObject_list )
+
+    'random adds, deletes by swapping with the last one and substitutes crossing levels.'
+    for step in range( args.step ) :
+
+        what = random_state.randint( 3 )
+
+        if what == 0 :
+            tmp_defectObject = return_random_defectObject( )
+            defectObject_list.append( tmp_defectObject )
+            multiLinkcell.add_defectObject_list( [ tmp_defectObject ] )
+        elif what == 1 :
+            index = random_state.randint( len( defectObject_list ) )
+            multiLinkcell.delete_a_defectObject( defectObject_list[ index ], index, defectObject_list[ -1 ] )
+            defectObject_list[ index ] = defectObject_list[ -1 ]
+            del defectObject_list[ -1 ]
+        else :
+            index = random_state.randint( len( defectObject_list ) )
+            tmp_defectObject = return_random_defectObject( )
+            multiLinkcell.substitute_defectObject( index, defectObject_list[ index ], tmp_defectObject )
+            defectObject_list[ index ] = tmp_defectObject
+
+    if not multiLinkcell.equal( MultiLinkcell( jdata, defectObject_list ), 1.0E-6 ) :
+        raise RuntimeError( '# MultiLinkcell by changes not equal the linked one, wrong !' )
+
+    'every pair within the cell length of the higher level of the two is found, in both directions.'
+    position_array = np.array( [ item.position for item in defectObject_list ] )
+    level_array = np.array( [ multiLinkcell.return_level( item ) for item in defectObject_list ] )
+
+    for i in range( len( defectObject_list ) ) :
+
+        index_list = multiLinkcell.return_27_cells_index_list_defectObject( defectObject_list[ i ] )
+
+        if len( index_list ) != len( set( index_list ) ) or i not in index_list :
+            raise RuntimeError( '# indexes of %d repeated or without itself, wrong !' % i )
+
+        delta = position_array - position_array[ i ]
+        delta -= 24.0 * np.round( delta / 24.0 )
+        reach_array = np.array( jdata[ 'linkcell_level_space' ] )[ np.maximum( level_array, level_array[ i ] ) ]
+
+        if not set( np.flatnonzero( np.sqrt( np.sum( delta * delta, axis = 1 ) ) < reach_array ) ).issubset( index_list ) :
+            raise RuntimeError( '# neighbours of %d within the reach of levels not found, wrong !' % i )
+
+    multiLinkcell.print_properties( )
+    print( '# every is OK !' )
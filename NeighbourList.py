@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+'This is an NeighbourList module, persistent neighbour lists with a verlet skin keyed by handles.'
+
+import numpy as np
+import argparse
+
+from Auxiliary import j_have, j_must_have, return_reaction_radius
+from GrowableArray import GrowableArray
+
+def create_neighbour_list( jdata ) :
+    'return Class NeighbourList when jdata[ "neighbour_skin" ] is set, otherwise None, i.e. neighbours are walked in 27 cells by every call.'
+
+    if j_have( jdata, 'neighbour_skin' ) : return NeighbourList( jdata )
+
+    return None
+
+class NeighbourList( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        Every defectObject keeps the handles of defectObjects within self.cutoff + self.skin, collected from its 27 cells,
+        and neighbours within self.cutoff are returned by filtering this list with the positions now.
+        The list of a defectObject is rebuilt only when it moves more than self.skin / 2 from its reference position,
+        a neighbour j is kept within self.cutoff + self.skin + d_j, d_j is the displacement of j from its reference position,
+        and lists are symmetric, i.e. a rebuild adds or removes the defectObject from the lists of its neighbours.
+        So a pair out of lists never comes within self.cutoff before one of the two is rebuilt.
+        Rates, ui, recombination and capture of a defectObject take only defectObjects within self.cutoff, not all in 27 cells,
+        so self.cutoff must not be less than rcutoff_elastic and jdata[ 'linkcell_recombine_radius' ], 
+        the largest recombination and capture distance given by DefectObject.return_recombine_results( ) and return_rate( ),
+        which must be set with neighbour_skin.
+
+        Properties of NeighbourList :
+         1. self.skin
+         2. self.cutoff, jdata[ 'neighbour_cutoff' ], the largest of rcutoff_elastic and jdata[ 'linkcell_recombine_radius' ] by default.
+         3. self.box, self.periodic
+         4. self.neighbour_dict, { handle : set of handles within self.cutoff + self.skin + d_j }.
+         5. self.reference_position[ 0 : self.numb_defectObject, 3 ], view of self.reference_buffer, unwrapped positions
+            of the last rebuilds, the rows are in the order of DefectStore.
+         6. self.active, False until self.build( ), i.e. neighbours are walked in 27 cells.
+         7. self.numb_build, the number of rebuilt lists.
+        '''
+
+        self.skin = j_must_have( jdata, 'neighbour_skin' )
+
+        reaction_radius = return_reaction_radius( jdata )
+        if reaction_radius == None : 
+            raise RuntimeError( 'neighbour_skin without linkcell_recombine_radius, the largest recombination and capture distance, wrong !' )
+
+        min_cutoff = max( j_must_have( jdata, 'rcutoff_elastic' ), reaction_radius )
+
+        self.cutoff = min_cutoff
+        if j_have( jdata, 'neighbour_cutoff' ) : self.cutoff = jdata[ 'neighbour_cutoff' ]
+
+        'partners of recombination and capture beyond self.cutoff would be lost.'
+        if self.cutoff < min_cutoff : 
+            raise RuntimeError( 'neighbour_cutoff %f .lt. rcutoff_elastic or linkcell_recombine_radius %f, wrong !' % ( self.cutoff, min_cutoff ) )
+
+        if self.skin <= 0.0 : raise RuntimeError( 'neighbour_skin %f .le. 0, wrong !' % self.skin )
+
+        'the farthest neighbour kept is within self.cutoff + 1.5 * self.skin, it must be in 27 cells, auto-tuning of BoxLinkcell takes it.'
+        if not ( j_have( jdata, 'linkcell_auto' ) and jdata[ 'linkcell_auto' ] ) :
+            linkcell_space = np.min( j_must_have( jdata, 'linkcell_space' ) )
+
+            if self.cutoff + 1.5 * self.skin > linkcell_space :
+                raise RuntimeError( 'neighbour_cutoff + 1.5 * neighbour_skin .gt. linkcell_space %f, wrong !' % linkcell_space )
+
+        self.box = np.array( j_must_have( jdata, 'box' ), dtype = np.float64 )
+        self.periodic = np.array( j_must_have( jdata, 'periodic' ), dtype = np.float64 )
+
+        self.neighbour_dict = { }
+
+        self.reference_buffer = GrowableArray( [ ], row_shape = ( 3, ) )
+        self.reference_position = self.reference_buffer.return_array( )
+
+        self.active = False
+
+        self.numb_build = 0
+
+    def clear( self ) :
+        'clear all lists, neighbours are walked in 27 cells until self.build( ).'
+
+        self.neighbour_dict = { }
+
+        self.reference_buffer.reset( [ ] )
+        self.reference_position = self.reference_buffer.return_array( )
+
+        self.active = False
+
+    def _return_unwrap_position( self,
+                                 defect_store,
+                                 index_array   ) :
+        'return positions of index_array without periodic images.'
+
+        return defect_store.position[ index_array ] + defect_store.position_image_int[ index_array ] * self.box
+
+    def _return_displacement( self,
+                              defect_store,
+                              index_array   ) :
+        'return the displacements of index_array from their reference positions.'
+
+        delta = self._return_unwrap_position( defect_store, index_array ) - self.reference_position[ index_array ]
+
+        return np.sqrt( np.sum( delta * delta, axis = -1 ) )
+
+    def _return_distance( self,
+                          defect_store,
+                          index,
+                          index_array   ) :
+        'return the distances between index and index_array with the nearest periodic images.'
+
+        delta = defect_store.position[ index_array ] - defect_store.position[ index ]
+        delta -= self.periodic * self.box * np.round( delta / self.box )
+
+        return np.sqrt( np.sum( delta * delta, axis = 1 ) )
+
+    def build( self,
+               defect_store,
+               handle_list,
+               cells_index_list_function ) :
+        '''
+        build lists of all defectObjects, cells_index_list_function( index ) returns indexes in 27 cells of index.
+        '''
+
+        self.clear( )
+
+        self.reference_buffer.reset( self._return_unwrap_position( defect_store, np.arange( len( handle_list ) ) ) )
+        self.reference_position = self.reference_buffer.return_array( )
+
+        self.neighbour_dict = { handle : set( ) for handle in handle_list }
+
+        for index in range( len( handle_list ) ) :
+            self._build_index( defect_store, handle_list, index, cells_index_list_function( index ) )
+
+        self.active = True
+
+    def _build_index( self,
+                      defect_store,
+                      handle_list,
+                      index,
+                      cells_index_list ) :
+        'rebuild the list of index from cells_index_list in its 27 cells, and reset its reference position.'
+
+        handle = handle_list[ index ]
+
+        for item in self.neighbour_dict[ handle ] : self.neighbour_dict[ item ].discard( handle )
+
+        self.reference_position[ index ] = self._return_unwrap_position( defect_store, index )
+
+        index_array = np.array( [ item for item in cells_index_list if item != index ], dtype = np.int64 )
+
+        neighbour_set = set( )
+
+        if index_array.size != 0 :
+            distance = self._return_distance( defect_store, index, index_array )
+            keep = distance < self.cutoff + self.skin + self._return_displacement( defect_store, index_array )
+            neighbour_set = { handle_list[ item ] for item in index_array[ keep ] }
+
+        self.neighbour_dict[ handle ] = neighbour_set
+
+        for item in neighbour_set : self.neighbour_dict[ item ].add( handle )
+
+        self.numb_build += 1
+
+    def update( self,
+                defect_store,
+                handle_list,
+                index,
+                cells_index_list_function ) :
+        'rebuild the list of index after it moves, only if it is more than self.skin / 2 from its reference position.'
+
+        if self._return_displacement( defect_store, index ) > 0.5 * self.skin :
+            self._build_index( defect_store, handle_list, index, cells_index_list_function( index ) )
+
+    def append( self,
+                defect_store,
+                handle_list,
+                index_list,
+                cells_index_list_function ) :
+        'build lists of added defectObjects with index_list at the end of handle_list.'
+
+        self.reference_buffer.append( self._return_unwrap_position( defect_store, np.array( index_list, dtype = np.int64 ) ) )
+        self.reference_position = self.reference_buffer.return_array( )
+
+        for index in index_list : self.neighbour_dict[ handle_list[ index ] ] = set( )
+
+        for index in index_list :
+            self._build_index( defect_store, handle_list, index, cells_index_list_function( index ) )
+
+    def swap_remove( self,
+                     index,
+                     handle ) :
+        'delete the list of index with handle, and its row of reference positions by moving the last row into index.'
+
+        for item in self.neighbour_dict.pop( handle ) : self.neighbour_dict[ item ].discard( handle )
+
+        last_index = self.reference_buffer.size - 1
+
+        tmp_buffer = self.reference_buffer.return_buffer( )
+        if index != last_index : tmp_buffer[ index ] = tmp_buffer[ last_index ]
+        self.reference_buffer.delete( last_index )
+
+        self.reference_position = self.reference_buffer.return_array( )
+
+    def move( self, tmp_move_vector ) :
+        'all defectObjects are moved with tmp_move_vector, their lists are not changed.'
+
+        self.reference_position += np.asarray( tmp_move_vector )
+
+    def return_index_list( self,
+                           defect_store,
+                           handle_list,
+                           index_of_handle,
+                           index            ) :
+        'return indexes of defectObjects within self.cutoff of index, not including index.'
+
+        index_array = np.array( [ index_of_handle[ item ] for item in self.neighbour_dict[ handle_list[ index ] ] ], dtype = np.int64 )
+
+        if index_array.size == 0 : return [ ]
+
+        return index_array[ self._return_distance( defect_store, index, index_array ) < self.cutoff ].tolist( )
+
+    def _return_properties( self ) :
+        '''
+        Properties of NeighbourList :
+         1. self.skin
+         2. self.cutoff
+         3. self.box, self.periodic
+         4. self.neighbour_dict
+         5. self.reference_position
+         6. self.active
+         7. self.numb_build
+        '''
+
+        properties_list = [ [ 'skin',               self.skin               ],
+                            [ 'cutoff',             self.cutoff             ],
+                            [ 'box',                self.box                ],
+                            [ 'periodic',           self.periodic           ],
+                            [ 'neighbour_dict',     self.neighbour_dict     ],
+                            [ 'reference_position', self.reference_position ],
+                            [ 'active',             self.active             ],
+                            [ 'numb_build',         self.numb_build         ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for NeighbourList --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class NeighbourList detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 200,
+                         help = 'the number of points' )
+
+    parser.add_argument( '-s', '--step', type = int, default = 2000,
+                         help = 'the number of random jumps' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'box' : [ 10.0, 10.0, 10.0 ], 'periodic' : [ True, True, True ], 'linkcell_space' : [ 2.5, 2.5, 2.5 ],
+              'rcutoff_elastic' : 1.5, 'linkcell_recombine_radius' : 0.5, 'neighbour_skin' : 0.6 }
+
+    neighbourList = NeighbourList( jdata )
+
+    'points with the columns of DefectStore, every index is a candidate in 27 cells.'
+    class PointStore( object ) :
+        def __init__( self, position ) :
+            self.position = np.array( position )
+            self.position_image_int = np.zeros( self.position.shape, dtype = np.int64 )
+        def remap( self ) :
+            shift = np.floor( self.position / 10.0 )
+            self.position -= shift * 10.0
+            self.position_image_int += shift.astype( np.int64 )
+
+    random_state = np.random.RandomState( 7 )
+
+    store = PointStore( random_state.rand( args.numb, 3 ) * 10.0 )
+    handle_list = list( range( args.numb ) )
+    index_of_handle = { handle : index for ( index, handle ) in enumerate( handle_list ) }
+
+    all_index_list_function = lambda index : list( range( len( handle_list ) ) )
+
+    neighbourList.build( store, handle_list, all_index_list_function )
+
+    for step in range( args.step ) :
+
+        index = random_state.randint( len( handle_list ) )
+        store.position[ index ] += ( random_state.rand( 3 ) - 0.5 ) * 0.4
+        store.remap( )
+
+        neighbourList.update( store, handle_list, index, all_index_list_function )
+
+        'neighbours of every point within the cutoff by the brute force.'
+        if step % 100 == 0 :
+            for i in range( len( handle_list ) ) :
+                delta = store.position - store.position[ i ]
+                delta -= 10.0 * np.round( delta / 10.0 )
+                real_list = sorted( j for j in np.flatnonzero( np.sum( delta * delta, axis = 1 ) < 1.5 ** 2 ) if j != i )
+
+                if sorted( neighbourList.return_index_list( store, handle_list, index_of_handle, i ) ) != real_list :
+                    raise RuntimeError( '# neighbours of %d wrong !' % i )
+
+    if neighbourList.numb_build >= args.numb + args.step :
+        raise RuntimeError( '# every jump rebuilds a list, wrong !' )
+
+    print( '# numb_build : %d for %d jumps' % ( neighbourList.numb_build, args.step ) )
+    print( '# every is OK !' )
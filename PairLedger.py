@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+'This is an PairLedger module, elastic energies of neighbouring pairs cached by handles and updated by differences.'
+
+import numpy as np
+import argparse
+
+from Auxiliary import j_have
+
+def create_pair_ledger( jdata ) :
+    'return Class PairLedger when jdata[ "elastic_pair_ledger" ] is True, otherwise None, i.e. ui is summed over all neighbours by every call.'
+
+    if j_have( jdata, 'elastic_pair_ledger' ) and jdata[ 'elastic_pair_ledger' ] : return PairLedger( jdata )
+
+    return None
+
+class PairLedger( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        U_ij and U_ji of every pair of neighbours with U_ij .ne. 0 or U_ji .ne. 0 are evaluated once, U_ij in the row of i and U_ji in the row of j,
+        and ui = 0.5 * sigma_( j != i ) U_ij of every handle is kept and changed only by differences :
+         a. a defectObject moved or substituted, U_ij and U_ji of its pairs are evaluated again, O( k ) for k neighbours,
+            ui of itself is summed again, and ui of its old and new partners are changed by 0.5 * ( U_ji_new - U_ji_old ),
+         b. a defectObject deleted, its pairs are removed, ui of its partners are changed by - 0.5 * U_ji.
+        U_ij = U_ji is not taken, both are evaluated by pair_function, unless they are given at once by self.set_pair_array( ).
+        A pair with U_ij .ne. 0 must be found in 27 cells of both defectObjects, as the effect index lists of DefectSystem,
+        since U_ij is zero beyond rcutoff_elastic.
+
+        Properties of PairLedger :
+         1. self.pair_dict, { handle : { handle_j : U_ij } }, U_ij in the row of handle, U_ji in the row of handle_j.
+         2. self.ui_dict, { handle : ui }, 0.5 * sigma_( j ) of the row of handle.
+         3. self.numb_evaluation, the number of evaluated U_ij.
+        '''
+
+        self.pair_dict = { }
+        self.ui_dict = { }
+
+        self.numb_evaluation = 0
+
+    def clear( self ) :
+        'clear all pairs.'
+
+        self.pair_dict = { }
+        self.ui_dict = { }
+
+    def build( self,
+               handle_list,
+               index_list_function,
+               pair_function        ) :
+        '''
+        build pairs of all defectObjects, index_list_function( index ) returns indexes of neighbours of index,
+        pair_function( index, index_j ) returns U_ij, every pair is taken once by the smaller handle, and U_ij and U_ji are evaluated.
+        '''
+
+        self.clear( )
+
+        for handle in handle_list :
+            self.pair_dict[ handle ] = { }
+            self.ui_dict[ handle ] = 0.0
+
+        for ( index, handle ) in enumerate( handle_list ) :
+
+            for item in index_list_function( index ) :
+
+                handle_j = handle_list[ item ]
+                if handle_j <= handle : continue
+
+                u = pair_function( index, item )
+                u_j = pair_function( item, index )
+                self.numb_evaluation += 2
+
+                if u != 0.0 or u_j != 0.0 : self._add_pair( handle, handle_j, u, u_j )
+
+    def set_pair_array( self,
+                        handle_list,
+                        pair_array,
+                        u_array,
+                        u_j_array = None ) :
+        '''
+        build pairs of all defectObjects from pairs [ i, j ] of pair_array( numb_pair x 2 ) with U_ij of u_array and U_ji of u_j_array,
+        u_j_array is None for U_ji = U_ij, e.g. ElasticKernel, whose U_ij is symmetric.
+        '''
+
+        if u_j_array is None : u_j_array = u_array
+
+        self.clear( )
+
+        for handle in handle_list :
+            self.pair_dict[ handle ] = { }
+            self.ui_dict[ handle ] = 0.0
+
+        self.numb_evaluation += len( pair_array )
+
+        for ( index, index_j, u, u_j ) in zip( pair_array[ :, 0 ].tolist( ), pair_array[ :, 1 ].tolist( ), u_array.tolist( ), u_j_array.tolist( ) ) :
+            if u != 0.0 or u_j != 0.0 : self._add_pair( handle_list[ index ], handle_list[ index_j ], u, u_j )
+
+    def _add_pair( self,
+                   handle,
+                   handle_j,
+                   u,
+                   u_j       ) :
+        'add the pair ( handle, handle_j ) with U_ij = u and U_ji = u_j.'
+
+        self.pair_dict[ handle ][ handle_j ] = u
+        self.pair_dict[ handle_j ][ handle ] = u_j
+
+        self.ui_dict[ handle ] += 0.5 * u
+        self.ui_dict[ handle_j ] += 0.5 * u_j
+
+    def remove( self, handle ) :
+        'remove handle and all its pairs, ui of its partners are changed by - 0.5 * U_ji.'
+
+        for handle_j in self.pair_dict.pop( handle ) :
+            self.ui_dict[ handle_j ] -= 0.5 * self.pair_dict[ handle_j ].pop( handle )
+
+        del self.ui_dict[ handle ]
+
+    def update( self,
+                handle,
+                handle_list,
+                index,
+                index_list,
+                pair_function ) :
+        '''
+        evaluate U_ij and U_ji of index with handle and every index_j in index_list again, a new handle is added,
+        pairs of handle out of index_list are removed, ui of handle and its partners are changed by differences.
+        '''
+
+        if handle in self.pair_dict : self.remove( handle )
+
+        self.pair_dict[ handle ] = { }
+        self.ui_dict[ handle ] = 0.0
+
+        for item in index_list :
+
+            u = pair_function( index, item )
+            u_j = pair_function( item, index )
+            self.numb_evaluation += 2
+
+            if u != 0.0 or u_j != 0.0 : self._add_pair( handle, handle_list[ item ], u, u_j )
+
+    def return_ui( self, handle ) :
+        'return ui = 0.5 * sigma_( j != i ) U_ij of handle.'
+
+        return self.ui_dict[ handle ]
+
+    def _return_properties( self ) :
+        '''
+        Properties of PairLedger :
+         1. self.pair_dict
+         2. self.ui_dict
+         3. self.numb_evaluation
+        '''
+
+        properties_list = [ [ 'pair_dict',       self.pair_dict       ],
+                            [ 'ui_dict',         self.ui_dict         ],
+                            [ 'numb_evaluation', self.numb_evaluation ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for PairLedger --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class PairLedger detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 200,
+                         help = 'the number of points' )
+
+    parser.add_argument( '-s', '--step', type = int, default = 2000,
+                         help = 'the number of random changes' )
+
+    args = parser.parse_args( )
+
+    pairLedger = PairLedger( { 'elastic_pair_ledger' : True } )
+
+    random_state = np.random.RandomState( 7 )
+
+    'points in a periodic box 10, U_ij = s_i * s_j * ( 1 + s_i ) / r^3 within 1.5, U_ij .ne. U_ji, every index is a neighbour.'
+    position_list = [ random_state.rand( 3 ) * 10.0 for i in range( args.numb ) ]
+    strength_list = [ random_state.rand( ) - 0.5 for i in range( args.numb ) ]
+    handle_list = list( range( args.numb ) )
+    next_handle = args.numb
+
+    def pair_function( index, index_j ) :
+        delta = position_list[ index_j ] - position_list[ index ]
+        delta -= 10.0 * np.round( delta / 10.0 )
+        r = np.sqrt( np.sum( delta * delta ) )
+        if r >= 1.5 : return 0.0
+        return strength_list[ index ] * strength_list[ index_j ] * ( 1.0 + strength_list[ index ] ) / r ** 3
+
+    all_index_list_function = lambda index : [ item for item in range( len( handle_list ) ) if item != index ]
+
+    pairLedger.build( handle_list, all_index_list_function, pair_function )
+
+    if pairLedger.numb_evaluation != args.numb * ( args.numb - 1 ) :
+        raise RuntimeError( '# a pair is not taken once, wrong !' )
+
+    for step in range( args.step ) :
+
+        what = random_state.randint( 4 )
+        index = random_state.randint( len( handle_list ) )
+
+        if what == 0 :
+            'a new point.'
+            position_list.append( random_state.rand( 3 ) * 10.0 )
+            strength_list.append( random_state.rand( ) - 0.5 )
+            handle_list.append( next_handle )
+            next_handle += 1
+            index = len( handle_list ) - 1
+        elif what == 1 :
+            'delete index by swapping with the last one.'
+            pairLedger.remove( handle_list[ index ] )
+            for item in [ position_list, strength_list, handle_list ] :
+                item[ index ] = item[ -1 ]
+                del item[ -1 ]
+            continue
+        else :
+            'a jump, or a new strength.'
+            position_list[ index ] = np.mod( position_list[ index ] + ( random_state.rand( 3 ) - 0.5 ) * 0.6, 10.0 )
+            if what == 3 : strength_list[ index ] = random_state.rand( ) - 0.5
+
+        pairLedger.update( handle_list[ index ], handle_list, index, all_index_list_function( index ), pair_function )
+
+        'ui of every point by the brute force.'
+        if step % 200 == 0 :
+            for i in range( len( handle_list ) ) :
+                ui = 0.5 * sum( pair_function( i, j ) for j in all_index_list_function( i ) )
+                if abs( pairLedger.return_ui( handle_list[ i ] ) - ui ) > 1.0E-9 :
+                    raise RuntimeError( '# ui of %d wrong !' % i )
+
+    print( '# numb_evaluation : %d for %d changes' % ( pairLedger.numb_evaluation, args.step ) )
+    print( '# every is OK !' )
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+'This is an ParallelSublattice module, parallel okmc by domains of the linkcell grid with the synchronous sublattice scheme.'
+
+import numpy as np
+import argparse
+import copy
+import os
+import multiprocessing
+
+from Auxiliary import j_have, j_must_have
+from RandomStream import RandomStream
+
+'systems of domains kept by a worker process across sectors and cycles, { domain : DefectSystem }.'
+domain_system_dict = { }
+
+'Class DefectSystem and jdata of domains, sent once to every worker process by set_domain_worker( ).'
+domain_worker_dict = { }
+
+def set_domain_worker( system_class, jdata ) :
+    'keep system_class and jdata of domains in the worker process, the initializer of the process pool.'
+
+    domain_worker_dict[ 'system_class' ] = system_class
+    domain_worker_dict[ 'jdata' ] = jdata
+
+def evolution_domain( task, 
+                      system_dict = None,
+                      worker_dict = None  ) :
+    '''
+    evolve one domain in a worker for a time horizon, task = ( domain, active_list, ghost_list, time_horizon, seed ),
+    Class DefectSystem and jdata are taken from worker_dict, domain_worker_dict of the worker by default.
+    ghost defectObjects are frozen, i.e. zero rates, they only react with the active defectObjects.
+    the system of domain in system_dict, domain_system_dict of the worker by default, is reset to the defectObjects of task 
+    and its random stream is seeded again, so the linkcell, buffers and random stream are built only once for every domain and worker.
+    return ( item_list, numb_step ), all defectObjects of the domain after the time horizon in order, 
+    a ghost defectObject left as it was sent is its index in ghost_list, so it is not sent back.
+    '''
+
+    ( domain, active_list, ghost_list, time_horizon, seed ) = task
+
+    if len( active_list ) == 0 : return ( active_list + list( range( len( ghost_list ) ) ), 0 )
+
+    if system_dict is None : system_dict = domain_system_dict
+    if worker_dict is None : worker_dict = domain_worker_dict
+
+    jdata = worker_dict[ 'jdata' ]
+
+    if domain in system_dict :
+        defectSys = system_dict[ domain ]
+        defectSys.random_stream.reseed( seed )
+        defectSys.reset_defectObject_list( jdata, active_list + ghost_list )
+    else :
+        defectSys = worker_dict[ 'system_class' ]( jdata, active_list + ghost_list, RandomStream( seed ) )
+        system_dict[ domain ] = defectSys
+
+    defectSys.set_frozen_handle_list( jdata, defectSys.handle_list[ len( active_list ) : ] )
+
+    c_step = defectSys.c_step
+
+    defectSys.evolution_time_horizon( jdata, time_horizon )
+
+    'ghost defectObjects are kept alive by ghost_list, so their ids are not used again.'
+    ghost_index_dict = { id( item ) : k for ( k, item ) in enumerate( ghost_list ) }
+
+    item_list = [ ghost_index_dict.get( id( item ), item ) for item in defectSys.defectObject_list ]
+
+    return ( item_list, defectSys.c_step - c_step )
+
+class ParallelSublattice( object ) :
+
+    def __init__( self,
+                  jdata,
+                  tmp_defectSystem ) :
+        '''
+        The box is divided into domains along the linkcell grid by jdata[ 'parallel_domain' ] = [ dx, dy, dz ],
+        and every domain into 8 sectors, halves of the domain in every direction. In one cycle, sectors are active one by one
+        in a random rotation, all domains evolve their active sector for self.time_horizon at the same time in a process pool,
+        then the time of the system moves self.time_horizon forward, i.e. the fractional step of the synchronous sublattice scheme.
+        An active sector is sent with its ghost cells, one layer of cells around it, ghost defectObjects are frozen and
+        react with active defectObjects, so boundary-crossing moves and recombinations are taken in the domain.
+        Active sectors of two domains are separated by half a domain, at least 2 cells, so their ghost cells never overlap.
+        The system of every domain is kept by the worker evolving it, i.e. by this process in self.system_dict without a pool,
+        and reset to the defectObjects sent. Class DefectSystem and jdata are sent once to every worker by the initializer of the pool,
+        active and ghost defectObjects are pickled to the pool in every sector, since DefectObjects are python objects, not columns,
+        and only the changed defectObjects are pickled back, ghost defectObjects left as they were are sent back as indexes.
+
+        Properties of ParallelSublattice :
+         1. self.domain_vector, [ dx, dy, dz ]
+         2. self.nlc_vector, self.fnlc_vector, self.hmeps, the linkcell grid.
+         3. self.cell_domain_vector, the number of cells of a domain in every direction.
+         4. self.time_horizon
+         5. self.numb_process, the pool runs in this process when self.numb_process == 1.
+         6. self.system_class, Class DefectSystem for the workers.
+         7. self.jdata_domain, jdata of the workers.
+         8. self.defectObject_list, all defectObjects of the system.
+         9. self.numb_cycle
+         10. self.system_dict, { domain : DefectSystem } kept without a pool.
+         11. self.worker_dict, { 'system_class' : , 'jdata' : } of domains without a pool.
+        '''
+
+        self.domain_vector = np.array( j_must_have( jdata, 'parallel_domain' ), dtype = np.int64 )
+
+        if j_have( jdata, 'linkcell_level_space' ) :
+            raise RuntimeError( 'parallel_domain with linkcell_level_space, domains need one linkcell grid, wrong !' )
+
+        if j_have( jdata, 'linkcell_auto' ) and jdata[ 'linkcell_auto' ] :
+            raise RuntimeError( 'parallel_domain with linkcell_auto, cells of linkcell_auto may not be divided by parallel_domain, wrong !' )
+
+        if j_have( jdata, 'temperature_schedule' ) :
+            raise RuntimeError( 'parallel_domain with temperature_schedule, domains evolve at one temperature, wrong !' )
+
+        if j_have( jdata, 'elastic_far_cutoff' ) :
+            raise RuntimeError( 'parallel_domain with elastic_far_cutoff, far loops are out of domains and ghosts, wrong !' )
+
+        self.nlc_vector = np.array( tmp_defectSystem.linkcell.nlc_vector, dtype = np.int64 )
+        self.fnlc_vector = tmp_defectSystem.linkcell.fnlc_vector
+        self.hmeps = tmp_defectSystem.linkcell.hmeps
+
+        if np.any( self.nlc_vector % self.domain_vector != 0 ) :
+            raise RuntimeError( 'linkcell grid %s is not divided by parallel_domain %s, wrong !' % ( self.nlc_vector, self.domain_vector ) )
+
+        self.cell_domain_vector = self.nlc_vector // self.domain_vector
+
+        if np.any( self.cell_domain_vector % 2 != 0 ) or np.any( self.cell_domain_vector < 4 ) :
+            raise RuntimeError( 'cells of a domain %s must be even and .ge. 4, wrong !' % self.cell_domain_vector )
+
+        self.time_horizon = j_must_have( jdata, 'parallel_time_horizon' )
+
+        self.numb_process = os.cpu_count( )
+        if j_have( jdata, 'parallel_process' ) : self.numb_process = jdata[ 'parallel_process' ]
+
+        self.system_class = type( tmp_defectSystem )
+
+        'workers evolve a time horizon without initial recombine, moving to the center or output.'
+        self.jdata_domain = copy.deepcopy( jdata )
+        self.jdata_domain[ 'initial_recombine' ] = False
+        self.jdata_domain[ 'individual_cascade' ] = False
+        self.jdata_domain[ 'multi_cascade' ] = False
+        self.jdata_domain[ 'temperature' ] = tmp_defectSystem.temperature_evolution
+
+        for item in [ 'parallel_domain', 'seed' ] :
+            if item in self.jdata_domain : del self.jdata_domain[ item ]
+
+        self.defectObject_list = tmp_defectSystem.defectObject_list
+
+        self.numb_cycle = 0
+
+        self.system_dict = { }
+
+        self.worker_dict = { 'system_class' : self.system_class, 'jdata' : self.jdata_domain }
+
+        self.pool = None
+        if self.numb_process > 1 : self.pool = multiprocessing.Pool( self.numb_process, set_domain_worker, ( self.system_class, self.jdata_domain ) )
+
+    def close( self ) :
+        'close the process pool.'
+
+        if self.pool != None :
+            self.pool.close( )
+            self.pool.join( )
+            self.pool = None
+
+    def return_domain_array( self,
+                             position_scale_array,
+                             sector                ) :
+        '''
+        return ( domain_array, active_array ) for every row of position_scale_array[ :, 3 ] with sector active,
+        domain_array is the domain sending the row, -1 for not sent, active_array is True for rows in the active sector.
+        the cells [ b * m / 2 - 1, ( b + 1 ) * m / 2 + 1 ) of every domain are sent in every direction, b is the bit of sector.
+        '''
+
+        cell_index_array = ( ( np.asarray( position_scale_array ) + self.hmeps ) * self.fnlc_vector ).astype( np.int64 )
+
+        bit_vector = np.array( [ sector & 1, ( sector >> 1 ) & 1, ( sector >> 2 ) & 1 ], dtype = np.int64 )
+        half_vector = self.cell_domain_vector // 2
+
+        shift_array = np.mod( cell_index_array - bit_vector * half_vector + 1, self.nlc_vector )
+        offset_array = shift_array % self.cell_domain_vector
+
+        domain_index_array = shift_array // self.cell_domain_vector
+
+        sent_array = np.all( offset_array < half_vector + 2, axis = 1 )
+        active_array = np.all( ( offset_array >= 1 ) & ( offset_array < half_vector + 1 ), axis = 1 )
+
+        domain_array = domain_index_array[ :, 0 ] + self.domain_vector[ 0 ] * ( domain_index_array[ :, 1 ] + self.domain_vector[ 1 ] * domain_index_array[ :, 2 ] )
+        domain_array[ ~sent_array ] = -1
+
+        return ( domain_array, active_array )
+
+    def take_sector( self,
+                     sector,
+                     random_stream,
+                     time_horizon   ) :
+        'evolve the sector of all domains for time_horizon, return the number of steps.'
+
+        numb_domain = int( np.prod( self.domain_vector ) )
+
+        position_scale_array = np.array( [ item.return_position_scale( ) for item in self.defectObject_list ] ).reshape( -1, 3 )
+
+        ( domain_array, active_array ) = self.return_domain_array( position_scale_array, sector )
+
+        task_list = [ ]
+
+        for domain in range( numb_domain ) :
+            active_list = [ self.defectObject_list[ i ] for i in np.flatnonzero( ( domain_array == domain ) & active_array ) ]
+            ghost_list = [ self.defectObject_list[ i ] for i in np.flatnonzero( ( domain_array == domain ) & ~active_array ) ]
+
+            seed = int( random_stream.rand( ) * 2 ** 32 )
+
+            task_list.append( ( domain, active_list, ghost_list, time_horizon, seed ) )
+
+        if self.pool == None :
+            result_list = [ evolution_domain( item, self.system_dict, self.worker_dict ) for item in task_list ]
+        else :
+            result_list = self.pool.map( evolution_domain, task_list )
+
+        'defectObjects not sent are kept, the results of every domain are added, an index is a ghost defectObject kept.'
+        new_defectObject_list = [ self.defectObject_list[ i ] for i in np.flatnonzero( domain_array == -1 ) ]
+
+        numb_step = 0
+
+        for ( task, ( item_list, tmp_numb_step ) ) in zip( task_list, result_list ) :
+            ghost_list = task[ 2 ]
+            new_defectObject_list.extend( [ ghost_list[ item ] if isinstance( item, int ) else item for item in item_list ] )
+            numb_step += tmp_numb_step
+
+        self.defectObject_list = new_defectObject_list
+
+        return numb_step
+
+    def take_cycle( self, 
+                    random_stream,
+                    time_horizon = None ) :
+        'evolve all 8 sectors in a random rotation, the system moves time_horizon, self.time_horizon by default, forward, return the number of steps.'
+
+        if time_horizon is None : time_horizon = self.time_horizon
+
+        numb_step = 0
+
+        rotation = sorted( range( 8 ), key = lambda item : random_stream.rand( ) )
+
+        for sector in rotation :
+            numb_step += self.take_sector( sector, random_stream, time_horizon )
+
+        self.numb_cycle += 1
+
+        return numb_step
+
+    def _return_properties( self ) :
+        '''
+        Properties of ParallelSublattice :
+         1. self.domain_vector
+         2. self.nlc_vector
+         3. self.cell_domain_vector
+         4. self.time_horizon
+         5. self.numb_process
+         6. self.system_class
+         7. self.numb_defectObject
+         8. self.numb_cycle
+        '''
+
+        properties_list = [ [ 'domain_vector',      self.domain_vector                ],
+                            [ 'nlc_vector',         self.nlc_vector                   ],
+                            [ 'cell_domain_vector', self.cell_domain_vector           ],
+                            [ 'time_horizon',       self.time_horizon                 ],
+                            [ 'numb_process',       self.numb_process                 ],
+                            [ 'system_class',       self.system_class                 ],
+                            [ 'numb_defectObject',  len( self.defectObject_list )     ],
+                            [ 'numb_cycle',         self.numb_cycle                   ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for ParallelSublattice --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class ParallelSublattice detecting ---' )
+
+    args = parser.parse_args( )
+
+    'a linkcell grid of 12 x 8 x 4 cells, domains of 4 x 4 x 4 cells.'
+    class GridLinkcell( object ) :
+        def __init__( self ) :
+            ( self.nlc_vector, self.fnlc_vector, self.hmeps ) = ( np.array( [ 12, 8, 4 ] ), np.array( [ 12.0, 8.0, 4.0 ] ), -1e-9 )
+
+    class GridSystem( object ) :
+        def __init__( self ) :
+            ( self.linkcell, self.temperature_evolution, self.defectObject_list ) = ( GridLinkcell( ), 600.0, [ ] )
+
+    parallelSublattice = ParallelSublattice( { 'parallel_domain' : [ 3, 2, 1 ], 'parallel_time_horizon' : 1.0E-6, 'parallel_process' : 1 }, GridSystem( ) )
+
+    'the center of every cell.'
+    cell_array = np.array( [ [ i, j, k ] for i in range( 12 ) for j in range( 8 ) for k in range( 4 ) ] )
+    position_scale_array = ( cell_array + 0.5 ) / parallelSublattice.fnlc_vector
+
+    numb_active_array = np.zeros( len( cell_array ), dtype = np.int64 )
+
+    for sector in range( 8 ) :
+
+        ( domain_array, active_array ) = parallelSublattice.return_domain_array( position_scale_array, sector )
+
+        numb_active_array += active_array
+
+        if np.any( active_array & ( domain_array == -1 ) ) :
+            raise RuntimeError( '# active cells not sent, wrong !' )
+
+        'ghost cells are the layer around active cells of the same domain, at most one cell away.'
+        for domain in range( 6 ) :
+            active_cell_array = cell_array[ ( domain_array == domain ) & active_array ]
+            ghost_cell_array = cell_array[ ( domain_array == domain ) & ~active_array ]
+
+            for item in ghost_cell_array :
+                delta = np.abs( active_cell_array - item )
+                delta = np.minimum( delta, parallelSublattice.nlc_vector - delta )
+                if np.min( np.max( delta, axis = 1 ) ) != 1 :
+                    raise RuntimeError( '# ghost cell %s is not next to active cells, wrong !' % item )
+
+    'every cell is active in one sector of one domain.'
+    if np.any( numb_active_array != 1 ) :
+        raise RuntimeError( '# active cells of 8 sectors are not a partition, wrong !' )
+
+    parallelSublattice.print_properties( )
+    print( '# every is OK !' )
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+'pytest checks of ParallelSublattice with point defects of a stub system, without the package tungsten.'
+
+import numpy as np
+import pytest
+
+from ParallelSublattice import ParallelSublattice
+from RandomStream import RandomStream
+
+class StubDefect( object ) :
+    'a point defect, sign +1 interstitial and -1 vacancy, at position_scale of the box.'
+
+    def __init__( self, sign, position_scale ) :
+        ( self.sign, self.position_scale ) = ( sign, np.mod( position_scale, 1.0 ) )
+
+    def return_position_scale( self ) :
+        return self.position_scale
+
+class StubLinkcell( object ) :
+    'a linkcell grid of 12 x 8 x 4 cells.'
+
+    def __init__( self ) :
+        ( self.nlc_vector, self.fnlc_vector, self.hmeps ) = ( np.array( [ 12, 8, 4 ] ), np.array( [ 12.0, 8.0, 4.0 ] ), -1e-9 )
+
+class StubSystem( object ) :
+    '''
+    the interface of DefectSystem used by ParallelSublattice, point defects hop less than half a cell at rate 1
+    and an interstitial and a vacancy closer than recombine_cell cells recombine, frozen defects never hop.
+    '''
+
+    recombine_cell = 0.3
+
+    def __init__( self, jdata, defectObject_list, random_stream = None ) :
+
+        ( self.linkcell, self.temperature_evolution, self.c_step, self.next_handle ) = ( StubLinkcell( ), 600.0, 0, 0 )
+
+        self.random_stream = random_stream
+        self.reset_defectObject_list( jdata, defectObject_list )
+
+    def reset_defectObject_list( self, jdata, defectObject_list ) :
+
+        self.defectObject_list = list( defectObject_list )
+        self.handle_list = list( range( self.next_handle, self.next_handle + len( defectObject_list ) ) )
+        self.next_handle += len( defectObject_list )
+        self.frozen_handle_set = set( )
+
+    def set_frozen_handle_list( self, jdata, handle_list ) :
+
+        self.frozen_handle_set = set( handle_list )
+
+    def _return_distance_cell( self, item_0, item_1 ) :
+
+        delta = item_0.position_scale - item_1.position_scale
+        delta -= np.round( delta )
+
+        return np.linalg.norm( delta * self.linkcell.fnlc_vector )
+
+    def evolution_time_horizon( self, jdata, time_horizon ) :
+
+        c_time = 0.0
+
+        while True :
+            active_list = [ i for ( i, item ) in enumerate( self.handle_list ) if item not in self.frozen_handle_set ]
+
+            if len( active_list ) == 0 : break
+
+            c_time += self.random_stream.exponential( ) / len( active_list )
+            if c_time >= time_horizon : break
+
+            index = active_list[ int( self.random_stream.rand( ) * len( active_list ) ) ]
+
+            hop = np.array( [ self.random_stream.rand( ) - 0.5 for k in range( 3 ) ] ) / self.linkcell.fnlc_vector
+            self.defectObject_list[ index ] = StubDefect( self.defectObject_list[ index ].sign, self.defectObject_list[ index ].position_scale + hop )
+
+            self.c_step += 1
+
+            for ( i, item ) in enumerate( self.defectObject_list ) :
+                if item.sign != self.defectObject_list[ index ].sign and self._return_distance_cell( item, self.defectObject_list[ index ] ) < self.recombine_cell :
+                    for k in sorted( [ i, index ], reverse = True ) :
+                        del self.defectObject_list[ k ]
+                        del self.handle_list[ k ]
+                    break
+
+def return_parallelSublattice( numb_process = 1, numb_defectObject = 600, seed = 7 ) :
+    'return ParallelSublattice of domains 3 x 2 x 1 on a stub system of numb_defectObject random interstitials and vacancies.'
+
+    random_state = np.random.RandomState( seed )
+
+    defectObject_list = [ StubDefect( 2 * ( i % 2 ) - 1, random_state.rand( 3 ) ) for i in range( numb_defectObject ) ]
+
+    jdata = { 'parallel_domain' : [ 3, 2, 1 ], 'parallel_time_horizon' : 0.5, 'parallel_process' : numb_process }
+
+    return ParallelSublattice( jdata, StubSystem( jdata, defectObject_list ) )
+
+def test_take_sector_ghost( ) :
+    'every sector conserves interstitials minus vacancies, ghost and not sent defectObjects are kept as they were or recombined.'
+
+    parallelSublattice = return_parallelSublattice( )
+
+    random_stream = RandomStream( 11 )
+
+    numb_step = 0
+
+    for sector in range( 8 ) :
+
+        old_defectObject_list = list( parallelSublattice.defectObject_list )
+        old_position_list = [ item.position_scale.copy( ) for item in old_defectObject_list ]
+
+        position_scale_array = np.array( [ item.return_position_scale( ) for item in old_defectObject_list ] )
+        ( domain_array, active_array ) = parallelSublattice.return_domain_array( position_scale_array, sector )
+
+        numb_step += parallelSublattice.take_sector( sector, random_stream, 0.5 )
+
+        new_id_set = set( id( item ) for item in parallelSublattice.defectObject_list )
+
+        assert len( new_id_set ) == len( parallelSublattice.defectObject_list )
+
+        assert sum( item.sign for item in parallelSublattice.defectObject_list ) == sum( item.sign for item in old_defectObject_list )
+
+        for ( i, item ) in enumerate( old_defectObject_list ) :
+            if domain_array[ i ] == -1 : assert id( item ) in new_id_set
+            if active_array[ i ] : continue
+            if id( item ) in new_id_set : assert np.array_equal( item.position_scale, old_position_list[ i ] )
+
+        'a defectObject deleted in the sector is recombined, interstitials and vacancies are deleted in pairs.'
+        numb_delete = len( old_defectObject_list ) - len( parallelSublattice.defectObject_list )
+        assert numb_delete >= 0 and numb_delete % 2 == 0
+
+    assert numb_step > 0
+    assert len( parallelSublattice.defectObject_list ) < 600
+
+def test_take_cycle_pool( ) :
+    'a pool of 2 processes gives the same defectObjects as one process.'
+
+    result_list = [ ]
+
+    for numb_process in [ 1, 2 ] :
+        parallelSublattice = return_parallelSublattice( numb_process )
+
+        numb_step = 0
+        random_stream = RandomStream( 11 )
+
+        for k in range( 2 ) :
+            numb_step += parallelSublattice.take_cycle( random_stream )
+
+        parallelSublattice.close( )
+
+        result_list.append( ( numb_step, [ ( item.sign, tuple( item.position_scale ) ) for item in parallelSublattice.defectObject_list ] ) )
+
+    assert result_list[ 0 ][ 0 ] > 0
+    assert result_list[ 0 ] == result_list[ 1 ]
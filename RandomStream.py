@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+'This is an RandomStream module, block-buffered random numbers for the okmc inner loop.'
+
+import numpy as np
+import argparse
+
+from Auxiliary import j_have
+
+def create_random_stream( jdata ) :
+    '''
+    return Class RandomStream seeded by jdata[ 'seed' ] % 2**32 as np.random.seed( ) in Okmc,
+    the same seed gives the same stream. no seed, seeded by the entropy of the operating system.
+    jdata[ 'random_block_size' ], the number of variates drawn in every block, default 65536.
+    '''
+
+    seed = None
+    if j_have( jdata, 'seed' ) : seed = jdata[ 'seed' ] % ( 2 ** 32 )
+
+    block_size = 65536
+    if j_have( jdata, 'random_block_size' ) : block_size = jdata[ 'random_block_size' ]
+
+    return RandomStream( seed, block_size )
+
+class RandomStream( object ) :
+
+    def __init__( self,
+                  seed = None,
+                  block_size = 65536 ) :
+        '''
+        Uniform variates in [ 0, 1 ) and standard exponential variates are drawn in blocks of self.block_size
+        from a numpy.random.Generator, and handed out one by one without a numpy call.
+        self.rand( ) can be used in place of np.random.rand( ) for one variate.
+
+        Properties of RandomStream :
+         1. self.seed
+         2. self.block_size
+         3. self.generator, numpy.random.Generator( PCG64 ) seeded by self.seed.
+         4. self.uniform_block, self.uniform_index
+         5. self.exponential_block, self.exponential_index
+        '''
+
+        self.seed = seed
+        self.block_size = block_size
+
+        if self.block_size < 1 : raise RuntimeError( 'block_size %d .lt. 1, wrong !' % self.block_size )
+
+        self.generator = np.random.default_rng( self.seed )
+
+        self.uniform_block = [ ]
+        self.uniform_index = 0
+
+        self.exponential_block = [ ]
+        self.exponential_index = 0
+
+    def reseed( self, seed ) :
+        'seed self.generator again with seed and drop the buffered variates, the same stream as RandomStream( seed, self.block_size ).'
+
+        self.seed = seed
+
+        self.generator = np.random.default_rng( self.seed )
+
+        self.uniform_block = [ ]
+        self.uniform_index = 0
+
+        self.exponential_block = [ ]
+        self.exponential_index = 0
+
+    def rand( self ) :
+        'return a uniform variate in [ 0, 1 ).'
+
+        if self.uniform_index == len( self.uniform_block ) :
+            'tolist( ) returns python floats, which are faster to hand out than numpy scalars.'
+            self.uniform_block = self.generator.random( self.block_size ).tolist( )
+            self.uniform_index = 0
+
+        self.uniform_index += 1
+
+        return self.uniform_block[ self.uniform_index - 1 ]
+
+    def exponential( self ) :
+        'return a standard exponential variate, i.e. -log( kesi ) with kesi in ( 0, 1 ].'
+
+        if self.exponential_index == len( self.exponential_block ) :
+            self.exponential_block = self.generator.standard_exponential( self.block_size ).tolist( )
+            self.exponential_index = 0
+
+        self.exponential_index += 1
+
+        return self.exponential_block[ self.exponential_index - 1 ]
+
+    def gamma( self, shape ) :
+        'return a standard gamma variate with shape, i.e. the sum of shape standard exponential variates, not buffered.'
+
+        return float( self.generator.standard_gamma( shape ) )
+
+    def rand_array( self, size ) :
+        'return an array of uniform variates in [ 0, 1 ) with size, the buffered ones first and the others by one call of self.generator.'
+
+        buffered = self.uniform_block[ self.uniform_index : self.uniform_index + size ]
+        self.uniform_index += len( buffered )
+
+        if len( buffered ) == size : return np.array( buffered, dtype = np.float64 )
+
+        return np.concatenate( ( np.array( buffered, dtype = np.float64 ), self.generator.random( size - len( buffered ) ) ) )
+
+    def exponential_array( self, size ) :
+        'return an array of standard exponential variates with size, the buffered ones first and the others by one call of self.generator.'
+
+        buffered = self.exponential_block[ self.exponential_index : self.exponential_index + size ]
+        self.exponential_index += len( buffered )
+
+        if len( buffered ) == size : return np.array( buffered, dtype = np.float64 )
+
+        return np.concatenate( ( np.array( buffered, dtype = np.float64 ), self.generator.standard_exponential( size - len( buffered ) ) ) )
+
+    def _return_properties( self ) :
+        '''
+        Properties of RandomStream :
+         1. self.seed
+         2. self.block_size
+         3. self.generator
+         4. self.uniform_index
+         5. self.exponential_index
+        '''
+
+        properties_list = [ [ 'seed',              self.seed              ],
+                            [ 'block_size',        self.block_size        ],
+                            [ 'generator',         self.generator         ],
+                            [ 'uniform_index',     self.uniform_index     ],
+                            [ 'exponential_index', self.exponential_index ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for RandomStream --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class RandomStream detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 200000,
+                         help = 'the number of variates' )
+
+    args = parser.parse_args( )
+
+    'the same seed gives the same stream, independent of block_size.'
+    stream_1 = create_random_stream( { 'seed' : 2 ** 40 + 7, 'random_block_size' : 1000 } )
+    stream_2 = create_random_stream( { 'seed' : 7, 'random_block_size' : 1000 } )
+
+    uniform_1 = np.array( [ stream_1.rand( ) for i in range( args.numb ) ] )
+    uniform_2 = np.array( [ stream_2.rand( ) for i in range( args.numb ) ] )
+
+    if not np.array_equal( uniform_1, uniform_2 ) :
+        raise RuntimeError( '# the same seed gives different streams, wrong !' )
+
+    if np.any( uniform_1 < 0.0 ) or np.any( uniform_1 >= 1.0 ) or abs( uniform_1.mean( ) - 0.5 ) > 5.0 / np.sqrt( 12.0 * args.numb ) :
+        raise RuntimeError( '# uniform variates wrong !' )
+
+    exponential = np.array( [ stream_1.exponential( ) for i in range( args.numb ) ] )
+
+    if np.any( exponential < 0.0 ) or abs( exponential.mean( ) - 1.0 ) > 5.0 / np.sqrt( args.numb ) :
+        raise RuntimeError( '# exponential variates wrong !' )
+
+    'arrays are the same variates as one by one, uniform and exponential variates share self.generator, so one kind for every stream.'
+    stream_list = [ create_random_stream( { 'seed' : 11, 'random_block_size' : 1000 } ) for i in range( 4 ) ]
+
+    for size in [ 10, 2500, 0, 700 ] :
+        if not np.array_equal( stream_list[ 0 ].rand_array( size ), np.array( [ stream_list[ 1 ].rand( ) for i in range( size ) ] ) ) :
+            raise RuntimeError( '# rand_array of %d wrong !' % size )
+        if not np.array_equal( stream_list[ 2 ].exponential_array( size ), np.array( [ stream_list[ 3 ].exponential( ) for i in range( size ) ] ) ) :
+            raise RuntimeError( '# exponential_array of %d wrong !' % size )
+
+    stream_1.print_properties( )
+    print( '# every is OK !' )
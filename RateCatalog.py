@@ -0,0 +1,756 @@
+#!/usr/bin/env python3
+'This is an RateCatalog module, partial sums over the rate array of DefectSystem.'
+
+import numpy as np
+import math
+import argparse
+
+from Auxiliary import j_have
+from RandomStream import RandomStream
+
+def create_rate_catalog( jdata, tmp_rate_array, random_stream = None ) :
+    '''
+    return the rate catalog for selecting events according to jdata[ 'kmc_selector' ]:
+     1. 'binary_tree', default, Class RateCatalog, O( log M ) selection and O( log M ) update.
+     2. 'composition_rejection', Class CompositionRejectionCatalog, O( 1 ) selection and O( 1 ) update.
+     3. 'next_reaction', Class NextReactionCatalog, O( 1 ) selection and O( log M ) update, 
+        firing times are drawn by random_stream.
+    '''
+
+    kmc_selector = 'binary_tree'
+    if j_have( jdata, 'kmc_selector' ) : kmc_selector = jdata[ 'kmc_selector' ]
+
+    if kmc_selector == 'binary_tree' :
+        return RateCatalog( tmp_rate_array )
+    elif kmc_selector == 'composition_rejection' :
+        return CompositionRejectionCatalog( tmp_rate_array )
+    elif kmc_selector == 'next_reaction' :
+        return NextReactionCatalog( tmp_rate_array, random_stream )
+    else :
+        raise RuntimeError( 'kmc_selector %s not in [ binary_tree, composition_rejection, next_reaction ], wrong !' % kmc_selector )
+
+class RateCatalog( object ) :
+
+    def __init__( self,
+                  tmp_rate_array,
+                  refresh_freq = 100000 ) :
+        '''
+        Fenwick( binary indexed ) tree over the rate array,
+        a rate update costs O( log M ) and sampling an index costs O( log M ), M = size of rate array.
+
+        Properties of RateCatalog :
+         1. self.rate_array, shared with the owner, rate updates are written into it.
+         2. self.size_rate_array
+         3. self.tree[ 0 : self.size_rate_array + 1 ], self.tree[ 0 ] is not used.
+         4. self.highest_bit, the highest power of 2 not larger than self.size_rate_array.
+         5. self.numb_update, the number of rate updates since the last build.
+         6. self.refresh_freq, rebuild the tree after self.refresh_freq updates to drop rounding errors.
+        '''
+
+        self.refresh_freq = refresh_freq
+
+        self.build( tmp_rate_array )
+
+    def build( self,
+               tmp_rate_array,
+               keep_index_array = None ) :
+        'build the tree for tmp_rate_array in O( M ) with numpy, tree[ i ] = sum( rate_array[ i - lowbit( i ) : i ] ), keep_index_array is not used.'
+
+        self.rate_array = tmp_rate_array
+        self.size_rate_array = tmp_rate_array.size
+
+        prefix = np.zeros( self.size_rate_array + 1, dtype = np.float64 )
+        np.cumsum( self.rate_array, out = prefix[ 1 : ] )
+
+        index = np.arange( self.size_rate_array + 1 )
+
+        self.tree = prefix - prefix[ index - ( index & -index ) ]
+
+        self.highest_bit = 1
+        while self.highest_bit * 2 <= self.size_rate_array : self.highest_bit *= 2
+
+        self.numb_update = 0
+
+    def set_rates( self,
+                   begin_index,
+                   tmp_rates    ) :
+        'set self.rate_array[ begin_index : begin_index + len( tmp_rates ) ] = tmp_rates, and update the tree.'
+
+        for i in range( len( tmp_rates ) ) :
+            self.set_rate( begin_index + i, tmp_rates[ i ] )
+
+    def set_rates_list( self,
+                        begin_index_list,
+                        rate_matrix       ) :
+        '''
+        set rate_matrix[ k ] at begin_index_list[ k ] for all k in one pass, slots must not overlap.
+        all tree nodes are updated with O( log M ) numpy operations instead of O( k * width * log M ) python loops.
+        '''
+
+        rate_matrix = np.asarray( rate_matrix, dtype = np.float64 )
+
+        index = ( np.asarray( begin_index_list, dtype = np.int64 )[ :, np.newaxis ] + np.arange( rate_matrix.shape[ 1 ] ) ).reshape( -1 )
+        rates = rate_matrix.reshape( -1 )
+
+        delta = rates - self.rate_array[ index ]
+
+        changed = delta != 0.0
+        if not np.any( changed ) : return
+
+        index = index[ changed ]
+        delta = delta[ changed ]
+
+        self.rate_array[ index ] = rates[ changed ]
+
+        self.numb_update += index.size
+
+        if self.numb_update > self.refresh_freq :
+            self.build( self.rate_array )
+            return
+
+        node = index + 1
+        while node.size > 0 :
+            np.add.at( self.tree, node, delta )
+
+            node = node + ( node & -node )
+
+            inside = node <= self.size_rate_array
+            node = node[ inside ]
+            delta = delta[ inside ]
+
+    def set_rate( self,
+                  index,
+                  rate   ) :
+        'set self.rate_array[ index ] = rate, and update the tree.'
+
+        delta = rate - self.rate_array[ index ]
+
+        if delta == 0.0 : return
+
+        self.rate_array[ index ] = rate
+
+        self.numb_update += 1
+
+        if self.numb_update > self.refresh_freq :
+            self.build( self.rate_array )
+            return
+
+        i = index + 1
+        while i <= self.size_rate_array :
+            self.tree[ i ] += delta
+            i += i & -i
+
+    def return_prefix_sum( self, index ) :
+        'return sum( self.rate_array[ 0 : index ] ).'
+
+        tmp_sum = 0.0
+
+        i = index
+        while i > 0 :
+            tmp_sum += self.tree[ i ]
+            i -= i & -i
+
+        return tmp_sum
+
+    def return_sum_rate( self ) :
+        'return sum( self.rate_array ).'
+
+        if self.size_rate_array == 0 : return 0.0
+
+        return self.return_prefix_sum( self.size_rate_array )
+
+    def return_index( self, kesi ) :
+        '''
+        return the minimum index with sum( self.rate_array[ 0 : index + 1 ] ) >= kesi, kesi in ( 0, sum_rate ].
+        this is the same index as the binary search on the prefix-sum array.
+        '''
+
+        index = 0
+        remain = kesi
+
+        step = self.highest_bit
+        while step > 0 :
+            next_index = index + step
+            if next_index <= self.size_rate_array and self.tree[ next_index ] < remain :
+                index = next_index
+                remain -= self.tree[ next_index ]
+            step //= 2
+
+        'index may be equal to self.size_rate_array due to rounding errors when kesi is close to sum_rate.'
+        return min( index, self.size_rate_array - 1 )
+
+    def select_index( self, 
+                      sum_rate,
+                      random_stream = np.random ) :
+        'return the index of the selected event with probability self.rate_array[ index ] / sum_rate, random_stream.rand( ) in [ 0, 1 ).'
+
+        return self.return_index( random_stream.rand( ) * sum_rate )
+
+    def _return_properties( self ) :
+
+        properties_list = [ [ 'size_rate_array', self.size_rate_array ],
+                            [ 'highest_bit',     self.highest_bit     ],
+                            [ 'numb_update',     self.numb_update     ],
+                            [ 'refresh_freq',    self.refresh_freq    ],
+                            [ 'rate_array',      self.rate_array      ],
+                            [ 'tree',            self.tree            ]  ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '# ' )
+        print( '# ------------- properties for RateCatalog --------------' )
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+        print( '# ' )
+
+class CompositionRejectionCatalog( object ) :
+
+    def __init__( self,
+                  tmp_rate_array,
+                  refresh_freq = 100000 ) :
+        '''
+        Composition-rejection over the rate array, the same methods as Class RateCatalog.
+        Rates are grouped into logarithmic bins, rate in [ 2^( e - 1 ), 2^e ) belongs to group e.
+        A group is selected by its sum of rates( composition ), then an event in the group is selected
+        uniformly and accepted with probability rate / 2^e( rejection, acceptance .ge. 0.5 ).
+        The number of groups only depends on the range of rates, so selection and update are O( 1 ).
+        Events with zero rate belong to no group.
+
+        Properties of CompositionRejectionCatalog :
+         1. self.rate_array, shared with the owner, rate updates are written into it.
+         2. self.size_rate_array
+         3. self.group_of[ 0 : self.size_rate_array ], group of every event, self.no_group for zero rate.
+         4. self.position_in_group[ 0 : self.size_rate_array ], position of every event in self.group_dict[ e ].
+         5. self.group_dict, { e : list of event index }.
+         6. self.group_sum_dict, { e : sum of rates in group e }.
+         7. self.group_key_list, keys of self.group_dict in decreasing order, larger rates are scanned first.
+         8. self.numb_update, the number of rate updates since the last build.
+         9. self.refresh_freq, rebuild the groups after self.refresh_freq updates to drop rounding errors.
+        '''
+
+        self.no_group = -100000
+
+        self.refresh_freq = refresh_freq
+
+        self.build( tmp_rate_array )
+
+    def build( self,
+               tmp_rate_array,
+               keep_index_array = None ) :
+        'build all groups for tmp_rate_array, the grouping is done with numpy, keep_index_array is not used.'
+
+        self.rate_array = tmp_rate_array
+        self.size_rate_array = tmp_rate_array.size
+
+        group_of = np.full( self.size_rate_array, self.no_group, dtype = np.int64 )
+        position_in_group = np.zeros( self.size_rate_array, dtype = np.int64 )
+
+        self.group_dict = { }
+        self.group_sum_dict = { }
+
+        nonzero_index = np.flatnonzero( self.rate_array > 0.0 )
+
+        if nonzero_index.size != 0 :
+
+            exponent = np.frexp( self.rate_array[ nonzero_index ] )[ 1 ].astype( np.int64 )
+            group_of[ nonzero_index ] = exponent
+
+            order = np.argsort( exponent, kind = 'stable' )
+            sorted_index = nonzero_index[ order ]
+            sorted_exponent = exponent[ order ]
+
+            ( key_array, begin_array, count_array ) = np.unique( sorted_exponent, return_index = True, return_counts = True )
+
+            position_in_group[ sorted_index ] = np.arange( sorted_index.size ) - np.repeat( begin_array, count_array )
+
+            sum_array = np.add.reduceat( self.rate_array[ sorted_index ], begin_array )
+
+            for i in range( key_array.size ) :
+                self.group_dict[ int( key_array[ i ] ) ] = sorted_index[ begin_array[ i ] : begin_array[ i ] + count_array[ i ] ].tolist( )
+                self.group_sum_dict[ int( key_array[ i ] ) ] = float( sum_array[ i ] )
+
+        self.group_of = group_of.tolist( )
+        self.position_in_group = position_in_group.tolist( )
+
+        self.group_key_list = sorted( self.group_dict.keys( ), reverse = True )
+
+        self.numb_update = 0
+
+    def set_rates( self,
+                   begin_index,
+                   tmp_rates    ) :
+        'set self.rate_array[ begin_index : begin_index + len( tmp_rates ) ] = tmp_rates, and update the groups.'
+
+        for i in range( len( tmp_rates ) ) :
+            self.set_rate( begin_index + i, tmp_rates[ i ] )
+
+    def set_rates_list( self,
+                        begin_index_list,
+                        rate_matrix       ) :
+        'set rate_matrix[ k ] at begin_index_list[ k ] for all k, every update is O( 1 ).'
+
+        for k in range( len( begin_index_list ) ) :
+            self.set_rates( begin_index_list[ k ], rate_matrix[ k ] )
+
+    def set_rate( self,
+                  index,
+                  rate   ) :
+        'set self.rate_array[ index ] = rate, and move index to its new group.'
+
+        old_rate = self.rate_array[ index ]
+
+        if rate == old_rate : return
+
+        self.rate_array[ index ] = rate
+
+        self.numb_update += 1
+
+        if self.numb_update > self.refresh_freq :
+            self.build( self.rate_array )
+            return
+
+        old_group = self.group_of[ index ]
+
+        if rate > 0.0 :
+            new_group = math.frexp( rate )[ 1 ]
+        else :
+            new_group = self.no_group
+
+        if new_group == old_group :
+            self.group_sum_dict[ old_group ] += rate - old_rate
+            return
+
+        if old_group != self.no_group : self._remove_from_group( index, old_group, old_rate )
+
+        if new_group != self.no_group : self._add_into_group( index, new_group, rate )
+
+        self.group_of[ index ] = new_group
+
+    def _remove_from_group( self,
+                            index,
+                            group,
+                            rate   ) :
+        'remove index from group, swap with the last index of the group.'
+
+        members = self.group_dict[ group ]
+
+        last = members.pop( )
+
+        if last != index :
+            position = self.position_in_group[ index ]
+            members[ position ] = last
+            self.position_in_group[ last ] = position
+
+        if len( members ) == 0 :
+            'the sum of rates of an empty group is reset, also removing rounding errors.'
+            del self.group_dict[ group ]
+            del self.group_sum_dict[ group ]
+            self.group_key_list.remove( group )
+        else :
+            self.group_sum_dict[ group ] -= rate
+
+    def _add_into_group( self,
+                         index,
+                         group,
+                         rate   ) :
+        'add index into group, create the group if it is not existed.'
+
+        if group not in self.group_dict :
+            self.group_dict[ group ] = [ ]
+            self.group_sum_dict[ group ] = 0.0
+            self.group_key_list.append( group )
+            self.group_key_list.sort( reverse = True )
+
+        members = self.group_dict[ group ]
+
+        self.position_in_group[ index ] = len( members )
+        members.append( index )
+
+        self.group_sum_dict[ group ] += rate
+
+    def return_sum_rate( self ) :
+        'return sum( self.rate_array ), summed over groups.'
+
+        return sum( self.group_sum_dict.values( ) )
+
+    def select_index( self, 
+                      sum_rate,
+                      random_stream = np.random ) :
+        'return the index of the selected event with probability self.rate_array[ index ] / sum_rate, random_stream.rand( ) in [ 0, 1 ).'
+
+        'A. composition, select group with probability self.group_sum_dict[ group ] / sum_rate.'
+        kesi = random_stream.rand( ) * sum_rate
+
+        for group in self.group_key_list :
+            kesi -= self.group_sum_dict[ group ]
+            if kesi <= 0.0 : break
+
+        'if kesi > 0.0 here due to rounding errors, the last group is selected.'
+        members = self.group_dict[ group ]
+        numb_members = len( members )
+        upper_rate = math.ldexp( 1.0, group )
+
+        'B. rejection, select index in group uniformly, accept it with probability self.rate_array[ index ] / upper_rate.'
+        while True :
+            index = members[ int( random_stream.rand( ) * numb_members ) ]
+            if random_stream.rand( ) * upper_rate < self.rate_array[ index ] : return index
+
+    def _return_properties( self ) :
+
+        properties_list = [ [ 'size_rate_array', self.size_rate_array ],
+                            [ 'numb_update',     self.numb_update     ],
+                            [ 'refresh_freq',    self.refresh_freq    ],
+                            [ 'group_key_list',  self.group_key_list  ],
+                            [ 'group_sum_dict',  self.group_sum_dict  ],
+                            [ 'rate_array',      self.rate_array      ]  ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '# ' )
+        print( '# ------------- properties for CompositionRejectionCatalog --------------' )
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+        print( '# ' )
+
+class NextReactionCatalog( object ) :
+
+    def __init__( self,
+                  tmp_rate_array,
+                  random_stream = None,
+                  refresh_freq = 100000 ) :
+        '''
+        Next reaction method( Gibson and Bruck ) over the rate array, the same update methods as Class RateCatalog.
+        Every event keeps an absolute firing time, the event with the earliest firing time is the top of an indexed binary heap,
+        so selecting the next event is O( 1 ) and updating a rate is O( log M ), no random number is drawn for the selection.
+        When the rate of an event changes from a_old to a_new, its firing time is rescaled, 
+        tau_new = self.c_time + ( a_old / a_new ) * ( tau_old - self.c_time ), only the fired event draws a new random number.
+        The dependency graph is the effect set of DefectSystem, i.e. the defectObjects in the 27 cells of the changed ones,
+        only their rates are set after an event, and only their firing times are rescaled.
+        Events with zero rate have infinite firing time.
+
+        Properties of NextReactionCatalog :
+         1. self.rate_array, shared with the owner, rate updates are written into it.
+         2. self.size_rate_array
+         3. self.random_stream, Class RandomStream.
+         4. self.c_time, the clock, time of the last fired event.
+         5. self.time_list[ 0 : self.size_rate_array ], absolute firing time of every event.
+         6. self.heap, indexes of events in heap order of firing times, self.heap[ 0 ] fires first.
+         7. self.position_in_heap[ 0 : self.size_rate_array ], position of every event in self.heap.
+         8. self.sum_rate, updated with every rate update.
+         9. self.numb_update, the number of rate updates since self.sum_rate is summed again.
+         10. self.refresh_freq, sum self.sum_rate again after self.refresh_freq updates to drop rounding errors.
+        '''
+
+        self.random_stream = random_stream
+        if self.random_stream is None : self.random_stream = RandomStream( )
+
+        self.refresh_freq = refresh_freq
+
+        self.c_time = 0.0
+
+        self.build( tmp_rate_array )
+
+    def build( self,
+               tmp_rate_array,
+               keep_index_array = None ) :
+        '''
+        draw firing times of events from self.c_time and build the heap with numpy, an array sorted by firing times is a heap.
+        keep_index_array[ k ] is the old index of event k with the same rate, e.g. the rate array is reallocated or its width is changed,
+        its firing time is kept, -1 or k beyond len( keep_index_array ) for a new event, only new events with nonzero rates draw firing times.
+        '''
+
+        self.rate_array = tmp_rate_array
+        self.size_rate_array = tmp_rate_array.size
+
+        time_array = np.full( self.size_rate_array, math.inf, dtype = np.float64 )
+
+        nonzero = self.rate_array > 0.0
+
+        if keep_index_array is not None :
+            keep_index_array = np.asarray( keep_index_array, dtype = np.int64 )[ : self.size_rate_array ]
+            keep = np.flatnonzero( ( keep_index_array >= 0 ) & nonzero[ : keep_index_array.size ] )
+            time_array[ keep ] = np.array( self.time_list, dtype = np.float64 )[ keep_index_array[ keep ] ]
+
+        nonzero_index = np.flatnonzero( nonzero & np.isinf( time_array ) )
+        time_array[ nonzero_index ] = self.c_time + self.random_stream.exponential_array( nonzero_index.size ) / self.rate_array[ nonzero_index ]
+
+        order = np.argsort( time_array, kind = 'stable' )
+
+        position_in_heap = np.empty( self.size_rate_array, dtype = np.int64 )
+        position_in_heap[ order ] = np.arange( self.size_rate_array )
+
+        self.time_list = time_array.tolist( )
+        self.heap = order.tolist( )
+        self.position_in_heap = position_in_heap.tolist( )
+
+        self.sum_rate = float( np.sum( self.rate_array ) )
+
+        self.numb_update = 0
+
+    def _sift_up( self, position ) :
+        'move the event at position of self.heap up until its parent fires earlier.'
+
+        heap = self.heap
+        time_list = self.time_list
+
+        index = heap[ position ]
+        tau = time_list[ index ]
+
+        while position > 0 :
+            parent = ( position - 1 ) >> 1
+            parent_index = heap[ parent ]
+            if time_list[ parent_index ] <= tau : break
+            heap[ position ] = parent_index
+            self.position_in_heap[ parent_index ] = position
+            position = parent
+
+        heap[ position ] = index
+        self.position_in_heap[ index ] = position
+
+    def _sift_down( self, position ) :
+        'move the event at position of self.heap down until its children fire later.'
+
+        heap = self.heap
+        time_list = self.time_list
+        size = self.size_rate_array
+
+        index = heap[ position ]
+        tau = time_list[ index ]
+
+        while True :
+            child = 2 * position + 1
+            if child >= size : break
+            if child + 1 < size and time_list[ heap[ child + 1 ] ] < time_list[ heap[ child ] ] : child += 1
+            child_index = heap[ child ]
+            if time_list[ child_index ] >= tau : break
+            heap[ position ] = child_index
+            self.position_in_heap[ child_index ] = position
+            position = child
+
+        heap[ position ] = index
+        self.position_in_heap[ index ] = position
+
+    def _set_time( self,
+                   index,
+                   tau    ) :
+        'set the firing time of index to tau, and restore the heap.'
+
+        old_tau = self.time_list[ index ]
+        self.time_list[ index ] = tau
+
+        if tau < old_tau :
+            self._sift_up( self.position_in_heap[ index ] )
+        else :
+            self._sift_down( self.position_in_heap[ index ] )
+
+    def set_rates( self,
+                   begin_index,
+                   tmp_rates    ) :
+        'set self.rate_array[ begin_index : begin_index + len( tmp_rates ) ] = tmp_rates, and rescale firing times.'
+
+        for i in range( len( tmp_rates ) ) :
+            self.set_rate( begin_index + i, tmp_rates[ i ] )
+
+    def set_rates_list( self,
+                        begin_index_list,
+                        rate_matrix       ) :
+        'set rate_matrix[ k ] at begin_index_list[ k ] for all k, every update is O( log M ).'
+
+        for k in range( len( begin_index_list ) ) :
+            self.set_rates( begin_index_list[ k ], rate_matrix[ k ] )
+
+    def set_rate( self,
+                  index,
+                  rate   ) :
+        '''
+        set self.rate_array[ index ] = rate, and rescale the firing time of index.
+        a new random number is drawn only when index has no firing time, i.e. its old rate is zero.
+        '''
+
+        old_rate = self.rate_array[ index ]
+
+        if rate == old_rate : return
+
+        self.rate_array[ index ] = rate
+
+        self.sum_rate += rate - old_rate
+
+        self.numb_update += 1
+
+        if self.numb_update > self.refresh_freq :
+            self.sum_rate = float( np.sum( self.rate_array ) )
+            self.numb_update = 0
+
+        if rate == 0.0 :
+            tau = math.inf
+        elif old_rate > 0.0 :
+            tau = self.c_time + ( old_rate / rate ) * ( self.time_list[ index ] - self.c_time )
+        else :
+            tau = self.c_time + self.random_stream.exponential( ) / rate
+
+        self._set_time( index, float( tau ) )
+
+    def advance_time( self, delta_time ) :
+        '''
+        move the clock self.c_time forward by delta_time without firing an event, 
+        e.g. the next event is later than the end of a temperature stage.
+        the firing times are kept, since every waiting time from the new clock is still exponential.
+        '''
+
+        c_time = self.c_time + delta_time
+
+        if self.size_rate_array != 0 and c_time > self.time_list[ self.heap[ 0 ] ] : 
+            raise RuntimeError( 'c_time %e is later than the next firing time, wrong !' % c_time )
+
+        self.c_time = c_time
+
+    def return_sum_rate( self ) :
+        'return sum( self.rate_array ).'
+
+        if self.size_rate_array == 0 : return 0.0
+
+        return self.sum_rate
+
+    def return_next( self ) :
+        'return ( index, tau ), the event firing first and its firing time, math.inf for no event.'
+
+        if self.size_rate_array == 0 : return ( -1, math.inf )
+
+        index = self.heap[ 0 ]
+
+        return ( index, self.time_list[ index ] )
+
+    def fire_index( self, index ) :
+        'fire the event index, the clock moves to its firing time, and a new firing time is drawn from the clock.'
+
+        self.c_time = self.time_list[ index ]
+
+        rate = self.rate_array[ index ]
+
+        if rate > 0.0 :
+            self._set_time( index, self.c_time + self.random_stream.exponential( ) / rate )
+        else :
+            self._set_time( index, math.inf )
+
+    def select_index( self, 
+                      sum_rate,
+                      random_stream = np.random ) :
+        'return the index of the event firing first, sum_rate and random_stream are not used.'
+
+        return self.return_next( )[ 0 ]
+
+    def _return_properties( self ) :
+
+        properties_list = [ [ 'size_rate_array', self.size_rate_array ],
+                            [ 'c_time',          self.c_time          ],
+                            [ 'sum_rate',        self.sum_rate        ],
+                            [ 'numb_update',     self.numb_update     ],
+                            [ 'refresh_freq',    self.refresh_freq    ],
+                            [ 'next',            self.return_next( )  ],
+                            [ 'rate_array',      self.rate_array      ]  ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '# ' )
+        print( '# ------------- properties for NextReactionCatalog --------------' )
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+        print( '# ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class RateCatalog detecting ---' )
+    parser.add_argument( '--size', type = int, default = 1000, help = 'the size of rate array' )
+
+    args = parser.parse_args( )
+
+    'compare with the prefix-sum array and np.searchsorted.'
+    rate_array = np.random.rand( args.size ) * 10.0 ** np.random.randint( -6, 6, args.size )
+    rateCatalog = RateCatalog( rate_array )
+
+    for i in range( 1000 ) :
+        index = np.random.randint( args.size )
+        rateCatalog.set_rates( index, [ np.random.rand( ) ] )
+
+        sum_rate_array = np.cumsum( rate_array )
+        kesi = np.random.rand( ) * sum_rate_array[ -1 ]
+
+        if rateCatalog.return_index( kesi ) != np.searchsorted( sum_rate_array, kesi ) :
+            raise RuntimeError( '# return_index not equal np.searchsorted, wrong !' )
+
+        if abs( rateCatalog.return_sum_rate( ) - sum_rate_array[ -1 ] ) > 1.0E-9 * sum_rate_array[ -1 ] :
+            raise RuntimeError( '# return_sum_rate wrong !' )
+
+    'compare set_rates_list with building the tree again.'
+    for i in range( 100 ) :
+        begin_index_list = np.random.choice( args.size // 4, 10, replace = False ) * 4
+        rateCatalog.set_rates_list( begin_index_list, np.random.rand( 10, 4 ) )
+
+    if np.max( np.abs( rateCatalog.tree - RateCatalog( rate_array.copy( ) ).tree ) ) > 1.0E-9 * np.sum( rate_array ) :
+        raise RuntimeError( '# set_rates_list not equal build, wrong !' )
+
+    'compare the selected frequency of CompositionRejectionCatalog with the probability of every event.'
+    numb_select = 100000
+    rate_array = 10.0 ** np.random.randint( -6, 6, 10 ) * np.random.rand( 10 )
+    rateCatalog = CompositionRejectionCatalog( rate_array )
+    rateCatalog.set_rates( 3, [ 0.0, 5.0 ] )
+
+    sum_rate = rateCatalog.return_sum_rate( )
+    if abs( sum_rate - np.sum( rate_array ) ) > 1.0E-9 * sum_rate :
+        raise RuntimeError( '# return_sum_rate of CompositionRejectionCatalog wrong !' )
+
+    frequency = np.bincount( [ rateCatalog.select_index( sum_rate ) for i in range( numb_select ) ], minlength = rate_array.size ) / numb_select
+    probability = rate_array / sum_rate
+
+    if any( np.abs( frequency - probability ) > 5.0 * np.sqrt( probability / numb_select ) + 1.0E-9 ) :
+        raise RuntimeError( '# frequency of CompositionRejectionCatalog not equal probability, wrong !' )
+
+    'the first event of NextReactionCatalog is selected with probability rate / sum_rate, and its waiting time has mean 1 / sum_rate.'
+    rateCatalog = NextReactionCatalog( rate_array.copy( ), RandomStream( 7 ) )
+    rateCatalog.set_rates( 3, [ 5.0, 0.0 ] )
+    rate_array = rateCatalog.rate_array.copy( )
+
+    sum_rate = rateCatalog.return_sum_rate( )
+    index_list = [ ]
+    delta_time_list = [ ]
+
+    for i in range( numb_select ) :
+        ( index, tau ) = rateCatalog.return_next( )
+        index_list.append( index )
+        delta_time_list.append( tau - rateCatalog.c_time )
+
+        'rates are changed and set back, the firing times are rescaled twice.'
+        rateCatalog.fire_index( index )
+        rateCatalog.set_rates( 0, rate_array * 2.0 )
+        rateCatalog.set_rates( 0, rate_array )
+
+    if abs( rateCatalog.return_sum_rate( ) - sum_rate ) > 1.0E-9 * sum_rate :
+        raise RuntimeError( '# return_sum_rate of NextReactionCatalog wrong !' )
+
+    frequency = np.bincount( index_list, minlength = rate_array.size ) / numb_select
+    probability = rate_array / sum_rate
+
+    if any( np.abs( frequency - probability ) > 5.0 * np.sqrt( probability / numb_select ) + 1.0E-9 ) :
+        raise RuntimeError( '# frequency of NextReactionCatalog not equal probability, wrong !' )
+
+    if abs( np.mean( delta_time_list ) * sum_rate - 1.0 ) > 5.0 / np.sqrt( numb_select ) :
+        raise RuntimeError( '# waiting time of NextReactionCatalog wrong !' )
+
+    'a larger rate array keeps firing times of old events, and only new events with nonzero rates draw firing times.'
+    time_array = np.array( rateCatalog.time_list )
+    numb_exponential = rateCatalog.random_stream.exponential_index
+
+    grow_rate_array = np.concatenate( ( rate_array, [ 0.0, 0.0, 3.0 ] ) )
+    rateCatalog.build( grow_rate_array, np.arange( rate_array.size ) )
+
+    if not np.array_equal( np.array( rateCatalog.time_list[ : rate_array.size ] ), time_array ) or math.isinf( rateCatalog.time_list[ -1 ] ) \
+       or rateCatalog.random_stream.exponential_index != numb_exponential + 1 :
+        raise RuntimeError( '# firing times of NextReactionCatalog not kept, wrong !' )
+
+    if rateCatalog.heap[ 0 ] != int( np.argmin( rateCatalog.time_list ) ) :
+        raise RuntimeError( '# heap of NextReactionCatalog wrong !' )
+
+    print( '# every is OK !' )
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+'This is an RateTable module, memoized base rates of isolated defectObjects.'
+
+import numpy as np
+import argparse
+import json
+
+from collections import OrderedDict
+
+from Auxiliary import j_have
+from tungsten.Create import create_defectObject_of_subclass
+
+def create_rate_table( jdata ) :
+    'return Class RateTable when jdata[ "rate_table" ] is True, otherwise None, i.e. every rate is computed by DefectObject.return_rate( ).'
+
+    rate_table = False
+    if j_have( jdata, 'rate_table' ) : rate_table = jdata[ 'rate_table' ]
+
+    if rate_table : return RateTable( jdata )
+
+    return None
+
+class RateTable( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        Memoized rates of isolated defectObjects, i.e. no defectObject in its 27 cells and ui == 0.0,
+        the rates only depend on ( defecttype, nsize, trap energy ) at the temperature self.temperature.
+        Rates of defectObjects with neighbours depend on ui and neighbours, they are computed by DefectObject.return_rate( ).
+        a. nsize <= self.max_nsize : kept in self.small_dict until the temperature changes,
+        b. nsize >  self.max_nsize : large loops, kept in self.large_dict with least recently used eviction,
+           at most self.max_numb_large entries.
+
+        Properties of RateTable :
+         1. self.max_nsize
+         2. self.max_numb_large
+         3. self.temperature
+         4. self.small_dict
+         5. self.large_dict
+         6. self.numb_hit, self.numb_miss
+        '''
+
+        self.max_nsize = 100
+        if j_have( jdata, 'rate_table_max_nsize' ) : self.max_nsize = jdata[ 'rate_table_max_nsize' ]
+
+        self.max_numb_large = 1000
+        if j_have( jdata, 'rate_table_max_numb_large' ) : self.max_numb_large = jdata[ 'rate_table_max_numb_large' ]
+
+        self.numb_hit = 0
+        self.numb_miss = 0
+
+        self.clear( None )
+
+    def clear( self, temperature ) :
+        'clear all rates, and set self.temperature.'
+
+        self.temperature = temperature
+
+        self.small_dict = { }
+        self.large_dict = OrderedDict( )
+
+    def _return_key( self, tmp_defectObject ) :
+        'return ( defecttype, nsize, trap energy ), trap energy is None for no trap.'
+
+        trap_energy = None
+        if tmp_defectObject.trap[ 0 ] : trap_energy = tmp_defectObject.trap[ 1 ].return_energy( )
+
+        return ( tmp_defectObject.defecttype, tmp_defectObject.nsize, trap_energy )
+
+    def return_rate( self,
+                     jdata,
+                     tmp_defectObject,
+                     temperature,
+                     ui,
+                     neighbour_list   ) :
+        'return rates of tmp_defectObject, the same as tmp_defectObject.return_rate( jdata, temperature, ui, neighbour_list ).'
+
+        if len( neighbour_list ) != 0 or ui != 0.0 or not hasattr( tmp_defectObject, 'trap' ) :
+            return tmp_defectObject.return_rate( jdata, temperature, ui, neighbour_list )
+
+        if temperature != self.temperature : self.clear( temperature )
+
+        key = self._return_key( tmp_defectObject )
+
+        if key[ 1 ] <= self.max_nsize :
+            tmp_dict = self.small_dict
+        else :
+            tmp_dict = self.large_dict
+
+        if key in tmp_dict :
+            self.numb_hit += 1
+            if tmp_dict is self.large_dict : self.large_dict.move_to_end( key )
+            return list( tmp_dict[ key ] )
+
+        self.numb_miss += 1
+
+        rates = tuple( tmp_defectObject.return_rate( jdata, temperature, ui, neighbour_list ) )
+
+        tmp_dict[ key ] = rates
+
+        'evict the least recently used large loop.'
+        if len( self.large_dict ) > self.max_numb_large : self.large_dict.popitem( last = False )
+
+        return list( rates )
+
+    def _return_properties( self ) :
+        '''
+        Properties of RateTable :
+         1. self.max_nsize
+         2. self.max_numb_large
+         3. self.temperature
+         4. self.small_dict
+         5. self.large_dict
+         6. self.numb_hit, self.numb_miss
+        '''
+
+        properties_list = [ [ 'max_nsize',      self.max_nsize             ],
+                            [ 'max_numb_large', self.max_numb_large        ],
+                            [ 'temperature',    self.temperature           ],
+                            [ 'numb_small',     len( self.small_dict )     ],
+                            [ 'numb_large',     len( self.large_dict )     ],
+                            [ 'numb_hit',       self.numb_hit              ],
+                            [ 'numb_miss',      self.numb_miss             ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for RateTable --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class RateTable detecting ---' )
+
+    parser.add_argument( 'INPUT',
+                         help = 'the input json database' )
+
+    args = parser.parse_args( )
+
+    fp = open( args.INPUT, 'r' )
+    jdata = json.load( fp )
+
+    jdata[ 'rate_table_max_nsize' ] = 10
+    jdata[ 'rate_table_max_numb_large' ] = 5
+
+    rateTable = RateTable( jdata )
+    temperature = jdata[ 'temperature' ]
+
+    'compare memoized rates with DefectObject.return_rate( ) for isolated defectObjects.'
+    for nsize in list( range( 1, 20 ) ) * 2 :
+        for defecttype in [ 'ILoop111', 'VLoop111' ] :
+            tmp_defectObject = create_defectObject_of_subclass( jdata, '%s %d 1.0 1.0 1.0' % ( defecttype, nsize ) )
+
+            real_rates = tmp_defectObject.return_rate( jdata, temperature, 0.0, [ ] )
+
+            if not np.allclose( real_rates, rateTable.return_rate( jdata, tmp_defectObject, temperature, 0.0, [ ] ) ) :
+                raise RuntimeError( '# rates of %s %d not equal, wrong !' % ( defecttype, nsize ) )
+
+    if len( rateTable.large_dict ) > rateTable.max_numb_large :
+        raise RuntimeError( '# large_dict is not bounded, wrong !' )
+
+    rateTable.print_properties( )
+    print( '# every is OK !' )
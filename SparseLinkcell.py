@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+'This is an SparseLinkcell module, a linkcell keeping only occupied cells for very large boxes with a low density.'
+
+import numpy as np
+import argparse
+
+from BoxLinkcell import BoxLinkcell
+
+class SparseCellArray( dict ) :
+    'a dict { ip : value } of occupied cells, self.fill_value for the others, a cell set to self.fill_value is removed.'
+
+    def __init__( self,
+                  fill_value,
+                  item_list = ( ) ) :
+
+        dict.__init__( self, item_list )
+
+        self.fill_value = fill_value
+
+    def __missing__( self, ip ) :
+        return self.fill_value
+
+    def __setitem__( self, ip, value ) :
+
+        if value == self.fill_value :
+            self.pop( ip, None )
+        else :
+            dict.__setitem__( self, int( ip ), int( value ) )
+
+class SparseNeighbourTable( dict ) :
+    '''
+    a dict { ip : ip of 27 cells } of occupied cells, a row is computed by row_function( [ ip ] ) when the cell ip is searched,
+    and kept only if occupied_function( ip ), the row of a cell is removed by the linkcell when the cell becomes empty.
+    '''
+
+    def __init__( self, 
+                  row_function,
+                  occupied_function ) :
+
+        dict.__init__( self )
+
+        self.row_function = row_function
+        self.occupied_function = occupied_function
+
+    def __missing__( self, ip ) :
+
+        row = self.row_function( [ ip ] )[ 0 ]
+        if self.occupied_function( ip ) : dict.__setitem__( self, int( ip ), row )
+
+        return row
+
+class SparseLinkcell( BoxLinkcell ) :
+
+    'memory scales with occupied cells, no limit of cells in auto-tuning.'
+    auto_max_cells = None
+
+    def __init__( self,
+                  jdata,
+                  tmp_defectObject_list,
+                  position_scale_array = None ) :
+        '''
+        The same cells and methods as Class BoxLinkcell, but the arrays of all cells are dicts of occupied cells :
+         11. self.ltop, Class SparseCellArray { ip : top index }, -1 for an empty cell.
+         13. self.cell_start, self.cell_count, Class SparseCellArray of occupied cells by self.linked( ), 0 for an empty cell.
+         14. self.neighbour_cell_table, Class SparseNeighbourTable, the row of an occupied cell is computed when it is first searched,
+             and removed when the cell becomes empty.
+        ip of a cell is the packed cell id as BoxLinkcell, so memory and the cost of every operation scale with occupied cells,
+        not with self.nlc, e.g. micrometer foils with fine cells and a low density of defectObjects.
+        '''
+
+        BoxLinkcell.__init__( self, jdata, tmp_defectObject_list, position_scale_array )
+
+    def _set_cells( self, sorted_ip_array ) :
+        'set self.cell_start, self.cell_count and self.ltop of occupied cells from sorted_ip_array, ip of self.sorted_index.'
+
+        ( ip_array, start_array, count_array ) = np.unique( sorted_ip_array, return_index = True, return_counts = True )
+
+        ip_list = ip_array.tolist( )
+
+        self.cell_start = SparseCellArray( 0, zip( ip_list, start_array.tolist( ) ) )
+        self.cell_count = SparseCellArray( 0, zip( ip_list, count_array.tolist( ) ) )
+
+        self.ltop = SparseCellArray( -1, zip( ip_list, self.sorted_index[ start_array ].tolist( ) ) )
+
+        'rows of cells empty after linking again are removed.'
+        for ip in [ ip for ip in self.neighbour_cell_table if ip not in self.ltop ] : del self.neighbour_cell_table[ ip ]
+
+    def _unlink( self,
+                 index,
+                 ip     ) :
+        'remove index from the chain of cell ip as BoxLinkcell, and the row of cell ip in self.neighbour_cell_table if the cell becomes empty.'
+
+        BoxLinkcell._unlink( self, index, ip )
+
+        if self.ltop[ ip ] == -1 : self.neighbour_cell_table.pop( int( ip ), None )
+
+    def _return_neighbour_cell_table( self, ip_array = None ) :
+        'return Class SparseNeighbourTable for all cells, rows kept for occupied cells, or the rows of ip_array as BoxLinkcell.'
+
+        if ip_array is None : return SparseNeighbourTable( self._return_neighbour_cell_table, lambda ip : ip in self.ltop )
+
+        return BoxLinkcell._return_neighbour_cell_table( self, ip_array )
+
+    def return_numb_occupied_cell( self ) :
+        'return the number of cells with at least one linked index.'
+
+        return len( self.ltop )
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for SparseLinkcell --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class SparseLinkcell detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 300,
+                         help = 'the number of defectObjects' )
+
+    parser.add_argument( '-s', '--step', type = int, default = 300,
+                         help = 'the number of random changes' )
+
+    args = parser.parse_args( )
+
+    jdata = { 'box' : [ 20.0, 16.0, 12.0 ], 'periodic' : [ True, True, False ], 'rcutoff_elastic' : 2.0,
+              'linkcell_space' : [ 2.0, 2.0, 2.0 ], 'max_numb_in_27_cells' : 100000 }
+
+    class PointDefect( object ) :
+        def __init__( self, position ) :
+            self.position = np.array( position )
+        def return_position_scale( self ) :
+            return self.position / np.array( jdata[ 'box' ] )
+
+    random_state = np.random.RandomState( 7 )
+
+    return_random_defectObject = lambda : PointDefect( random_state.rand( 3 ) * np.array( jdata[ 'box' ] ) )
+
+    defectObject_list = [ return_random_defectObject( ) for i in range( args.numb ) ]
+
+    sparseLinkcell = SparseLinkcell( jdata, defectObject_list )
+    boxLinkcell = BoxLinkcell( jdata, defectObject_list )
+
+    'the same random adds, deletes and substitutes for both.'
+    for step in range( args.step ) :
+
+        what = random_state.randint( 3 )
+
+        if what == 0 :
+            tmp_defectObject = return_random_defectObject( )
+            defectObject_list.append( tmp_defectObject )
+            for linkcell in [ sparseLinkcell, boxLinkcell ] : linkcell.add_a_defectObject( tmp_defectObject )
+        elif what == 1 :
+            index = random_state.randint( len( defectObject_list ) )
+            for linkcell in [ sparseLinkcell, boxLinkcell ] : linkcell.delete_a_defectObject( defectObject_list[ index ], index, defectObject_list[ -1 ] )
+            defectObject_list[ index ] = defectObject_list[ -1 ]
+            del defectObject_list[ -1 ]
+        else :
+            index = random_state.randint( len( defectObject_list ) )
+            tmp_defectObject = return_random_defectObject( )
+            for linkcell in [ sparseLinkcell, boxLinkcell ] : linkcell.substitute_defectObject( index, defectObject_list[ index ], tmp_defectObject )
+            defectObject_list[ index ] = tmp_defectObject
+
+    'every cell has the same chain and the same indexes in 27 cells as BoxLinkcell, linked again or not.'
+    for linkcell in [ sparseLinkcell, SparseLinkcell( jdata, defectObject_list ) ] :
+
+        if linkcell.return_numb_occupied_cell( ) != boxLinkcell.return_numb_occupied_cell( ) or not np.array_equal( linkcell.linkmp, boxLinkcell.linkmp ) :
+            raise RuntimeError( '# cells of SparseLinkcell not equal BoxLinkcell, wrong !' )
+
+        for ip in range( boxLinkcell.nlc ) :
+            if linkcell.ltop[ ip ] != boxLinkcell.ltop[ ip ] or \
+               sorted( linkcell.return_27_cells_index_list_ip( ip ) ) != sorted( boxLinkcell.return_27_cells_index_list_ip( ip ) ) :
+                raise RuntimeError( '# cell %d of SparseLinkcell not equal BoxLinkcell, wrong !' % ip )
+
+    'a micrometer box with cells of 2 nm, 1.25E8 cells, only occupied cells are kept.'
+    jdata[ 'box' ] = [ 1000.0, 1000.0, 1000.0 ]
+
+    defectObject_list = [ return_random_defectObject( ) for i in range( args.numb ) ]
+    sparseLinkcell = SparseLinkcell( jdata, defectObject_list )
+
+    for ( index, tmp_defectObject ) in enumerate( defectObject_list ) :
+        if index not in sparseLinkcell.return_27_cells_index_list_ip( sparseLinkcell.return_ip_defectObject( tmp_defectObject ) ) :
+            raise RuntimeError( '# index %d not in its cells, wrong !' % index )
+
+    if sparseLinkcell.return_numb_occupied_cell( ) > args.numb or len( sparseLinkcell.neighbour_cell_table ) > args.numb :
+        raise RuntimeError( '# empty cells kept in SparseLinkcell, wrong !' )
+
+    'random moves, adds and deletes, 27 cells are searched after every change, rows of cells left empty are not kept.'
+    for step in range( 10 * args.step ) :
+
+        what = random_state.randint( 4 )
+        index = random_state.randint( len( defectObject_list ) )
+
+        if what == 0 :
+            tmp_defectObject = return_random_defectObject( )
+            defectObject_list.append( tmp_defectObject )
+            sparseLinkcell.add_a_defectObject( tmp_defectObject )
+        elif what == 1 :
+            sparseLinkcell.delete_a_defectObject( defectObject_list[ index ], index, defectObject_list[ -1 ] )
+            defectObject_list[ index ] = defectObject_list[ -1 ]
+            del defectObject_list[ -1 ]
+        else :
+            tmp_defectObject = PointDefect( np.mod( defectObject_list[ index ].position + random_state.normal( 0.0, 20.0, 3 ), jdata[ 'box' ] ) )
+            sparseLinkcell.substitute_defectObject( index, defectObject_list[ index ], tmp_defectObject )
+            defectObject_list[ index ] = tmp_defectObject
+
+        for tmp_defectObject in defectObject_list[ : 10 ] : sparseLinkcell.return_27_cells_index_list_defectObject( tmp_defectObject )
+
+    if len( sparseLinkcell.neighbour_cell_table ) > sparseLinkcell.return_numb_occupied_cell( ) or \
+       any( ip not in sparseLinkcell.ltop for ip in sparseLinkcell.neighbour_cell_table ) :
+        raise RuntimeError( '# rows of empty cells kept in SparseLinkcell, wrong !' )
+
+    print( '# nlc : %d, occupied cells : %d' % ( sparseLinkcell.nlc, sparseLinkcell.return_numb_occupied_cell( ) ) )
+    print( '# every is OK !' )
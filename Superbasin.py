@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+'This is an Superbasin module, detecting flickers and sampling the exit of a two-state superbasin.'
+
+import numpy as np
+import argparse
+import math
+
+from Auxiliary import j_have
+from RandomStream import RandomStream
+
+def create_superbasin( jdata ) :
+    'return Class Superbasin when jdata[ "superbasin" ] is True, otherwise None, i.e. every flicker is taken as an event.'
+
+    superbasin = False
+    if j_have( jdata, 'superbasin' ) : superbasin = jdata[ 'superbasin' ]
+
+    if superbasin : return Superbasin( jdata )
+
+    return None
+
+class Superbasin( object ) :
+
+    def __init__( self, jdata ) :
+        '''
+        A flicker is an event of a defectObject taking the system back to the state of two events ago,
+        i.e. the defectObject jumps from A to B and back to A. After self.min_flicker flickers in a row,
+        states A and B are taken as a superbasin, and the visits of A and B are sampled at once :
+        R_A = sum_rate in A, k_AB = rate from A to B, R_B and k_BA in B are recorded by self.record( ),
+        the exit probability of every visit is p_A = 1 - k_AB / R_A and p_B = 1 - k_BA / R_B.
+        The number of round trips before exit is geometric, the time of n visits of A is gamma( n ) / R_A,
+        and the exit event is selected among the events of the exit state except the internal one.
+
+        Properties of Superbasin :
+         1. self.min_flicker
+         2. self.record_list, records of the last two events.
+         3. self.numb_flicker, the number of flickers in a row.
+         4. self.numb_exit, the number of superbasin exits.
+         5. self.numb_visit, the number of visits of superbasin states sampled at once.
+        '''
+
+        self.min_flicker = 10
+        if j_have( jdata, 'superbasin_min_flicker' ) : self.min_flicker = jdata[ 'superbasin_min_flicker' ]
+
+        if self.min_flicker < 1 : raise RuntimeError( 'superbasin_min_flicker %d .lt. 1, wrong !' % self.min_flicker )
+
+        self.numb_exit = 0
+        self.numb_visit = 0
+
+        self.clear( )
+
+    def clear( self ) :
+        'clear records and flickers, e.g. rates are changed without an event.'
+
+        self.record_list = [ ]
+        self.numb_flicker = 0
+
+    def record( self,
+                c_step,
+                handle,
+                what_action,
+                position,
+                numb_defectObject,
+                sum_rate,
+                rate               ) :
+        'record the event selected at c_step, position is the unwrapped position of the defectObject before the event.'
+
+        self.record_list.append( { 'c_step'            : c_step,
+                                   'handle'            : handle,
+                                   'what_action'       : what_action,
+                                   'position'          : position,
+                                   'numb_defectObject' : numb_defectObject,
+                                   'sum_rate'          : sum_rate,
+                                   'rate'              : rate               } )
+
+        if len( self.record_list ) > 2 : self.record_list.pop( 0 )
+
+    def return_handle( self ) :
+        'return the handle of the defectObject of the last event, None for no record.'
+
+        if len( self.record_list ) == 0 : return None
+
+        return self.record_list[ -1 ][ 'handle' ]
+
+    def judge_flicker( self,
+                       c_step,
+                       numb_defectObject,
+                       position           ) :
+        '''
+        judge the last event is a flicker or not, and return True if self.numb_flicker .ge. self.min_flicker.
+        position is the unwrapped position now of the defectObject of the last event, None if it is deleted.
+        '''
+
+        flicker = False
+
+        if len( self.record_list ) == 2 and position is not None :
+
+            ( record_A, record_B ) = self.record_list
+
+            flicker = ( record_A[ 'c_step' ] == c_step - 2 and record_B[ 'c_step' ] == c_step - 1
+                        and record_A[ 'handle' ] == record_B[ 'handle' ]
+                        and record_A[ 'numb_defectObject' ] == numb_defectObject
+                        and record_B[ 'numb_defectObject' ] == numb_defectObject
+                        and np.allclose( record_A[ 'position' ], position, rtol = 0.0, atol = 1.0E-6 )
+                        and not np.allclose( record_B[ 'position' ], position, rtol = 0.0, atol = 1.0E-6 ) )
+
+        if flicker :
+            self.numb_flicker += 1
+        else :
+            self.numb_flicker = 0
+
+        return self.numb_flicker >= self.min_flicker
+
+    def return_exit( self,
+                     sum_rate,
+                     rate,
+                     random_stream ) :
+        '''
+        return ( exit_A, basin_time ), the system is in state A now, sum_rate = R_A and rate = k_AB.
+        exit_A is True for exit from A, False for exit from B, and None for no exit, i.e. basin_time = math.inf.
+        '''
+
+        record_B = self.record_list[ -1 ]
+
+        p_A = 1.0 - rate / sum_rate
+        p_B = 1.0 - record_B[ 'rate' ] / record_B[ 'sum_rate' ]
+
+        if p_A <= 0.0 and p_B <= 0.0 : return ( None, math.inf )
+
+        'the number of round trips A -> B -> A before the exit round, geometric with q = ( 1 - p_A ) * ( 1 - p_B ).'
+        q = ( 1.0 - p_A ) * ( 1.0 - p_B )
+
+        numb_round = 0
+        if q > 0.0 : numb_round = int( math.log( 1.0 - random_stream.rand( ) ) / math.log( q ) )
+
+        'the exit round, exit from A, or go to B and exit from B.'
+        exit_A = random_stream.rand( ) * ( p_A + ( 1.0 - p_A ) * p_B ) < p_A
+
+        numb_visit_A = numb_round + 1
+        numb_visit_B = numb_round
+        if not exit_A : numb_visit_B += 1
+
+        basin_time = random_stream.gamma( numb_visit_A ) / sum_rate
+        if numb_visit_B > 0 : basin_time += random_stream.gamma( numb_visit_B ) / record_B[ 'sum_rate' ]
+
+        self.numb_exit += 1
+        self.numb_visit += numb_visit_A + numb_visit_B
+
+        return ( exit_A, basin_time )
+
+    def _return_properties( self ) :
+        '''
+        Properties of Superbasin :
+         1. self.min_flicker
+         2. self.record_list
+         3. self.numb_flicker
+         4. self.numb_exit
+         5. self.numb_visit
+        '''
+
+        properties_list = [ [ 'min_flicker',  self.min_flicker  ],
+                            [ 'record_list',  self.record_list  ],
+                            [ 'numb_flicker', self.numb_flicker ],
+                            [ 'numb_exit',    self.numb_exit    ],
+                            [ 'numb_visit',   self.numb_visit   ] ]
+
+        return properties_list
+
+    def print_properties( self ) :
+
+        print( '#   ' )
+        print( '# ------------- properties for Superbasin --------------' )
+
+        print( '\n'.join( ( '# %s : %s' % ( item[ 0 ], item[ 1 ] ) for item in self._return_properties( ) ) ) )
+
+        print( '#   ' )
+
+if __name__ == '__main__' :
+
+    parser = argparse.ArgumentParser( description = '--- Class Superbasin detecting ---' )
+
+    parser.add_argument( '-n', '--numb', type = int, default = 20000,
+                         help = 'the number of superbasin exits' )
+
+    args = parser.parse_args( )
+
+    'compare return_exit with the event by event simulation of the two-state basin.'
+    ( R_A, k_AB, R_B, k_BA ) = ( 10.0, 9.0, 4.0, 3.5 )
+
+    random_stream = RandomStream( 7 )
+    superbasin = Superbasin( { 'superbasin_min_flicker' : 2 } )
+
+    for c_step in range( 2 ) :
+        superbasin.record( c_step, 0, c_step, np.array( [ c_step, 0.0, 0.0 ] ), 1, [ R_A, R_B ][ c_step ], [ k_AB, k_BA ][ c_step ] )
+
+    if superbasin.judge_flicker( 2, 1, np.zeros( 3 ) ) :
+        raise RuntimeError( '# one flicker is taken as a superbasin, wrong !' )
+
+    exit_list = [ superbasin.return_exit( R_A, k_AB, random_stream ) for i in range( args.numb ) ]
+
+    exit_A_array = np.array( [ item[ 0 ] for item in exit_list ], dtype = np.float64 )
+    time_array = np.array( [ item[ 1 ] for item in exit_list ] )
+
+    real_exit_A_list = [ ]
+    real_time_list = [ ]
+
+    for i in range( args.numb ) :
+        ( state_A, tmp_time ) = ( True, 0.0 )
+        while True :
+            ( sum_rate, rate ) = ( R_A, k_AB ) if state_A else ( R_B, k_BA )
+            tmp_time += random_stream.exponential( ) / sum_rate
+            if random_stream.rand( ) * sum_rate >= rate : break
+            state_A = not state_A
+        real_exit_A_list.append( state_A )
+        real_time_list.append( tmp_time )
+
+    if abs( exit_A_array.mean( ) - np.mean( real_exit_A_list ) ) > 5.0 * np.sqrt( 0.5 / args.numb ) :
+        raise RuntimeError( '# exit probability of the superbasin wrong !' )
+
+    if abs( time_array.mean( ) / np.mean( real_time_list ) - 1.0 ) > 10.0 / np.sqrt( args.numb ) :
+        raise RuntimeError( '# exit time of the superbasin wrong !' )
+
+    superbasin.print_properties( )
+    print( '# every is OK !' )
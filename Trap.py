@@ -4,7 +4,8 @@ import numpy as np
 import argparse
 import json
 
-from BoxLinkcell import BoxLinkcell
+from BoxLinkcell import create_box_linkcell
+from KDTreeNeighbour import create_kdtree_neighbour
 from ConstNumber import ConstNumber
 from Auxiliary import j_must_have, j_have
 
@@ -128,6 +129,7 @@ class TrapSystem( object ) :
          1. self.numb_trapObject
          2. self.trapObject_list
          3. self.linkcell
+         4. self.kdtree_neighbour, traps of all defectObjects by one call of cKDTree, None for 27 cells of every defectObject.
         '''
 
         ConstNumb = ConstNumber( jdata )
@@ -163,7 +165,12 @@ class TrapSystem( object ) :
         if self.numb_trapObject == 0 :
             raise RuntimeError( 'self.numb_trapObject eq 0 while trap eq True' )
 
-        self.linkcell = BoxLinkcell( jdata, self.trapObject_list )
+        self.linkcell = create_box_linkcell( jdata, self.trapObject_list )
+
+        self.kdtree_neighbour = create_kdtree_neighbour( jdata )
+
+        self.trap_position = np.array( [ item.return_position( ) for item in self.trapObject_list ] )
+        self.max_radius = max( item.return_radius( ) for item in self.trapObject_list )
 
     def return_judge_trap( self, 
                            jdata,
@@ -179,6 +186,43 @@ class TrapSystem( object ) :
 
         return ( False, None )
 
+    def return_judge_trap_list( self,
+                                jdata,
+                                tmp_defectObject_list ) :
+        '''
+        return [ return_judge_trap( jdata, item ) for item in tmp_defectObject_list ],
+        candidates within the largest trap radius are found for all defectObjects at once with self.kdtree_neighbour,
+        and judged in the same order as self.return_judge_trap( ), i.e. in the order of self.trapObject_list for a few traps,
+        otherwise in the order of walking 27 cells, candidates out of 27 cells are dropped.
+        '''
+
+        if self.kdtree_neighbour == None :
+            return [ self.return_judge_trap( jdata, item ) for item in tmp_defectObject_list ]
+
+        if len( tmp_defectObject_list ) == 0 : return [ ]
+
+        position = np.array( [ item.return_position( ) for item in tmp_defectObject_list ] )
+
+        judge_trap_list = [ ]
+
+        for ( tmp_defectObject, index_list ) in zip( tmp_defectObject_list, self.kdtree_neighbour.return_ball_index_list( self.trap_position, position, self.max_radius ) ) :
+
+            judge_trap = ( False, None )
+
+            if self.numb_trapObject >= self.linkcell.nnbrs and len( index_list ) != 0 :
+                candidate_set = set( index_list )
+                ip = self.linkcell.return_ip_cell_index( self.linkcell.return_cell_index_defectObject( tmp_defectObject ) )
+                index_list = [ i for i in self.linkcell.return_27_cells_index_list_ip( ip ) if i in candidate_set ]
+
+            for i in index_list :
+                if self.trapObject_list[ i ].return_judge_trap( jdata, tmp_defectObject ) :
+                    judge_trap = ( True, self.trapObject_list[ i ] )
+                    break
+
+            judge_trap_list.append( judge_trap )
+
+        return judge_trap_list
+
     def return_cells_trapObject_list( self, 
                                       jdata, 
                                       tmp_defectObject ) :
@@ -187,56 +231,10 @@ class TrapSystem( object ) :
         cell_index = self.linkcell.return_cell_index_defectObject( tmp_defectObject )
         ip = self.linkcell.return_ip_cell_index( cell_index ) 
 
-        i = self.linkcell.ltop[ ip ]
-   
-        cells_trapObject_list = [ ]
-
-        if i != -1 :
-            while True :
-                cells_trapObject_list.append( self.trapObject_list[ i ] )
-                i = self.linkcell.linkmp[ i ]
-                if i == -1 : break
-
-        for kc in range( 1, 27 ) :
-
-            jx = cell_index[ 0 ] + self.linkcell.nix[ kc ]
-            jy = cell_index[ 1 ] + self.linkcell.niy[ kc ]
-            jz = cell_index[ 2 ] + self.linkcell.niz[ kc ]
-           
-            if cell_index[ 0 ] == self.linkcell.nlc_vector[ 0 ] - 1 and jx > cell_index[ 0 ] :
-                jx = 0
-                if not self.linkcell.periodic[ 0 ] : break
-            elif cell_index[ 0 ] == 0 and jx < cell_index[ 0 ] :
-                jx = self.linkcell.nlc_vector[ 0 ] - 1
-                if not self.linkcell.periodic[ 0 ] : break
-           
-            if cell_index[ 1 ] == self.linkcell.nlc_vector[ 1 ] - 1 and jy > cell_index[ 1 ] :
-                jy = 0
-                if not self.linkcell.periodic[ 1 ] : break
-            elif cell_index[ 1 ] == 0 and jy < cell_index[ 1 ] :
-                jy = self.linkcell.nlc_vector[ 1 ] - 1
-                if not self.linkcell.periodic[ 1 ] : break
-           
-            if cell_index[ 2 ] == self.linkcell.nlc_vector[ 2 ] - 1 and jz > cell_index[ 2 ] :
-                jz = 0
-                if not self.linkcell.periodic[ 2 ] : break
-            elif cell_index[ 2 ] == 0 and jz < cell_index[ 2 ] :
-                jz = self.linkcell.nlc_vector[ 2 ] - 1
-                if not self.linkcell.periodic[ 2 ] : break
-
-            jc = self.linkcell.return_ip_cell_index( [ jx, jy, jz ] )
-
-            j = self.linkcell.ltop[ jc ]
-
-            'Bypass this neighbouring cell if it is empty.'
-            if j != -1 :
-                while True :
-                    cells_trapObject_list.append( self.trapObject_list[ j ] )
-                    j = self.linkcell.linkmp[ j ]
-                    if j == -1 : break
-
-        if len( cells_trapObject_list ) > self.linkcell.nnbrs :
-            raise RuntimeError( 'max1: %d .gt. nnbrs: %d something wrong' % ( len( cells_trapObject_list ), self.linkcell.nnbrs ) )
+        'neighbouring cells are taken from the table of self.linkcell, as DefectSystem does.'
+        cells_trapObject_list = [ self.trapObject_list[ i ] for i in self.linkcell.return_27_cells_index_list_ip( ip ) ]
+
+        self.linkcell.check_nnbrs( len( cells_trapObject_list ) )
 
         return cells_trapObject_list
 